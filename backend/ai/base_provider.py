@@ -1,4 +1,30 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator
+
+from core.config import settings
+
+
+def install_sdk_thread_pool():
+    """Size the running loop's default executor for the vendor SDK calls.
+
+    The providers run the synchronous SDKs through asyncio.to_thread, whose
+    default pool (min(32, cpus + 4) threads) would cap concurrent AI calls
+    on small hosts.
+    """
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=settings.AI_SDK_THREADS, thread_name_prefix="ai-sdk"))
+
+
 class AIProvider:
     async def generate(self, prompt: str) -> str:
         """Generate text based on the provided prompt."""
         raise NotImplementedError("Subclasses must implement generate()")
+
+    async def generate_stream(self, prompt: str) -> AsyncIterator[str]:
+        """Yield the response in chunks as they are produced.
+
+        Providers without streaming support return the whole response as a
+        single chunk.
+        """
+        yield await self.generate(prompt)
@@ -0,0 +1,290 @@
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from ai.base_provider import AIProvider
+from ai.usage import report_tokens
+from core.config import settings
+
+# Offline stand-in for the real vendors (AI_PROVIDER=fake).
+#
+# Returns canned, schema-valid JSON for every prompt the services send, with
+# log-normally distributed latency and optional error / invalid-JSON
+# injection. A single seeded RNG is shared by all instances so a sequential
+# run is reproducible.
+
+_rng = random.Random(settings.FAKE_AI_SEED)
+_rng_lock = threading.Lock()
+
+_INJECTED_ERROR = "[FakeProvider] Injected provider error (429 rate_limit)"
+
+# Characters per chunk in generate_stream()
+STREAM_CHUNK_CHARS = 12
+
+
+# Idealized vendor prefix cache: prompts of at least PREFIX_CACHE_MIN_CHARS
+# (~1024 tokens) reuse the longest previously seen prefix, in whole blocks
+# of PREFIX_CACHE_BLOCK_CHARS (~128 tokens). Reported as cached prompt tokens.
+PREFIX_CACHE_MIN_CHARS = 4096
+PREFIX_CACHE_BLOCK_CHARS = 512
+PREFIX_CACHE_MAX_BLOCKS = 20000
+
+_prefix_blocks: "OrderedDict[bytes, None]" = OrderedDict()
+_prefix_lock = threading.Lock()
+
+
+def _cached_prefix_chars(prompt: str) -> int:
+    """Length of the cached prefix for this call; remembers the prompt's blocks."""
+    if len(prompt) < PREFIX_CACHE_MIN_CHARS:
+        return 0
+    cached, hit = 0, True
+    digest = hashlib.sha1()
+    with _prefix_lock:
+        for end in range(PREFIX_CACHE_BLOCK_CHARS, len(prompt) + 1, PREFIX_CACHE_BLOCK_CHARS):
+            digest.update(prompt[end - PREFIX_CACHE_BLOCK_CHARS:end].encode("utf-8"))
+            key = digest.digest()
+            if hit and key in _prefix_blocks:
+                _prefix_blocks.move_to_end(key)
+                cached = end
+                continue
+            hit = False
+            _prefix_blocks[key] = None
+        while len(_prefix_blocks) > PREFIX_CACHE_MAX_BLOCKS:
+            _prefix_blocks.popitem(last=False)
+    return cached
+
+
+def _report(prompt: str, content: str):
+    report_tokens(len(prompt) // 4, len(content) // 4, _cached_prefix_chars(prompt) // 4)
+
+
+def _draw():
+    with _rng_lock:
+        return _rng.random(), _rng.random(), _rng.gauss(0.0, 1.0)
+
+
+def reseed(seed: int):
+    """Reset the shared RNG and prefix cache (benchmarks call this before each run)."""
+    with _rng_lock:
+        _rng.seed(seed)
+    with _prefix_lock:
+        _prefix_blocks.clear()
+
+
+def _quiz():
+    return {
+        "questions": [
+            {
+                "question": f"Scenario {i + 1}: which approach best fits the requirement?",
+                "options": ["Option A", "Option B", "Option C", "Option D"],
+                "correct_answer": "Option A",
+                "explanation": "Option A satisfies the constraints with the least complexity.",
+            }
+            for i in range(5)
+        ]
+    }
+
+
+_BATCH_SECTION = re.compile(r"^(\d+)\. Topic: (.*?) \| Level: (.*?) \| Questions: (\d+)$", re.MULTILINE)
+
+
+def _quiz_batch(prompt: str):
+    """One section per "N. Topic: ... | Level: ... | Questions: K" line of the prompt."""
+    question = _quiz()["questions"][0]
+    return {
+        "sections": [
+            {"section": int(n), "topic": topic, "level": level, "questions": [dict(question) for _ in range(int(count))]}
+            for n, topic, level, count in _BATCH_SECTION.findall(prompt)
+        ]
+    }
+
+
+def _assignment():
+    return {
+        "title": "Build a small service",
+        "difficulty": "Intermediate",
+        "problem_statement": "Implement a module that parses and validates input records.",
+        "requirements": ["Validate input", "Handle errors", "Write clean code"],
+        "constraints": ["No external libraries"],
+        "expected_output": "A working module with a short README.",
+        "evaluation_criteria": ["Correctness", "Structure", "Edge cases"],
+    }
+
+
+def _evaluation():
+    return {
+        "score": 72,
+        "concept_coverage": "Core concepts applied; edge cases partially handled.",
+        "mistakes": ["Missing input validation for empty records"],
+        "improvement_suggestions": ["Add unit tests", "Handle malformed input explicitly"],
+    }
+
+
+def _resume():
+    return {
+        "skill_relevance": 74,
+        "project_depth": 61,
+        "experience_score": 58,
+        "structure_score": 80,
+        "missing_skills": ["Docker", "System Design"],
+        "recommendations": ["Quantify project impact", "Add a skills section"],
+        "extracted_topics": ["Python", "FastAPI", "React", "SQL"],
+        "suggested_learning_topics": ["Docker", "Kubernetes", "Redis"],
+    }
+
+
+def _plan():
+    return {
+        "weekly_goal": "Strengthen weak topics with daily practice.",
+        "daily_tasks": [
+            {"day": f"Day {d}", "focus_topic": "Python", "tasks": ["Read docs", "Solve two exercises"]}
+            for d in range(1, 8)
+        ],
+        "mini_projects": ["CLI todo app"],
+        "revision_schedule": ["Weekend recap quiz"],
+    }
+
+
+def _resources():
+    return {
+        "topic": "Python",
+        "level": "Basic",
+        "resources": {
+            kind: [{"title": f"{kind.title()} resource", "url": "https://docs.python.org/3/"}]
+            for kind in ("youtube", "documentation", "practice", "articles")
+        },
+    }
+
+
+def _interview_screen():
+    return {
+        "resume_strength_score": 70,
+        "role_skill_match_score": 65,
+        "missing_skills": ["Kubernetes"],
+    }
+
+
+def _interview_questions():
+    return {
+        "questions": [
+            {
+                "question_id": f"q{i + 1}",
+                "difficulty": "Medium",
+                "question_text": f"Question {i + 1}: describe how you would approach this problem.",
+                "expected_keywords": ["trade-offs", "scalability", "testing"],
+                "evaluation_guidelines": "Look for structured reasoning and concrete examples.",
+            }
+            for i in range(2)
+        ],
+    }
+
+
+def _interview_answer():
+    return {
+        "scores": {"keyword": 70, "technical": 65, "logical": 72, "terminology": 60, "completeness": 68, "total": 0},
+        "missing_concepts": ["monitoring"],
+        "feedback": "Solid structure. Add concrete metrics and discuss failure modes.",
+        "communication": {"cci_score": 74, "cci_classification": "Good"},
+    }
+
+
+_VOICE_FEEDBACK = (
+    "Clear answer with a reasonable structure.\n"
+    "1. Lead with the situation in one sentence.\n"
+    "2. Quantify the result.\n"
+    "3. Mention what you would do differently."
+)
+
+# (substring of the prompt, response builder) -- first match wins
+_ROUTES = [
+    ("evaluating a single interview answer", _interview_answer),
+    ("screen the candidate resume", _interview_screen),
+    ("interview question(s) in the category", _interview_questions),
+    ("expert interview coach", lambda: _VOICE_FEEDBACK),
+    ("expert technical evaluator", _evaluation),
+    ("mcqs", _quiz),
+    ("practical assignment", _assignment),
+    ("ats resume analyzer", _resume),
+    ("resource curator", _resources),
+    ("planner", _plan),
+]
+
+
+def canned_response(prompt: str) -> str:
+    lowered = prompt.lower()
+    if "quiz sections" in lowered:
+        # Depends on the prompt, so it is checked ahead of the fixed routes
+        return json.dumps(_quiz_batch(prompt))
+    for needle, builder in _ROUTES:
+        if needle in lowered:
+            payload = builder()
+            return payload if isinstance(payload, str) else json.dumps(payload)
+    return json.dumps({"message": "ok"})
+
+
+class FakeProvider(AIProvider):
+    """Deterministic local provider for benchmarks and offline development."""
+
+    def __init__(self, model: str = "fake", max_output_tokens: Optional[int] = None):
+        self.model = model
+        self.max_output_tokens = max_output_tokens
+        self.median_seconds = settings.FAKE_AI_LATENCY_MS / 1000.0
+        self.sigma = settings.FAKE_AI_LATENCY_SIGMA
+        self.error_rate = settings.FAKE_AI_ERROR_RATE
+        self.invalid_json_rate = settings.FAKE_AI_INVALID_JSON_RATE
+        self.blocking = settings.FAKE_AI_BLOCKING
+
+    def _draw_call(self, prompt: str):
+        """(latency, content) for one call; content is None for an injected error."""
+        error_roll, invalid_roll, noise = _draw()
+        delay = self.median_seconds * math.exp(self.sigma * noise) if self.median_seconds > 0 else 0.0
+        if error_roll < self.error_rate:
+            return delay, None
+
+        content = canned_response(prompt)
+        if invalid_roll < self.invalid_json_rate:
+            content = content[: max(1, len(content) // 2)]
+        if self.max_output_tokens:
+            # Like a vendor stopping at the route's output cap
+            content = content[: self.max_output_tokens * 4]
+        return delay, content
+
+    async def _wait(self, seconds: float):
+        if self.blocking:
+            # Mimic the synchronous vendor SDKs, which the real providers run
+            # in worker threads: the wait occupies a pool thread, not the loop
+            await asyncio.to_thread(time.sleep, seconds)
+        elif seconds:
+            await asyncio.sleep(seconds)
+
+    async def generate(self, prompt: str) -> str:
+        delay, content = self._draw_call(prompt)
+        await self._wait(delay)
+        if content is None:
+            raise RuntimeError(_INJECTED_ERROR)
+        _report(prompt, content)
+        return content
+
+    async def generate_stream(self, prompt: str):
+        """Same content as generate(), in small chunks spread over the latency.
+
+        A quarter of the latency is spent before the first chunk.
+        """
+        delay, content = self._draw_call(prompt)
+        if content is None:
+            await self._wait(delay)
+            raise RuntimeError(_INJECTED_ERROR)
+        chunks = [content[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(content), STREAM_CHUNK_CHARS)]
+        await self._wait(delay * 0.25)
+        gap = delay * 0.75 / max(1, len(chunks))
+        for chunk in chunks:
+            yield chunk
+            await self._wait(gap)
+        _report(prompt, content)
@@ -1,22 +1,73 @@
-from google import genai
+import asyncio
+from typing import AsyncIterator, Optional
+
 from ai.base_provider import AIProvider
-from core.config import settings
+from ai.key_pool import get_key_pool
+from ai.usage import report_tokens
+
+def gemini_client(api_key: str):
+    from google import genai  # heavy SDK, imported on first use
+    return genai.Client(api_key=api_key)
 
 class GeminiProvider(AIProvider):
-    def __init__(self):
-        if not settings.GEMINI_API_KEY or settings.GEMINI_API_KEY == "PASTE_YOUR_GEMINI_KEY_HERE":
+    def __init__(self, model: str = "gemini-2.5-flash", max_output_tokens: Optional[int] = None):
+        # Gemini sends no rate-limit headers: keys are balanced by calls in
+        # flight and quarantined on 429 (ai/key_pool.py)
+        self.pool = get_key_pool("gemini", gemini_client)
+        if self.pool is None:
             raise ValueError("Gemini API Key is missing or not configured correctly.")
-        self.client = genai.Client(api_key=settings.GEMINI_API_KEY)
-        self.model_name = "gemini-2.5-flash"
+        self.model_name = model
+        # Output cap from the call site's route (ai/routing.py)
+        self.config = {"max_output_tokens": max_output_tokens} if max_output_tokens else None
 
     async def generate(self, prompt: str) -> str:
-        """Generate text using Google's gemini-2.5-flash model."""
-        try:
-            response = self.client.models.generate_content(
+        """Generate text using the configured Gemini model."""
+        async def call(key):
+            # The SDK is synchronous: run it in a worker thread so the call
+            # stays in flight on its key without blocking the event loop
+            return await asyncio.to_thread(
+                key.client.models.generate_content,
                 model=self.model_name,
-                contents=prompt
+                contents=prompt,
+                config=self.config,
             )
+
+        try:
+            response = await self.pool.run(call)
+            usage = getattr(response, "usage_metadata", None)
+            if usage is not None:
+                report_tokens(usage.prompt_token_count, usage.candidates_token_count,
+                              getattr(usage, "cached_content_token_count", None))
             return response.text.strip()
         except Exception as e:
             print(f"[GeminiProvider] Error: {str(e)}")
             raise e
+
+    async def generate_stream(self, prompt: str) -> AsyncIterator[str]:
+        """Stream the model output; the blocking SDK iterator runs in a worker thread."""
+        async def call(key):
+            stream = await asyncio.to_thread(
+                key.client.models.generate_content_stream,
+                model=self.model_name,
+                contents=prompt,
+                config=self.config,
+            )
+            # The request is only sent on the first next(); a 429 must surface here
+            chunks = iter(stream)
+            return await asyncio.to_thread(next, chunks, None), chunks
+
+        try:
+            chunk, chunks = await self.pool.run(call)
+            usage = None
+            while chunk is not None:
+                # Usage is cumulative; the last chunk carries the totals
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                if chunk.text:
+                    yield chunk.text
+                chunk = await asyncio.to_thread(next, chunks, None)
+            if usage is not None:
+                report_tokens(usage.prompt_token_count, usage.candidates_token_count,
+                              getattr(usage, "cached_content_token_count", None))
+        except Exception as e:
+            print(f"[GeminiProvider] Stream error: {str(e)}")
+            raise e
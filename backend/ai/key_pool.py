@@ -0,0 +1,256 @@
+import re
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from core.config import settings
+from core.metrics import Counter
+
+# Pools of API keys per vendor.
+#
+# Per-key rate limits are reached long before the server is busy, so each
+# vendor can be given several keys (OPENAI_API_KEY plus OPENAI_API_KEYS,
+# likewise for Gemini). KeyPool.run() sends each call with the key that has
+# the most rate-limit headroom:
+#
+# - headroom is the smaller of remaining/limit for requests and tokens, as
+#   reported by the x-ratelimit-* headers of the key's last response, minus
+#   the calls in flight on it; keys without headers count as full, and ties
+#   go to the key with fewer calls in flight, then the least recently used;
+# - a key answering 429 is quarantined for its Retry-After (or
+#   AI_KEY_QUARANTINE_SECONDS; AI_KEY_QUOTA_QUARANTINE_SECONDS when its
+#   quota is exhausted) and the call is retried once on each other key
+#   that is not in quarantine;
+# - when every key is quarantined the one released soonest is still tried,
+#   so the vendor, not the pool, decides.
+#
+# One SDK client is created per key and reused across calls. Per-key series
+# are rendered for admins only (/api/admin/ai-usage/metrics).
+
+T = TypeVar("T")
+
+_PLACEHOLDERS = {"PASTE_YOUR_KEY_HERE", "PASTE_YOUR_GEMINI_KEY_HERE"}
+
+ai_key_requests = Counter(
+    "ai_key_requests_total", "LLM vendor calls per API key", ("vendor", "key", "outcome"))
+
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+_RETRY_DELAY = re.compile(r"retry_?delay['\"]?\s*[:=]\s*['\"]?(\d+(?:\.\d+)?)s", re.IGNORECASE)
+
+
+def _parse_duration(value: Optional[str]) -> Optional[float]:
+    """Seconds in an OpenAI reset header such as "1s", "6m0s" or "20ms"."""
+    if not value:
+        return None
+    parts = _DURATION.findall(value)
+    return sum(float(n) * _DURATION_SECONDS[unit] for n, unit in parts) if parts else None
+
+
+def _error_status(error: Exception) -> Optional[int]:
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    return status if isinstance(status, int) else None
+
+
+def _error_headers(error: Exception):
+    return getattr(getattr(error, "response", None), "headers", None)
+
+
+def is_rate_limited(error: Exception) -> bool:
+    if _error_status(error) == 429:
+        return True
+    message = str(error).lower()
+    return "429" in message or "rate_limit" in message or "resource_exhausted" in message
+
+
+def _quarantine_seconds(error: Exception) -> float:
+    if "insufficient_quota" in str(error).lower():
+        return settings.AI_KEY_QUOTA_QUARANTINE_SECONDS
+    headers = _error_headers(error)
+    if headers is not None:
+        if headers.get("retry-after-ms"):
+            try:
+                return float(headers["retry-after-ms"]) / 1000.0
+            except ValueError:
+                pass
+        if headers.get("retry-after"):
+            try:
+                return float(headers["retry-after"])
+            except ValueError:
+                pass
+    match = _RETRY_DELAY.search(str(error))
+    if match:
+        return float(match.group(1))
+    return settings.AI_KEY_QUARANTINE_SECONDS
+
+
+class PooledKey:
+    def __init__(self, vendor: str, index: int, secret: str):
+        self.vendor = vendor
+        self.label = f"{vendor}-{index}"
+        self.secret = secret
+        self.client = None
+        self.in_flight = 0
+        self.last_used = 0.0
+        self.quarantined_until = 0.0
+        # From the last response's x-ratelimit-* headers
+        self.remaining_requests: Optional[int] = None
+        self.limit_requests: Optional[int] = None
+        self.remaining_tokens: Optional[int] = None
+        self.limit_tokens: Optional[int] = None
+        self.headroom_resets_at = 0.0
+
+    def headroom(self, now: float) -> float:
+        if now >= self.headroom_resets_at:
+            return 1.0
+        ratios = []
+        if self.limit_requests:
+            ratios.append((self.remaining_requests - self.in_flight) / self.limit_requests)
+        if self.limit_tokens:
+            ratios.append(self.remaining_tokens / self.limit_tokens)
+        return max(0.0, min(ratios)) if ratios else 1.0
+
+
+class KeyPool:
+    def __init__(self, vendor: str, secrets: List[str], client_factory: Callable[[str], object]):
+        self.vendor = vendor
+        self.keys = [PooledKey(vendor, i, secret) for i, secret in enumerate(secrets)]
+        self._client_factory = client_factory
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _acquire(self, tried: set) -> Optional[PooledKey]:
+        now = time.monotonic()
+        with self._lock:
+            candidates = [k for k in self.keys if k.label not in tried]
+            if not candidates:
+                return None
+            available = [k for k in candidates if k.quarantined_until <= now]
+            if available:
+                key = max(available, key=lambda k: (k.headroom(now), -k.in_flight, -k.last_used))
+            elif tried:
+                return None
+            else:
+                key = min(candidates, key=lambda k: k.quarantined_until)
+            key.in_flight += 1
+            key.last_used = now
+            if key.client is None:
+                key.client = self._client_factory(key.secret)
+            return key
+
+    def _release(self, key: PooledKey, outcome: str, quarantine_seconds: float = 0.0):
+        with self._lock:
+            key.in_flight -= 1
+            if quarantine_seconds:
+                key.quarantined_until = max(key.quarantined_until, time.monotonic() + quarantine_seconds)
+        ai_key_requests.inc(self.vendor, key.label, outcome)
+
+    def record_headers(self, key: PooledKey, headers):
+        """Update a key's headroom from x-ratelimit-* response headers."""
+        if headers is None or headers.get("x-ratelimit-limit-requests") is None:
+            return
+        try:
+            limit_requests = int(headers["x-ratelimit-limit-requests"])
+            remaining_requests = int(headers.get("x-ratelimit-remaining-requests", limit_requests))
+            limit_tokens = int(headers.get("x-ratelimit-limit-tokens") or 0) or None
+            remaining_tokens = int(headers.get("x-ratelimit-remaining-tokens") or 0)
+        except ValueError:
+            return
+        resets = [
+            _parse_duration(headers.get("x-ratelimit-reset-requests")),
+            _parse_duration(headers.get("x-ratelimit-reset-tokens")),
+        ]
+        reset_in = max((r for r in resets if r is not None), default=60.0)
+        with self._lock:
+            key.limit_requests, key.remaining_requests = limit_requests, remaining_requests
+            key.limit_tokens, key.remaining_tokens = limit_tokens, remaining_tokens
+            key.headroom_resets_at = time.monotonic() + reset_in
+
+    async def run(self, call: Callable[[PooledKey], Awaitable[T]]) -> T:
+        """Run `call(key)` on the best key; after a 429, try each other key once."""
+        tried, last_error = set(), None
+        while True:
+            key = self._acquire(tried)
+            if key is None:
+                raise last_error
+            try:
+                result = await call(key)
+            except Exception as e:
+                if not is_rate_limited(e):
+                    self._release(key, "error")
+                    raise e
+                seconds = _quarantine_seconds(e)
+                self.record_headers(key, _error_headers(e))
+                self._release(key, "rate_limited", seconds)
+                print(f"[key_pool] {key.label} rate limited; quarantined for {seconds:.0f}s")
+                tried.add(key.label)
+                last_error = e
+                continue
+            self._release(key, "ok")
+            return result
+
+    def snapshot(self) -> list:
+        """Per-key state for the admin view (secrets reduced to their last 4 characters)."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "key": k.label,
+                    "suffix": k.secret[-4:],
+                    "in_flight": k.in_flight,
+                    "headroom": round(k.headroom(now), 4),
+                    "remaining_requests": k.remaining_requests if now < k.headroom_resets_at else None,
+                    "remaining_tokens": k.remaining_tokens if now < k.headroom_resets_at else None,
+                    "quarantined_for_seconds": round(max(0.0, k.quarantined_until - now), 1),
+                }
+                for k in self.keys
+            ]
+
+
+def configured_keys(vendor: str) -> List[str]:
+    """The vendor's keys from settings: the single key first, then the list, deduplicated."""
+    single = getattr(settings, f"{vendor.upper()}_API_KEY")
+    extra = getattr(settings, f"{vendor.upper()}_API_KEYS")
+    keys = []
+    for key in [single] + extra.split(","):
+        key = key.strip()
+        if key and key not in _PLACEHOLDERS and key not in keys:
+            keys.append(key)
+    return keys
+
+
+_pools: Dict[str, KeyPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_key_pool(vendor: str, client_factory: Callable[[str], object]) -> Optional[KeyPool]:
+    """The process-wide pool for `vendor`, or None when no key is configured."""
+    with _pools_lock:
+        pool = _pools.get(vendor)
+        if pool is None:
+            keys = configured_keys(vendor)
+            if not keys:
+                return None
+            pool = _pools[vendor] = KeyPool(vendor, keys, client_factory)
+        return pool
+
+
+def pool_snapshot() -> dict:
+    with _pools_lock:
+        return {vendor: pool.snapshot() for vendor, pool in _pools.items()}
+
+
+def render_prometheus() -> str:
+    lines = ai_key_requests.render()
+    for name, help_text, field in (
+        ("ai_key_headroom_ratio", "Rate-limit headroom per API key (1 = unused)", "headroom"),
+        ("ai_key_in_flight", "LLM calls in flight per API key", "in_flight"),
+        ("ai_key_quarantined_seconds", "Seconds until a rate-limited API key is used again", "quarantined_for_seconds"),
+    ):
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+        for vendor, keys in pool_snapshot().items():
+            for k in keys:
+                lines.append(f'{name}{{vendor="{vendor}",key="{k["key"]}"}} {k[field]}')
+    return "\n".join(lines) + "\n"
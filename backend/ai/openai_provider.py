@@ -1,22 +1,81 @@
-from openai import OpenAI
+import asyncio
+from typing import AsyncIterator, Optional
+
 from ai.base_provider import AIProvider
-from core.config import settings
+from ai.key_pool import configured_keys, get_key_pool
+from ai.usage import report_tokens
+
+def _cached_tokens(usage):
+    """Prompt tokens served from OpenAI's automatic prefix cache."""
+    details = getattr(usage, "prompt_tokens_details", None)
+    return getattr(details, "cached_tokens", None) if details is not None else None
+
+def openai_client(api_key: str):
+    from openai import OpenAI  # heavy SDK, imported on first use
+    if len(configured_keys("openai")) > 1:
+        # Let the pool retry a 429 on another key instead of the SDK waiting on this one
+        return OpenAI(api_key=api_key, max_retries=0)
+    return OpenAI(api_key=api_key)
 
 class OpenAIProvider(AIProvider):
-    def __init__(self):
-        if not settings.OPENAI_API_KEY or settings.OPENAI_API_KEY == "PASTE_YOUR_KEY_HERE":
+    def __init__(self, model: str = "gpt-4o-mini", max_output_tokens: Optional[int] = None):
+        # Keys are load-balanced by rate-limit headroom (ai/key_pool.py)
+        self.pool = get_key_pool("openai", openai_client)
+        if self.pool is None:
             raise ValueError("OpenAI API Key is missing or not configured correctly.")
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        self.model = model
+        # Output cap from the call site's route (ai/routing.py)
+        self.options = {"max_completion_tokens": max_output_tokens} if max_output_tokens else {}
 
     async def generate(self, prompt: str) -> str:
-        """Generate text using OpenAI's gpt-4o-mini model."""
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
+        """Generate text using the configured OpenAI chat model."""
+        async def call(key):
+            # The SDK is synchronous: run it in a worker thread so the call
+            # stays in flight on its key without blocking the event loop
+            raw = await asyncio.to_thread(
+                key.client.chat.completions.with_raw_response.create,
+                model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.7,
+                **self.options,
             )
+            self.pool.record_headers(key, raw.headers)
+            return raw.parse()
+
+        try:
+            response = await self.pool.run(call)
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                report_tokens(usage.prompt_tokens, usage.completion_tokens, _cached_tokens(usage))
             return response.choices[0].message.content.strip()
         except Exception as e:
             print(f"[OpenAIProvider] Error: {str(e)}")
             raise e
+
+    async def generate_stream(self, prompt: str) -> AsyncIterator[str]:
+        """Stream the model output; the blocking SDK iterator runs in a worker thread."""
+        async def call(key):
+            raw = await asyncio.to_thread(
+                key.client.chat.completions.with_raw_response.create,
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.7,
+                stream=True,
+                **self.options,
+                stream_options={"include_usage": True},
+            )
+            self.pool.record_headers(key, raw.headers)
+            return raw.parse()
+
+        try:
+            stream = await self.pool.run(call)
+            chunks = iter(stream)
+            while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+                usage = getattr(chunk, "usage", None)
+                if usage is not None:
+                    report_tokens(usage.prompt_tokens, usage.completion_tokens, _cached_tokens(usage))
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            print(f"[OpenAIProvider] Stream error: {str(e)}")
+            raise e
@@ -0,0 +1,81 @@
+import hashlib
+import string
+import threading
+from typing import Dict, Optional
+
+# Prompt templates.
+#
+# Providers cache the longest previously seen *prefix* of a prompt, so every
+# prompt is laid out as
+#
+#     <static instructions and output schema>   identical for every call
+#     <per-request data>                          topic, role, resume, answer...
+#
+# PromptTemplate enforces that split: `instructions` is a constant string
+# (no placeholders), `data` is a string.Template with $placeholders compiled
+# once at import. Templates carry a version, bumped whenever the
+# instructions change, and are registered in `prompt_registry` so the admin
+# usage view can report cached-token ratios per template version.
+
+
+class Prompt(str):
+    """A rendered prompt; remembers which template produced it."""
+
+    template_id: Optional[str] = None
+
+
+class PromptTemplate:
+    def __init__(self, name: str, version: int, instructions: str, data: str = ""):
+        if "$" in instructions:
+            raise ValueError(f"Prompt template '{name}': instructions must be static (found '$')")
+        self.name = name
+        self.version = version
+        self.instructions = instructions.rstrip("\n") + "\n\n"
+        self._data = string.Template(data)
+        # Validate placeholders up front rather than on the first request
+        self.fields = frozenset(
+            m.group("named") or m.group("braced")
+            for m in string.Template.pattern.finditer(data)
+            if m.group("named") or m.group("braced")
+        )
+        self.fingerprint = hashlib.sha1(self.instructions.encode("utf-8")).hexdigest()[:12]
+
+    @property
+    def id(self) -> str:
+        return f"{self.name}@v{self.version}"
+
+    def render(self, **values) -> Prompt:
+        missing = self.fields - values.keys()
+        if missing:
+            raise KeyError(f"Prompt template '{self.id}' is missing values for: {', '.join(sorted(missing))}")
+        prompt = Prompt(self.instructions + self._data.substitute(**{k: str(v) for k, v in values.items()}))
+        prompt.template_id = self.id
+        return prompt
+
+
+class PromptRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._templates: Dict[str, PromptTemplate] = {}
+
+    def register(self, template: PromptTemplate) -> PromptTemplate:
+        with self._lock:
+            if template.name in self._templates:
+                raise ValueError(f"Duplicate prompt template: {template.name}")
+            self._templates[template.name] = template
+        return template
+
+    def get(self, name: str) -> PromptTemplate:
+        return self._templates[name]
+
+    def describe(self) -> list:
+        """[{name, version, fingerprint, static_chars}] for the admin view."""
+        with self._lock:
+            return [
+                {"name": t.name, "version": t.version, "fingerprint": t.fingerprint,
+                 "static_chars": len(t.instructions)}
+                for t in sorted(self._templates.values(), key=lambda t: t.name)
+            ]
+
+
+prompt_registry = PromptRegistry()
@@ -1,7 +1,12 @@
+from typing import Optional
+
 from core.config import settings
 from ai.openai_provider import OpenAIProvider
 from ai.gemini_provider import GeminiProvider
 from ai.base_provider import AIProvider
+from ai.key_pool import configured_keys
+from ai.routing import Route, fallback_tier, route_for, route_label, tier_model
+from ai.usage import CallTimer, report_fallback, report_route, report_route_failure
 
 class FallbackProvider(AIProvider):
     def __init__(self, primary: AIProvider, secondary: AIProvider):
@@ -16,6 +21,7 @@ class FallbackProvider(AIProvider):
             error_msg = str(e).lower()
             if "insufficient_quota" in error_msg or "429" in error_msg or "rate_limit" in error_msg:
                 print(f"[FallbackProvider] Primary provider failed ({error_msg}). Falling back to Gemini...")
+                report_fallback()
                 try:
                     return await self.secondary.generate(prompt)
                 except Exception as secondary_error:
@@ -23,16 +29,97 @@ class FallbackProvider(AIProvider):
                     raise secondary_error
             raise e
 
-def get_ai_provider():
-    """Factory function to get the configured AI provider, with optional fallback."""
+    async def generate_stream(self, prompt: str):
+        # Fall back only if the primary fails before producing anything
+        started = False
+        try:
+            async for chunk in self.primary.generate_stream(prompt):
+                started = True
+                yield chunk
+            return
+        except Exception as e:
+            error_msg = str(e).lower()
+            quota = "insufficient_quota" in error_msg or "429" in error_msg or "rate_limit" in error_msg
+            if started or not quota:
+                raise e
+            print(f"[FallbackProvider] Primary provider failed ({error_msg}). Falling back to Gemini...")
+            report_fallback()
+        async for chunk in self.secondary.generate_stream(prompt):
+            yield chunk
+
+class RoutedProvider(AIProvider):
+    """Serves a call site on its routed tier (ai/routing.py).
+
+    If the call fails, it is retried once on the tier's fallback tier. A
+    stream is only retried if it failed before producing anything.
+    """
+
+    def __init__(self, call_site: str, route: Route):
+        self.call_site = call_site
+        self.route = route
+        self.primary = _build_provider(route.tier, route.max_output_tokens)
+        self.fallback = fallback_tier(route.tier)
+
+    def _fall_back(self, error: Exception) -> AIProvider:
+        print(f"[provider_factory] '{self.call_site}' failed on the {self.route.tier} tier ({str(error)}). "
+              f"Retrying on {self.fallback}...")
+        report_route_failure(route_label(self.call_site, self.route.tier))
+        report_fallback()
+        report_route(route_label(self.call_site, self.fallback))
+        return _build_provider(self.fallback, self.route.max_output_tokens)
+
+    async def generate(self, prompt: str) -> str:
+        report_route(route_label(self.call_site, self.route.tier))
+        try:
+            return await self.primary.generate(prompt)
+        except Exception as e:
+            if self.fallback is None:
+                raise e
+            secondary = self._fall_back(e)
+        return await secondary.generate(prompt)
+
+    async def generate_stream(self, prompt: str):
+        report_route(route_label(self.call_site, self.route.tier))
+        started = False
+        try:
+            async for chunk in self.primary.generate_stream(prompt):
+                started = True
+                yield chunk
+            return
+        except Exception as e:
+            if started or self.fallback is None:
+                raise e
+            secondary = self._fall_back(e)
+        async for chunk in secondary.generate_stream(prompt):
+            yield chunk
+
+class InstrumentedProvider(AIProvider):
+    """Records latency, token usage and errors of every call under a call-site label."""
+
+    def __init__(self, inner: AIProvider, call_site: str, slo_seconds: Optional[float] = None):
+        self.inner = inner
+        self.call_site = call_site
+        self.slo_seconds = slo_seconds
+
+    async def generate(self, prompt: str) -> str:
+        with CallTimer(self.call_site, getattr(prompt, "template_id", None), self.slo_seconds):
+            return await self.inner.generate(prompt)
+
+    async def generate_stream(self, prompt: str):
+        # Latency covers the whole stream, first chunk to last
+        with CallTimer(self.call_site, getattr(prompt, "template_id", None), self.slo_seconds):
+            async for chunk in self.inner.generate_stream(prompt):
+                yield chunk
+
+def _build_provider(tier: str = "standard", max_output_tokens: Optional[int] = None) -> AIProvider:
     provider_type = settings.AI_PROVIDER.lower()
 
     if provider_type == "openai":
-        openai_p = OpenAIProvider()
+        openai_p = OpenAIProvider(tier_model(tier, "openai"), max_output_tokens)
         # Enable fallback to Gemini if API key is present
-        if settings.GEMINI_API_KEY and settings.GEMINI_API_KEY != "PASTE_YOUR_GEMINI_KEY_HERE":
+        if configured_keys("gemini"):
             try:
-                gemini_p = GeminiProvider()
+                gemini_p = GeminiProvider(tier_model(tier, "gemini"), max_output_tokens)
                 return FallbackProvider(openai_p, gemini_p)
             except Exception as e:
                 print(f"[provider_factory] Could not initialize Gemini for fallback: {e}")
@@ -40,7 +127,21 @@ def get_ai_provider():
         return openai_p
 
     elif provider_type == "gemini":
-        return GeminiProvider()
-    
+        return GeminiProvider(tier_model(tier, "gemini"), max_output_tokens)
+
+    elif provider_type == "fake":
+        from ai.fake_provider import FakeProvider
+        return FakeProvider(f"fake-{tier}", max_output_tokens)
+
     else:
         raise ValueError(f"Unsupported AI_PROVIDER: {provider_type}")
+
+def get_ai_provider(call_site: str = "unknown"):
+    """Factory function to get the configured AI provider, with optional fallback.
+
+    `call_site` selects the model route (ai/routing.py) and labels the usage
+    metrics recorded for calls made through it (e.g. "quiz", "evaluate",
+    "interview").
+    """
+    route = route_for(call_site)
+    return InstrumentedProvider(RoutedProvider(call_site, route), call_site, route.latency_slo_seconds)
@@ -0,0 +1,104 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional
+
+from core.config import settings
+
+# Model routing by task complexity.
+#
+# Every call site (the label passed to get_ai_provider) is mapped to a route:
+# a model tier, a cap on output tokens and a latency SLO. Tiers resolve to a
+# concrete model per vendor through settings, so bulk, low-stakes calls
+# (resource lists, study plans) go to a cheap fast model while evaluations
+# keep a stronger one. A tier may name a fallback tier that is tried once
+# when its own call fails.
+#
+# Calls are recorded per route ("call_site@tier:model") in ai/usage.py,
+# including SLO breaches, so the quality/latency of each choice can be
+# compared before moving a call site between tiers.
+
+TIERS = ("fast", "standard", "strong")
+
+
+@dataclass(frozen=True)
+class Route:
+    tier: str
+    max_output_tokens: Optional[int]
+    latency_slo_seconds: float
+
+
+ROUTES: Dict[str, Route] = {
+    "resources": Route("fast", 800, 6.0),
+    "plan": Route("fast", 1200, 8.0),
+    "quiz": Route("standard", 2000, 10.0),
+    "quiz_batch": Route("standard", 6000, 30.0),
+    "assignment": Route("standard", 1500, 10.0),
+    "resume": Route("standard", 1200, 10.0),
+    "interview": Route("standard", 1500, 12.0),
+    "interview_answer": Route("standard", 600, 6.0),
+    "evaluate": Route("strong", 1000, 15.0),
+}
+
+DEFAULT_ROUTE = Route("standard", None, 15.0)
+
+
+def _parse_pairs(raw: str) -> Dict[str, str]:
+    pairs = {}
+    for item in raw.split(","):
+        if "=" in item:
+            key, value = item.split("=", 1)
+            pairs[key.strip()] = value.strip()
+    return pairs
+
+
+@lru_cache(maxsize=4)
+def _overrides(raw: str) -> Dict[str, Route]:
+    """Parse AI_ROUTE_OVERRIDES: "call_site=tier[:max_output_tokens[:slo_seconds]],..."."""
+    routes = {}
+    for call_site, spec in _parse_pairs(raw).items():
+        parts = spec.split(":")
+        base = ROUTES.get(call_site, DEFAULT_ROUTE)
+        tier = parts[0] or base.tier
+        if tier not in TIERS:
+            raise ValueError(f"AI_ROUTE_OVERRIDES: unknown tier '{tier}' for {call_site}")
+        max_tokens = int(parts[1]) if len(parts) > 1 and parts[1] else base.max_output_tokens
+        slo = float(parts[2]) if len(parts) > 2 and parts[2] else base.latency_slo_seconds
+        routes[call_site] = Route(tier, max_tokens or None, slo)
+    return routes
+
+
+@lru_cache(maxsize=4)
+def _fallbacks(raw: str) -> Dict[str, str]:
+    fallbacks = _parse_pairs(raw)
+    for tier, fallback in fallbacks.items():
+        if tier not in TIERS or fallback not in TIERS:
+            raise ValueError(f"AI_TIER_FALLBACKS: unknown tier in '{tier}={fallback}'")
+    return fallbacks
+
+
+def route_for(call_site: str) -> Route:
+    override = _overrides(settings.AI_ROUTE_OVERRIDES).get(call_site)
+    return override or ROUTES.get(call_site, DEFAULT_ROUTE)
+
+
+def tier_model(tier: str, vendor: str) -> str:
+    """The model serving `tier` on `vendor` ("openai" or "gemini")."""
+    return getattr(settings, f"AI_MODEL_{tier.upper()}_{vendor.upper()}")
+
+
+def fallback_tier(tier: str) -> Optional[str]:
+    """The tier to retry on when a call on `tier` fails, if it uses other models."""
+    fallback = _fallbacks(settings.AI_TIER_FALLBACKS).get(tier)
+    if not fallback or fallback == tier:
+        return None
+    if all(tier_model(fallback, v) == tier_model(tier, v) for v in ("openai", "gemini")):
+        return None
+    return fallback
+
+
+def route_label(call_site: str, tier: Optional[str] = None) -> str:
+    """Usage key of a route, e.g. "evaluate@strong:gpt-4o"."""
+    tier = tier or route_for(call_site).tier
+    vendor = settings.AI_PROVIDER.lower()
+    model = tier_model(tier, vendor) if vendor in ("openai", "gemini") else vendor
+    return f"{call_site}@{tier}:{model}"
@@ -0,0 +1,144 @@
+import asyncio
+import codecs
+import tempfile
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+from ai.key_pool import get_key_pool
+from ai.openai_provider import openai_client
+from ai.usage import CallTimer
+from core.config import settings
+
+# Speech-to-text backends for voice answers.
+#
+# A backend consumes audio as an async stream of byte chunks and yields
+# TranscriptEvents: zero or more partial transcripts while audio is still
+# arriving or being decoded, then exactly one final transcript. Select one
+# with STT_BACKEND ("openai" or "fake"; empty follows AI_PROVIDER).
+
+
+@dataclass
+class TranscriptEvent:
+    text: str
+    final: bool = False
+
+
+class STTBackend:
+    async def transcribe_stream(self, chunks: AsyncIterator[bytes], filename: str) -> AsyncIterator[TranscriptEvent]:
+        raise NotImplementedError("Subclasses must implement transcribe_stream()")
+
+
+class AudioTooLarge(ValueError):
+    pass
+
+
+async def _spool(chunks: AsyncIterator[bytes]):
+    """Collect an upload into a temp file that stays in memory while small."""
+    spool = tempfile.SpooledTemporaryFile(max_size=settings.STT_SPOOL_MEMORY_BYTES)
+    size = 0
+    async for chunk in chunks:
+        size += len(chunk)
+        if size > settings.STT_MAX_AUDIO_BYTES:
+            spool.close()
+            raise AudioTooLarge(f"Audio exceeds {settings.STT_MAX_AUDIO_BYTES} bytes.")
+        spool.write(chunk)
+    spool.seek(0)
+    return spool, size
+
+
+class OpenAISTT(STTBackend):
+    """gpt-4o-transcribe with streamed transcript deltas.
+
+    The vendor needs the complete file before it starts decoding, so audio is
+    spooled as it arrives (in memory up to STT_SPOOL_MEMORY_BYTES, then on
+    disk) and uploaded when the stream ends; the transcript then streams
+    back as delta events. Calls share the OpenAI key pool (ai/key_pool.py).
+    """
+
+    def __init__(self):
+        self.pool = get_key_pool("openai", openai_client)
+        if self.pool is None:
+            raise ValueError("OpenAI API Key is missing or not configured correctly.")
+
+    async def transcribe_stream(self, chunks, filename):
+        spool, size = await _spool(chunks)
+        try:
+            if not size:
+                yield TranscriptEvent("", final=True)
+                return
+            async def call(key):
+                spool.seek(0)  # a rate-limited attempt may have read it
+                return await asyncio.to_thread(
+                    key.client.audio.transcriptions.create,
+                    model=settings.STT_MODEL,
+                    file=(filename, spool),
+                    stream=True,
+                )
+
+            with CallTimer("transcribe"):
+                stream = await self.pool.run(call)
+                events = iter(stream)
+                text = ""
+                while (event := await asyncio.to_thread(next, events, None)) is not None:
+                    kind = getattr(event, "type", "")
+                    if kind == "transcript.text.delta":
+                        text += event.delta
+                        yield TranscriptEvent(text)
+                    elif kind == "transcript.text.done":
+                        text = event.text
+            yield TranscriptEvent(text.strip(), final=True)
+        except Exception as e:
+            print(f"[stt] OpenAI transcription error: {str(e)}")
+            raise e
+        finally:
+            spool.close()
+
+
+class FakeSTT(STTBackend):
+    """Offline stand-in: the "audio" is UTF-8 text, transcribed as it arrives.
+
+    Every complete word received so far is emitted as a partial transcript,
+    after FAKE_STT_LATENCY_MS per chunk; anything that does not decode as
+    text transcribes to a fixed sentence.
+    """
+
+    DEFAULT_TEXT = "I would start by clarifying the requirements and then discuss the trade-offs."
+
+    async def transcribe_stream(self, chunks, filename):
+        delay = settings.FAKE_STT_LATENCY_MS / 1000.0
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        received = bytearray()
+        text = ""
+        complete = 0  # end of the last complete word in `text`
+        emitted = ""
+        async for chunk in chunks:
+            received += chunk
+            if len(received) > settings.STT_MAX_AUDIO_BYTES:
+                raise AudioTooLarge(f"Audio exceeds {settings.STT_MAX_AUDIO_BYTES} bytes.")
+            if delay:
+                await asyncio.sleep(delay)
+            # Decode only the new bytes; only words followed by whitespace are complete
+            piece = decoder.decode(chunk)
+            space = piece.rfind(" ")
+            if space >= 0:
+                complete = len(text) + space
+            text += piece
+            if space >= 0:
+                partial = text[:complete].strip()
+                if partial and partial != emitted:
+                    emitted = partial
+                    yield TranscriptEvent(partial)
+        try:
+            text = received.decode("utf-8").strip()
+        except UnicodeDecodeError:
+            text = self.DEFAULT_TEXT if received else ""
+        yield TranscriptEvent(text, final=True)
+
+
+def get_stt_backend(backend: Optional[str] = None) -> STTBackend:
+    backend = (backend or settings.STT_BACKEND or ("fake" if settings.AI_PROVIDER == "fake" else "openai")).lower()
+    if backend == "openai":
+        return OpenAISTT()
+    if backend == "fake":
+        return FakeSTT()
+    raise ValueError(f"Unsupported STT_BACKEND: {backend}")
@@ -0,0 +1,197 @@
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from ai.routing import route_label
+from core.metrics import ai_request_duration
+from core.request_context import current_endpoint, current_user_id
+
+# Token/latency accounting for every LLM call.
+#
+# Providers report token counts for the call in flight via report_tokens();
+# InstrumentedProvider (see provider_factory) times each call and folds the
+# result into the process-wide `usage_stats`, aggregated per call site, per
+# prompt template, per model route (ai/routing.py), per user and per HTTP
+# endpoint. These counters are only served to admins (/api/admin/ai-usage and
+# /api/admin/ai-usage/metrics), not on the public /metrics.
+
+_COUNTERS = (
+    "calls",
+    "errors",
+    "prompt_tokens",
+    "cached_prompt_tokens",
+    "completion_tokens",
+    "latency_seconds_total",
+    "retries",
+    "fallbacks",
+    "slo_breaches",
+    "cache_hits",
+)
+
+# Token usage reported by the concrete provider for the call in flight
+_current_call: ContextVar[Optional[dict]] = ContextVar("ai_current_call", default=None)
+
+
+def report_tokens(prompt_tokens: Optional[int], completion_tokens: Optional[int],
+                  cached_prompt_tokens: Optional[int] = None):
+    """Called by concrete providers once the vendor response is available.
+
+    `cached_prompt_tokens` is the part of the prompt the vendor served from
+    its prefix cache (see ai/prompts.py).
+    """
+    call = _current_call.get()
+    if call is None:
+        return
+    call["prompt_tokens"] += prompt_tokens or 0
+    call["cached_prompt_tokens"] += cached_prompt_tokens or 0
+    call["completion_tokens"] += completion_tokens or 0
+
+
+def report_fallback():
+    """Called by FallbackProvider when the secondary vendor is used."""
+    call = _current_call.get()
+    if call is not None:
+        call["fallbacks"] += 1
+
+
+def report_route(route: str):
+    """Called by RoutedProvider with the route that actually served the call."""
+    call = _current_call.get()
+    if call is not None:
+        call["route"] = route
+
+
+def report_route_failure(route: str):
+    """Called by RoutedProvider when a route failed and the call moved to its fallback."""
+    call = _current_call.get()
+    if call is not None:
+        call["failed_routes"].append(route)
+
+
+class UsageStats:
+    """Thread-safe in-process aggregation of AI usage."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: Dict[Tuple[str, str], Dict[str, float]] = {}
+
+    def _bump(self, dimension: str, key, values: dict):
+        bucket = self._totals.get((dimension, str(key)))
+        if bucket is None:
+            bucket = self._totals[(dimension, str(key))] = dict.fromkeys(_COUNTERS, 0)
+            bucket["latency_seconds_max"] = 0.0
+        for name, value in values.items():
+            if name == "latency_seconds_max":
+                bucket[name] = max(bucket[name], value)
+            else:
+                bucket[name] += value
+
+    def record(self, call_site: str, template: Optional[str] = None, route: Optional[str] = None, **values):
+        """Add counter values for a call site, prompt template, route and the current user/endpoint."""
+        user_id = current_user_id()
+        endpoint = current_endpoint()
+        with self._lock:
+            self._bump("call_site", call_site, values)
+            if template:
+                self._bump("template", template, values)
+            if route:
+                self._bump("route", route, values)
+            if user_id is not None:
+                self._bump("user", user_id, values)
+            if endpoint:
+                self._bump("endpoint", endpoint, values)
+
+    def record_route(self, route: str, **values):
+        """Add counter values for a route alone (an attempt that was retried elsewhere)."""
+        with self._lock:
+            self._bump("route", route, values)
+
+    def snapshot(self) -> dict:
+        """Return {dimension: {key: counters}} suitable for JSON."""
+        out = {"call_site": {}, "template": {}, "route": {}, "user": {}, "endpoint": {}}
+        with self._lock:
+            for (dimension, key), bucket in self._totals.items():
+                counters = dict(bucket)
+                counters["latency_seconds_avg"] = (
+                    round(bucket["latency_seconds_total"] / bucket["calls"], 4) if bucket["calls"] else 0.0
+                )
+                counters["cached_token_ratio"] = (
+                    round(bucket["cached_prompt_tokens"] / bucket["prompt_tokens"], 4) if bucket["prompt_tokens"] else 0.0
+                )
+                out[dimension][key] = counters
+        return out
+
+    def reset(self):
+        with self._lock:
+            self._totals.clear()
+
+    def render_prometheus(self) -> str:
+        """Render counters in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            # Per-user series would explode label cardinality; those stay in snapshot()
+            items = sorted((k, dict(v)) for k, v in self._totals.items() if k[0] != "user")
+        for name in _COUNTERS + ("latency_seconds_max",):
+            metric = f"ai_{name}" if name.startswith("latency") else f"ai_{name}_total"
+            metric_type = "gauge" if name == "latency_seconds_max" else "counter"
+            lines.append(f"# TYPE {metric} {metric_type}")
+            for (dimension, key), bucket in items:
+                label = key.replace("\\", "\\\\").replace('"', '\\"')
+                lines.append(f'{metric}{{{dimension}="{label}"}} {bucket[name]}')
+        return "\n".join(lines) + "\n"
+
+
+usage_stats = UsageStats()
+
+
+def record_retry(call_site: str):
+    """Services call this when re-prompting after an unusable response.
+
+    Retries are the per-route quality signal: they are attributed to the
+    route the call site is configured for.
+    """
+    usage_stats.record(call_site, route=route_label(call_site), retries=1)
+
+
+def record_cache_hit(call_site: str):
+    """Callers record a served-from-cache result that skipped the provider."""
+    usage_stats.record(call_site, cache_hits=1)
+
+
+class CallTimer:
+    """Context manager used by InstrumentedProvider around a single generate()."""
+
+    def __init__(self, call_site: str, template: Optional[str] = None, slo_seconds: Optional[float] = None):
+        self.call_site = call_site
+        self.template = template
+        self.slo_seconds = slo_seconds
+        self.call = {"prompt_tokens": 0, "cached_prompt_tokens": 0, "completion_tokens": 0, "fallbacks": 0,
+                     "route": None, "failed_routes": []}
+
+    def __enter__(self):
+        self._token = _current_call.set(self.call)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        latency = time.perf_counter() - self._start
+        _current_call.reset(self._token)
+        ai_request_duration.observe(latency, self.call_site, "error" if exc_type else "ok")
+        usage_stats.record(
+            self.call_site,
+            template=self.template,
+            route=self.call["route"],
+            calls=1,
+            errors=1 if exc_type else 0,
+            prompt_tokens=self.call["prompt_tokens"],
+            cached_prompt_tokens=self.call["cached_prompt_tokens"],
+            completion_tokens=self.call["completion_tokens"],
+            fallbacks=self.call["fallbacks"],
+            slo_breaches=1 if self.slo_seconds is not None and latency > self.slo_seconds else 0,
+            latency_seconds_total=latency,
+            latency_seconds_max=latency,
+        )
+        for route in self.call["failed_routes"]:
+            usage_stats.record_route(route, calls=1, errors=1)
+        return False
@@ -0,0 +1,131 @@
+"""Rewrite stored topic names to their canonical form (services/topic_registry.py).
+
+Run after adding topics or aliases to the registry. Renames topics on quiz
+attempts, assignments and resume data in batches, merges TopicMastery rows
+that collapse onto the same canonical topic, bumps data_version for every
+affected user and finally recomputes mastery for just those users so merged
+topics reflect their combined history.
+
+Usage:
+    python backfill_topics.py --dry-run
+    python backfill_topics.py --batch-size 2000
+"""
+import argparse
+import sys
+
+sys.path.insert(0, '.')
+
+from sqlalchemy import bindparam, select, text, update
+
+from database import engine
+from migrations import batched_backfill
+from models.quiz import UserResumeData
+from services.mastery_batch import recompute_all
+from services.topic_registry import canonical_topic, canonical_topics
+
+parser = argparse.ArgumentParser(description="Canonicalize stored topic names")
+parser.add_argument("--batch-size", type=int, default=1000)
+parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+parser.add_argument("--skip-recompute", action="store_true", help="Do not recompute mastery afterwards")
+args = parser.parse_args()
+
+touched_users = set()
+
+
+def rename_column(table: str) -> int:
+    def compute(row):
+        topic = canonical_topic(row["topic"])
+        if topic == row["topic"]:
+            return None
+        touched_users.add(row["user_id"])
+        return {"id": row["id"], "topic": topic}
+
+    if args.dry_run:
+        with engine.connect() as conn:
+            rows = conn.execute(text(f"SELECT id, user_id, topic FROM {table}")).mappings()
+            return sum(1 for r in rows if compute(dict(r)) is not None)
+    return batched_backfill(
+        engine,
+        f"SELECT id, user_id, topic FROM {table} WHERE id > :last_id ORDER BY id LIMIT :limit",
+        compute,
+        f"UPDATE {table} SET topic = :topic WHERE id = :id",
+        batch_size=args.batch_size,
+    )
+
+
+def rename_resume_topics() -> int:
+    table = UserResumeData.__table__
+    changed, last_id = 0, 0
+    while True:
+        with engine.connect() as conn:
+            rows = conn.execute(
+                select(table.c.id, table.c.user_id, table.c.topics, table.c.suggested_topics)
+                .where(table.c.id > last_id).order_by(table.c.id).limit(args.batch_size)
+            ).all()
+        if not rows:
+            return changed
+        updates = []
+        for row_id, user_id, topics, suggested in rows:
+            new_topics = canonical_topics(topics or [])
+            new_suggested = canonical_topics(suggested) if suggested is not None else None
+            if new_topics != (topics or []) or new_suggested != suggested:
+                updates.append({"row_id": row_id, "new_topics": new_topics, "new_suggested": new_suggested})
+                touched_users.add(user_id)
+        if updates and not args.dry_run:
+            with engine.begin() as conn:
+                conn.execute(
+                    update(table).where(table.c.id == bindparam("row_id"))
+                    .values(topics=bindparam("new_topics"), suggested_topics=bindparam("new_suggested")),
+                    updates,
+                )
+        changed += len(updates)
+        last_id = rows[-1][0]
+
+
+def merge_mastery() -> int:
+    """Rename mastery rows; drop a variant if its canonical row already exists."""
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT id, user_id, topic FROM topic_mastery ORDER BY id")).all()
+    existing = {(user_id, topic) for _, user_id, topic in rows}
+    renames, deletes = [], []
+    for row_id, user_id, topic in rows:
+        canonical = canonical_topic(topic)
+        if canonical == topic:
+            continue
+        touched_users.add(user_id)
+        if (user_id, canonical) in existing:
+            deletes.append({"id": row_id})
+        else:
+            renames.append({"id": row_id, "topic": canonical})
+            existing.add((user_id, canonical))
+    if not args.dry_run and (renames or deletes):
+        with engine.begin() as conn:
+            if deletes:
+                conn.execute(text("DELETE FROM topic_mastery WHERE id = :id"), deletes)
+            if renames:
+                conn.execute(text("UPDATE topic_mastery SET topic = :topic WHERE id = :id"), renames)
+    return len(renames) + len(deletes)
+
+
+counts = {
+    "quiz_attempts": rename_column("quiz_attempts"),
+    "assignments": rename_column("assignments"),
+    "user_resume_data": rename_resume_topics(),
+    "topic_mastery": merge_mastery(),
+}
+
+if touched_users and not args.dry_run:
+    with engine.begin() as conn:
+        conn.execute(
+            text("UPDATE users SET data_version = data_version + 1 WHERE id = :id"),
+            [{"id": u} for u in sorted(touched_users)],
+        )
+
+print(f"[backfill_topics] {'Would change' if args.dry_run else 'Changed'} rows:")
+for table, count in counts.items():
+    print(f"  {table:<20} {count:>8}")
+print(f"  users affected       {len(touched_users):>8}")
+
+if not args.dry_run and not args.skip_recompute and touched_users:
+    stats = recompute_all(engine, dry_run=False, user_ids=touched_users)
+    print(f"[backfill_topics] Mastery recomputed: {stats['updated']} updated, {stats['inserted']} inserted")
@@ -0,0 +1,203 @@
+"""Offline end-to-end load benchmark for the FastAPI app.
+
+Drives the full app in-process (httpx ASGI transport, no server, no network)
+with the fake AI provider. Every virtual user runs the typical student
+journey: signup, login, resume analysis, quiz, assignment, dashboard and a
+mock interview. Reports throughput and p50/p95/p99 latency per endpoint.
+
+Usage:
+    python bench_load.py --users 50 --concurrency 10 --ai-latency-ms 300
+    python bench_load.py --json results.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+parser = argparse.ArgumentParser(description="Offline end-to-end load benchmark")
+parser.add_argument("--users", type=int, default=20, help="Total virtual users (journeys) to run")
+parser.add_argument("--concurrency", type=int, default=5, help="Journeys running at the same time")
+parser.add_argument("--ai-latency-ms", type=float, default=200.0, help="Median fake AI latency")
+parser.add_argument("--ai-sigma", type=float, default=0.5, help="Log-normal spread of fake AI latency")
+parser.add_argument("--ai-error-rate", type=float, default=0.0, help="Fraction of AI calls that fail")
+parser.add_argument("--ai-invalid-json-rate", type=float, default=0.0, help="Fraction of AI calls returning broken JSON")
+parser.add_argument("--ai-blocking", action="store_true", help="Run AI calls in worker threads like the vendor SDKs")
+parser.add_argument("--seed", type=int, default=1234)
+parser.add_argument("--database-url", default=None, help="Defaults to a throwaway SQLite file")
+parser.add_argument("--json", dest="json_out", default=None, help="Also write results to this JSON file")
+args = parser.parse_args()
+
+# Settings are read at import time, so configure the environment first
+_workdir = tempfile.mkdtemp(prefix="bench_")
+os.environ["AI_PROVIDER"] = "fake"
+os.environ["FAKE_AI_LATENCY_MS"] = str(args.ai_latency_ms)
+os.environ["FAKE_AI_LATENCY_SIGMA"] = str(args.ai_sigma)
+os.environ["FAKE_AI_ERROR_RATE"] = str(args.ai_error_rate)
+os.environ["FAKE_AI_INVALID_JSON_RATE"] = str(args.ai_invalid_json_rate)
+os.environ["FAKE_AI_BLOCKING"] = "true" if args.ai_blocking else "false"
+os.environ["FAKE_AI_SEED"] = str(args.seed)
+os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(_workdir, 'bench.db')}"
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx  # noqa: E402
+from main import app  # noqa: E402
+from database import engine  # noqa: E402
+from migrations import upgrade  # noqa: E402
+from ai.base_provider import install_sdk_thread_pool  # noqa: E402
+
+# The ASGI transport does not run the lifespan hook, so migrate here
+# (and size the SDK thread pool in main())
+upgrade(engine)
+
+RESUME_TEXT = (
+    "Software engineer with 3 years of experience building REST APIs in Python and FastAPI, "
+    "React frontends and PostgreSQL schemas. Led a migration to Docker-based deployments."
+)
+
+latencies = defaultdict(list)
+errors = defaultdict(int)
+
+
+async def timed(client, name, method, url, **kwargs):
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+        ok = response.status_code < 400
+    except Exception as e:
+        print(f"[bench] {name} raised {e!r}")
+        response, ok = None, False
+    latencies[name].append(time.perf_counter() - start)
+    if not ok:
+        errors[name] += 1
+    return response
+
+
+def _data(response):
+    if response is None or response.status_code >= 400:
+        return None
+    return response.json().get("data")
+
+
+async def journey(client, user_no: int):
+    email = f"bench{user_no}_{int(time.time() * 1000)}@example.com"
+    await timed(client, "POST /api/auth/signup", "POST", "/api/auth/signup",
+                data={"name": f"Bench {user_no}", "email": email, "password": "benchpass"})
+    login = _data(await timed(client, "POST /api/auth/login", "POST", "/api/auth/login",
+                              json={"email": email, "password": "benchpass"}))
+    if not login:
+        return
+    headers = {"Authorization": f"Bearer {login['access_token']}"}
+
+    await timed(client, "POST /api/resume/analyze", "POST", "/api/resume/analyze",
+                json={"resume_text": RESUME_TEXT, "role": "Backend Developer"}, headers=headers)
+
+    await timed(client, "GET /api/quiz/options", "GET", "/api/quiz/options", headers=headers)
+    quiz = _data(await timed(client, "POST /api/quiz/generate", "POST", "/api/quiz/generate",
+                             json={"topic": "Python"}, headers=headers))
+    if quiz:
+        await timed(client, "POST /api/quiz/submit", "POST", "/api/quiz/submit",
+                    json={"topic": "Python", "correct_answers": 3, "total_questions": len(quiz["questions"])},
+                    headers=headers)
+
+    await timed(client, "GET /api/assignment/options", "GET", "/api/assignment/options", headers=headers)
+    assignment = _data(await timed(client, "POST /api/assignment/generate", "POST", "/api/assignment/generate",
+                                   json={"topic": "Python"}, headers=headers))
+    await timed(client, "GET /api/assignment/list", "GET", "/api/assignment/list", headers=headers)
+    if assignment:
+        await timed(client, "GET /api/assignment/{id}", "GET", f"/api/assignment/{assignment['id']}", headers=headers)
+        await timed(client, "POST /api/assignment/submit", "POST", "/api/assignment/submit",
+                    data={"assignment_id": str(assignment["id"]), "code_text": "def solve(x):\n    return x * 2\n"},
+                    headers=headers)
+
+    await timed(client, "GET /api/learning/dashboard", "GET", "/api/learning/dashboard", headers=headers)
+    await timed(client, "GET /api/learning/topics", "GET", "/api/learning/topics", headers=headers)
+
+    started = _data(await timed(
+        client, "POST /api/interview/start-interview", "POST", "/api/interview/start-interview",
+        data={"role": "Backend Developer", "skills": "Python, FastAPI", "difficulty": "Medium"},
+        files={"resume_file": ("resume.txt", RESUME_TEXT.encode("utf-8"), "text/plain")},
+        headers=headers,
+    ))
+    if started:
+        for _ in range(started["total_questions"]):
+            result = _data(await timed(
+                client, "POST /api/interview/submit-answer", "POST", "/api/interview/submit-answer",
+                json={"session_id": started["session_id"],
+                      "answer_text": "I would weigh trade-offs, design for scalability and add testing."},
+                headers=headers,
+            ))
+            if not result or result.get("is_last_question"):
+                break
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+async def main():
+    from ai.fake_provider import reseed
+    reseed(args.seed)
+    install_sdk_thread_pool()
+
+    transport = httpx.ASGITransport(app=app)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        async def run(user_no):
+            async with semaphore:
+                await journey(client, user_no)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(run(i) for i in range(args.users)))
+        wall = time.perf_counter() - start
+
+    total_requests = sum(len(v) for v in latencies.values())
+    rows = []
+    for name, values in sorted(latencies.items()):
+        ordered = sorted(values)
+        rows.append({
+            "endpoint": name,
+            "requests": len(ordered),
+            "errors": errors[name],
+            "mean_ms": round(1000 * sum(ordered) / len(ordered), 2),
+            "p50_ms": round(1000 * percentile(ordered, 50), 2),
+            "p95_ms": round(1000 * percentile(ordered, 95), 2),
+            "p99_ms": round(1000 * percentile(ordered, 99), 2),
+        })
+
+    print(f"\nUsers: {args.users}  Concurrency: {args.concurrency}  "
+          f"Fake AI median: {args.ai_latency_ms} ms{' (SDK threads)' if args.ai_blocking else ''}")
+    print(f"Wall time: {wall:.2f}s  Requests: {total_requests}  Throughput: {total_requests / wall:.1f} req/s\n")
+    header = f"{'endpoint':<38} {'reqs':>5} {'errs':>5} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        print(f"{r['endpoint']:<38} {r['requests']:>5} {r['errors']:>5} {r['mean_ms']:>9.1f} "
+              f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f}")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump({
+                "users": args.users,
+                "concurrency": args.concurrency,
+                "ai_latency_ms": args.ai_latency_ms,
+                "ai_blocking": args.ai_blocking,
+                "wall_seconds": round(wall, 3),
+                "throughput_rps": round(total_requests / wall, 2),
+                "endpoints": rows,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
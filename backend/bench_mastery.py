@@ -0,0 +1,128 @@
+"""Benchmark the vectorized mastery engine against the scalar handler path.
+
+Scores N synthetic (quiz, assignment, consistency) triples with
+calculate_mastery/calculate_risk/get_topic_level in a loop and with
+services/mastery_batch.py, checks both agree and reports throughput.
+
+Then checks handler parity: virtual users submit quizzes and assignments
+through the real endpoints (fake AI provider, throwaway SQLite database)
+and a dry-run recompute_all() over their history must change nothing.
+
+Usage:
+    python bench_mastery.py --pairs 1000000
+    python bench_mastery.py --pairs 100000 --parity-users 50
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+parser.add_argument("--pairs", type=int, default=1_000_000)
+parser.add_argument("--missing-rate", type=float, default=0.3, help="Fraction of missing quiz/assignment scores")
+parser.add_argument("--parity-users", type=int, default=5, help="Users for the handler parity check (0 to skip)")
+parser.add_argument("--seed", type=int, default=42)
+args = parser.parse_args()
+
+# Settings are read at import time, so configure the environment first
+os.environ["AI_PROVIDER"] = "fake"
+os.environ["FAKE_AI_LATENCY_MS"] = "0"
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench_'), 'parity.db')}"
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np  # noqa: E402
+
+from services.learning_engine import calculate_mastery, calculate_risk, get_topic_level  # noqa: E402
+from services.mastery_batch import (  # noqa: E402
+    LEVEL_LABELS, RISK_LABELS, level_codes, mastery_vector, recompute_all, risk_codes,
+)
+
+rng = np.random.default_rng(args.seed)
+quiz = rng.uniform(0, 100, args.pairs)
+assignment = rng.integers(0, 101, args.pairs).astype(np.float64)
+quiz[rng.random(args.pairs) < args.missing_rate] = np.nan
+assignment[rng.random(args.pairs) < args.missing_rate] = np.nan
+consistency = np.minimum(100, rng.integers(0, 15, args.pairs) * 10).astype(np.float64)
+
+# Scalar path, as the handlers call it
+quiz_list = [None if q != q else q for q in quiz.tolist()]
+assignment_list = [None if a != a else a for a in assignment.tolist()]
+consistency_list = consistency.tolist()
+started = time.perf_counter()
+scalar = []
+for q, a, c in zip(quiz_list, assignment_list, consistency_list):
+    m = calculate_mastery(q, a, c)
+    scalar.append((m, calculate_risk(m), get_topic_level(m)))
+scalar_seconds = time.perf_counter() - started
+
+started = time.perf_counter()
+mastery = mastery_vector(quiz, assignment, consistency)
+risk = risk_codes(mastery)
+level = level_codes(mastery)
+vector_seconds = time.perf_counter() - started
+
+# Agreement (np.round and round() may differ by 0.01 on exact half-cents)
+scalar_mastery = np.array([np.nan if m is None else m for m, _, _ in scalar])
+diff = np.abs(np.nan_to_num(scalar_mastery, nan=-1) - np.nan_to_num(mastery, nan=-1))
+label_mismatches = sum(
+    1 for (_, r, l), rv, lv in zip(scalar, RISK_LABELS[risk].tolist(), LEVEL_LABELS[level].tolist())
+    if r != rv or l != lv
+)
+
+print(f"Pairs: {args.pairs}")
+print(f"  scalar     {scalar_seconds:8.3f}s  {args.pairs / scalar_seconds:>14,.0f} pairs/s")
+print(f"  vectorized {vector_seconds:8.3f}s  {args.pairs / vector_seconds:>14,.0f} pairs/s  "
+      f"({scalar_seconds / vector_seconds:.0f}x)")
+print(f"  max mastery difference {diff.max():.4f}, pairs differing {(diff > 1e-9).sum()}, "
+      f"risk/level mismatches {label_mismatches}")
+
+
+def check_handler_parity(users: int) -> dict:
+    """Drive the quiz/assignment handlers, then dry-run recompute_all() over the result."""
+    from fastapi.testclient import TestClient
+    from database import engine
+    from main import app
+    from migrations import upgrade
+
+    upgrade(engine)
+    rng = random.Random(args.seed)
+    topics = ["Python", "SQL", "Docker", "React"]
+    last_kind, last_second = None, None
+    with TestClient(app) as client:
+        for n in range(users):
+            email = f"parity{n}@example.com"
+            client.post("/api/auth/signup", data={"name": f"Parity {n}", "email": email, "password": "paritypass"})
+            token = client.post("/api/auth/login", json={"email": email, "password": "paritypass"}).json()["data"]["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+            for _ in range(rng.randint(1, 8)):
+                topic = rng.choice(topics)
+                kind = "quiz" if rng.random() < 0.7 else "assignment"
+                if kind != last_kind and int(time.time()) == last_second:
+                    # SQLite timestamps are whole seconds and the insertion order
+                    # of a quiz and a submission in the same second is unknowable
+                    time.sleep(1 - time.time() % 1)
+                if kind == "quiz":
+                    total = rng.choice([5, 10])
+                    client.post("/api/quiz/submit", headers=headers, json={
+                        "topic": topic, "correct_answers": rng.randint(0, total), "total_questions": total})
+                else:
+                    assignment = client.post("/api/assignment/generate", headers=headers, json={"topic": topic})
+                    client.post("/api/assignment/submit", headers=headers, data={
+                        "assignment_id": str(assignment.json()["data"]["id"]),
+                        "code_text": f"def solve(x):\n    return x * {rng.randint(1, 9)}\n"})
+                last_kind, last_second = kind, int(time.time())
+    return recompute_all(engine, dry_run=True)
+
+
+if args.parity_users > 0:
+    started = time.perf_counter()
+    stats = check_handler_parity(args.parity_users)
+    print(f"Handler parity ({args.parity_users} users, {stats['pairs']} pairs, "
+          f"{time.perf_counter() - started:.1f}s): recompute would update {stats['updated']}, "
+          f"insert {stats['inserted']} rows")
+    if stats["updated"] or stats["inserted"]:
+        sys.exit(1)
@@ -0,0 +1,73 @@
+"""Import-time benchmark for the app module, with a budget.
+
+Runs `python -X importtime -c "import main"` in fresh interpreters, reports
+the slowest modules and fails (exit code 1) if the best-of-N total exceeds
+the budget or if a heavy SDK is imported eagerly.
+
+Usage:
+    python check_import_time.py
+    python check_import_time.py --budget-ms 800 --runs 5 --top 25
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+# SDKs that must only be imported on first use
+LAZY_MODULES = ("openai", "google.genai", "fitz", "pymupdf")
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+parser.add_argument("--module", default="main")
+parser.add_argument("--budget-ms", type=float, default=1200.0, help="Maximum cumulative import time")
+parser.add_argument("--runs", type=int, default=3, help="Take the fastest of N cold imports")
+parser.add_argument("--top", type=int, default=15, help="Show the N slowest modules")
+args = parser.parse_args()
+
+
+def measure():
+    env = dict(os.environ)
+    env.setdefault("SECRET_KEY", "import-time-check")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {args.module}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        print(proc.stderr[-2000:])
+        sys.exit(f"[import_time] 'import {args.module}' failed")
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            modules[m.group(4)] = (int(m.group(1)), int(m.group(2)))
+    return modules
+
+
+runs = [measure() for _ in range(args.runs)]
+best = min(runs, key=lambda mods: mods.get(args.module, (0, 0))[1])
+total_ms = best.get(args.module, (0, 0))[1] / 1000.0
+
+print(f"Slowest modules (cumulative, best of {args.runs}):")
+for name, (self_us, cumulative_us) in sorted(best.items(), key=lambda kv: kv[1][1], reverse=True)[:args.top]:
+    print(f"  {cumulative_us / 1000:>9.1f} ms  {self_us / 1000:>8.1f} ms self  {name}")
+
+eager = sorted({
+    lazy for lazy in LAZY_MODULES for name in best
+    if name == lazy or name.startswith(lazy + ".")
+})
+
+print(f"\nimport {args.module}: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+failed = False
+if total_ms > args.budget_ms:
+    print("[import_time] FAIL: import time over budget")
+    failed = True
+if eager:
+    print(f"[import_time] FAIL: heavy SDKs imported eagerly: {', '.join(eager)}")
+    failed = True
+if not failed:
+    print("[import_time] OK")
+sys.exit(1 if failed else 0)
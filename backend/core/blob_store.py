@@ -0,0 +1,87 @@
+import hashlib
+import os
+import time
+import uuid
+
+from sqlalchemy.orm import Session
+
+# Content-addressed storage for uploaded files.
+#
+# Every blob is stored once under the SHA-256 of its bytes, sharded into two
+# levels of sub-directories (ab/cd/abcd...ext) so no single directory grows
+# unbounded. Submissions reference a blob through AssignmentSubmission.file_path;
+# the number of rows pointing at a path is its reference count, so identical
+# resubmissions share one file on disk.
+
+# Blobs younger than this are never collected: the file is written before the
+# submission row that references it is committed.
+GC_GRACE_SECONDS = 60 * 60
+
+
+def blob_path(root: str, digest: str, ext: str = "") -> str:
+    """Return the sharded on-disk location for a digest."""
+    return os.path.join(root, digest[:2], digest[2:4], f"{digest}{ext.lower()}")
+
+
+def store_blob(root: str, content: bytes, ext: str = "") -> str:
+    """Store bytes under their content hash and return the relative path.
+
+    If an identical blob already exists the write is skipped and the
+    existing path is returned.
+    """
+    digest = hashlib.sha256(content).hexdigest()
+    path = blob_path(root, digest, ext)
+
+    if os.path.exists(path):
+        # Touch so a blob that is about to gain a reference is not collected
+        # by a concurrent GC pass.
+        os.utime(path, None)
+        return path
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    return path
+
+
+def collect_garbage(db: Session, root: str, grace_seconds: int = GC_GRACE_SECONDS, dry_run: bool = False) -> dict:
+    """Delete blobs under ``root`` that no submission references any more.
+
+    Returns a summary with the number of blobs scanned, removed and the bytes freed.
+    """
+    from models.assignment import AssignmentSubmission
+
+    referenced = {
+        os.path.normpath(p)
+        for (p,) in db.query(AssignmentSubmission.file_path)
+        .filter(AssignmentSubmission.file_path.isnot(None))
+        .distinct()
+    }
+
+    now = time.time()
+    scanned = removed = freed = 0
+    for dirpath, dirnames, filenames in os.walk(root, topdown=False):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            scanned += 1
+            if os.path.normpath(path) in referenced:
+                continue
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime < grace_seconds:
+                continue
+            if not dry_run:
+                os.remove(path)
+            removed += 1
+            freed += stat.st_size
+
+        # Drop empty shard directories (never the root itself)
+        if not dry_run and dirpath != root and not os.listdir(dirpath):
+            os.rmdir(dirpath)
+
+    return {"scanned": scanned, "removed": removed, "bytes_freed": freed, "dry_run": dry_run}
+
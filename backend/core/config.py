@@ -10,13 +10,106 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # ── Admin ───────────────────────────────────────────────────────────────
+    # Comma-separated emails allowed to call /api/admin endpoints
+    ADMIN_EMAILS: str = ""
+
+    # ── Telemetry ───────────────────────────────────────────────────────────
+    # Expose Prometheus metrics at /metrics
+    METRICS_ENABLED: bool = True
+    # Opt-in per-request SQL profiler with N+1 detection
+    SQL_PROFILING_ENABLED: bool = False
+    SQL_PROFILE_MAX_QUERIES: int = 20
+    SQL_PROFILE_SLOW_MS: float = 200.0
+    SQL_PROFILE_REPEAT_THRESHOLD: int = 5
+    # Answer requests exceeding a route's @query_budget with a 500 (for tests)
+    SQL_PROFILE_STRICT: bool = False
+
+    # ── HTTP ────────────────────────────────────────────────────────────────
+    # gzip responses at least this large (bytes) when the client accepts it
+    GZIP_MINIMUM_SIZE: int = 1024
+
+    # ── Caching ─────────────────────────────────────────────────────────────
+    # Per-user resume/mastery cache: "memory" (per process), "redis" (shared) or "none"
+    USER_CACHE_BACKEND: str = "memory"
+    USER_CACHE_TTL_SECONDS: int = 300
+    USER_CACHE_MAX_ENTRIES: int = 10000
+    REDIS_URL: str = "redis://localhost:6379/0"
+    # Pre-generate the next quiz/assignment after a submission (see services/pregeneration.py)
+    PREGEN_ENABLED: bool = True
+    PREGEN_TTL_SECONDS: int = 900
+    PREGEN_MAX_ENTRIES: int = 5000
+    # Also pre-generate quizzes for the weakest topics of a Career Readiness Pulse
+    # quiz (one extra batched AI call per pulse quiz, often unused)
+    PREGEN_PULSE_ENABLED: bool = False
+    PREGEN_PULSE_TOPICS: int = 3
+
     # ── Database ────────────────────────────────────────────────────────────
     DATABASE_URL: str = "sqlite:///./app.db"
+    # Apply pending migrations on startup instead of refusing to start
+    AUTO_MIGRATE: bool = False
 
     # ── AI Providers ────────────────────────────────────────────────────────
     AI_PROVIDER: str = "openai"
     OPENAI_API_KEY: str = ""
     GEMINI_API_KEY: str = ""
+    # More keys, comma-separated, load-balanced with the one above (see ai/key_pool.py)
+    OPENAI_API_KEYS: str = ""
+    GEMINI_API_KEYS: str = ""
+    # A key answering 429 is skipped for its Retry-After, or this long without one
+    AI_KEY_QUARANTINE_SECONDS: float = 20.0
+    # ...and for this long when its quota is exhausted (insufficient_quota)
+    AI_KEY_QUOTA_QUARANTINE_SECONDS: float = 900.0
+    # Worker threads for the synchronous vendor SDK calls (asyncio.to_thread);
+    # bounds the AI calls in flight per process
+    AI_SDK_THREADS: int = 64
+
+    # Local fake provider (AI_PROVIDER=fake) for offline benchmarks
+    FAKE_AI_LATENCY_MS: float = 800.0      # median latency
+    FAKE_AI_LATENCY_SIGMA: float = 0.5     # log-normal spread
+    FAKE_AI_ERROR_RATE: float = 0.0
+    FAKE_AI_INVALID_JSON_RATE: float = 0.0
+    FAKE_AI_BLOCKING: bool = False         # sleep in a worker thread like the vendor SDKs
+    FAKE_AI_SEED: int = 1234
+
+    # ── Model routing ───────────────────────────────────────────────────────
+    # Models per tier (see ai/routing.py): "fast" serves bulk, low-stakes calls
+    # such as resource lists and plans; "strong" serves evaluations.
+    AI_MODEL_FAST_OPENAI: str = "gpt-4.1-nano"
+    AI_MODEL_FAST_GEMINI: str = "gemini-2.5-flash-lite"
+    AI_MODEL_STANDARD_OPENAI: str = "gpt-4o-mini"
+    AI_MODEL_STANDARD_GEMINI: str = "gemini-2.5-flash"
+    AI_MODEL_STRONG_OPENAI: str = "gpt-4o-mini"
+    AI_MODEL_STRONG_GEMINI: str = "gemini-2.5-flash"
+    # Per call site: "call_site=tier[:max_output_tokens[:slo_seconds]],..." e.g. "plan=standard"
+    AI_ROUTE_OVERRIDES: str = ""
+    # Tier retried once when a call fails: "tier=fallback_tier,..."
+    AI_TIER_FALLBACKS: str = "fast=standard,strong=standard"
+
+    # ── Speech-to-text ──────────────────────────────────────────────────────
+    # "openai" or "fake"; empty uses "fake" when AI_PROVIDER=fake, else "openai"
+    STT_BACKEND: str = ""
+    STT_MODEL: str = "gpt-4o-transcribe"
+    STT_MAX_AUDIO_BYTES: int = 25 * 1024 * 1024
+    # Uploads are spooled in memory up to this size, then to a temp file
+    STT_SPOOL_MEMORY_BYTES: int = 1024 * 1024
+    STT_CHUNK_BYTES: int = 64 * 1024
+    FAKE_STT_LATENCY_MS: float = 20.0      # per received chunk
+
+    # ── Assignment evaluation ───────────────────────────────────────────────
+    # Identical resubmissions reuse an earlier evaluation this recent (0 disables)
+    EVALUATION_CACHE_TTL_SECONDS: int = 7 * 24 * 60 * 60
+    # Approximate token budget for submitted code in evaluation prompts
+    EVALUATION_TOKEN_BUDGET: int = 6000
+
+    # ── Interview ───────────────────────────────────────────────────────────
+    # Score empty/trivial answers locally without calling the LLM
+    INTERVIEW_PRESCORE_ENABLED: bool = True
+    # ...and answers shorter than this many words as trivial (0 = only stock
+    # non-answers such as "I don't know"; short answers can be correct)
+    INTERVIEW_PRESCORE_MIN_WORDS: int = 0
+    # Upper bound for the concurrent sub-calls that set up a session
+    INTERVIEW_START_TIMEOUT_SECONDS: float = 60.0
 
     class Config:
         env_file = ".env"
@@ -26,11 +119,11 @@ class Settings(BaseSettings):
 settings = Settings()
 
 # ── Startup validation ───────────────────────────────────────────────────────
-if settings.AI_PROVIDER == "openai" and (not settings.OPENAI_API_KEY or settings.OPENAI_API_KEY == "PASTE_YOUR_KEY_HERE"):
+if settings.AI_PROVIDER == "openai" and not settings.OPENAI_API_KEYS and (not settings.OPENAI_API_KEY or settings.OPENAI_API_KEY == "PASTE_YOUR_KEY_HERE"):
     print("[config] WARNING: AI_PROVIDER is 'openai' but OPENAI_API_KEY is missing/placeholder.")
 
-if settings.AI_PROVIDER == "gemini" and (not settings.GEMINI_API_KEY or settings.GEMINI_API_KEY == "PASTE_YOUR_GEMINI_KEY_HERE"):
+if settings.AI_PROVIDER == "gemini" and not settings.GEMINI_API_KEYS and (not settings.GEMINI_API_KEY or settings.GEMINI_API_KEY == "PASTE_YOUR_GEMINI_KEY_HERE"):
     print("[config] WARNING: AI_PROVIDER is 'gemini' but GEMINI_API_KEY is missing/placeholder.")
 
-if settings.AI_PROVIDER not in ["openai", "gemini"]:
-    print(f"[config] ERROR: Invalid AI_PROVIDER '{settings.AI_PROVIDER}'. Must be 'openai' or 'gemini'.")
+if settings.AI_PROVIDER not in ["openai", "gemini", "fake"]:
+    print(f"[config] ERROR: Invalid AI_PROVIDER '{settings.AI_PROVIDER}'. Must be 'openai', 'gemini' or 'fake'.")
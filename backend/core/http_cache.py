@@ -0,0 +1,76 @@
+import hashlib
+from typing import Optional
+
+from fastapi import HTTPException, Request, status
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from core.request_context import get_request_state
+from models.user import User
+
+# Conditional GET for read endpoints the frontend polls.
+#
+# Every user row carries a data_version that is bumped in the same
+# transaction as any write that can change these responses (quiz and
+# assignment submissions, generated assignments, resume analysis). The
+# ETag is derived from (user, version, route, query string) alone, so a
+# matching If-None-Match is answered with 304 straight from
+# get_current_user, before the handler queries or computes anything.
+
+
+def conditional_get(func):
+    """Mark a route as answerable with 304 Not Modified.
+
+    Apply below the router decorator; the route must depend on
+    get_current_user and only return data covered by User.data_version:
+
+        @router.get("/dashboard")
+        @conditional_get
+        async def dashboard(...): ...
+    """
+    func.__conditional_get__ = True
+    return func
+
+
+def bump_data_version(db: Session, user_id: int):
+    """Invalidate the user's ETags. Call before the write's commit."""
+    db.execute(
+        update(User).where(User.id == user_id).values(data_version=User.data_version + 1)
+    )
+
+
+def _user_etag(user: User, request: Request) -> str:
+    route = request.scope.get("route")
+    key = f"{user.id}:{user.data_version or 0}:{route.path if route else request.url.path}:{request.url.query}"
+    # Weak: the body may be re-encoded (gzip) on the way out
+    return 'W/"' + hashlib.sha1(key.encode("utf-8")).hexdigest()[:20] + '"'
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    # Weak comparison (RFC 9110 13.1.2): ignore the W/ prefix on both sides
+    return "*" in candidates or etag.removeprefix("W/") in {c.removeprefix("W/") for c in candidates}
+
+
+def check_not_modified(request: Request, user: User):
+    """Raise 304 if the client's cached copy of a @conditional_get route is current.
+
+    Otherwise remember the ETag on the request so success_response sends it.
+    """
+    if request.method != "GET":
+        return
+    endpoint = getattr(request.scope.get("route"), "endpoint", None)
+    if not getattr(endpoint, "__conditional_get__", False):
+        return
+
+    etag = _user_etag(user, request)
+    if _matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": "private, no-cache"},
+        )
+    state = get_request_state()
+    if state is not None:
+        state["etag"] = etag
@@ -0,0 +1,185 @@
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Tuple
+
+from core.request_context import get_request_state
+
+# Minimal Prometheus-compatible metrics.
+#
+# All series are updated from the event loop thread (the HTTP middleware and
+# AI call timers run there), so plain ints/floats are safe without locks.
+# SQL timings gathered in worker threads are accumulated on the per-request
+# state dict and folded in by the middleware once the response is sent.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+AI_LATENCY_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name, self.help, self.labels = name, help_text, labels
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1):
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for values, v in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, values)} {v}")
+        return lines
+
+
+class Gauge:
+    """A settable gauge, or a callback gauge when `func` is given."""
+
+    def __init__(self, name: str, help_text: str, func: Callable[[], float] = None):
+        self.name, self.help, self.func = name, help_text, func
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+    def render(self) -> List[str]:
+        value = self.func() if self.func else self.value
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge", f"{self.name} {value}"]
+
+
+class Histogram:
+    """Histogram with fixed, pre-computed bucket bounds."""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labels = name, help_text, labels
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._series: Dict[Tuple, List[float]] = {}
+
+    def observe(self, value: float, *label_values):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for values, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, values, le)} {cumulative}")
+            cumulative += series[len(self.buckets)]
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, values, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, values)} {series[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, values)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests_total = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route and status", ("method", "route", "status")))
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route")))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served"))
+http_request_db_queries = registry.register(Histogram(
+    "http_request_db_queries", "SQL statements executed per HTTP request", ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS))
+http_request_db_duration = registry.register(Histogram(
+    "http_request_db_duration_seconds", "Total SQL time per HTTP request", ("method", "route")))
+ai_request_duration = registry.register(Histogram(
+    "ai_request_duration_seconds", "LLM provider call latency", ("call_site", "outcome"),
+    buckets=AI_LATENCY_BUCKETS))
+
+
+def install_db_instrumentation(engine):
+    """Count statements and their duration against the current HTTP request."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        state = get_request_state()
+        if state is not None:
+            state["db_queries"] = state.get("db_queries", 0) + 1
+            state["db_seconds"] = state.get("db_seconds", 0.0) + elapsed
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording per-route latency and in-flight requests.
+
+    Must run inside RequestContextMiddleware so SQL counts can be read back.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status_holder = {"status": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder["status"] = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_requests_in_flight.dec()
+
+            # The router stores the matched route on the scope; use its template
+            # so path parameters do not explode label cardinality.
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+
+            http_requests_total.inc(method, route_path, str(status_holder["status"]))
+            http_request_duration.observe(elapsed, method, route_path)
+
+            state = get_request_state()
+            if state is not None:
+                http_request_db_queries.observe(state.get("db_queries", 0), method, route_path)
+                http_request_db_duration.observe(state.get("db_seconds", 0.0), method, route_path)
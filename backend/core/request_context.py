@@ -0,0 +1,54 @@
+from contextvars import ContextVar
+from typing import Optional
+
+# Per-request scratchpad shared by middleware, dependencies and services.
+#
+# The middleware installs a fresh dict for every HTTP request. Dependencies
+# such as get_current_user run in a worker thread with a *copy* of the
+# context, so they mutate the dict in place instead of re-binding the var.
+_request_state: ContextVar[Optional[dict]] = ContextVar("request_state", default=None)
+
+
+def get_request_state() -> Optional[dict]:
+    """Return the state dict of the current HTTP request, or None outside a request."""
+    return _request_state.get()
+
+
+def current_user_id() -> Optional[int]:
+    state = _request_state.get()
+    return state.get("user_id") if state else None
+
+
+def current_endpoint() -> Optional[str]:
+    state = _request_state.get()
+    return state.get("endpoint") if state else None
+
+
+def bind_user(user_id: int, endpoint: Optional[str] = None):
+    """Attach the authenticated user (and resolved route template) to the request."""
+    state = _request_state.get()
+    if state is None:
+        return
+    state["user_id"] = user_id
+    if endpoint:
+        state["endpoint"] = endpoint
+
+
+class RequestContextMiddleware:
+    """Pure ASGI middleware that gives every HTTP request its own state dict."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            return await self.app(scope, receive, send)
+
+        token = _request_state.set({
+            "user_id": None,
+            "endpoint": f"{scope.get('method', 'WS')} {scope['path']}",
+        })
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_state.reset(token)
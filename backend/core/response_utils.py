@@ -1,25 +1,82 @@
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.encoders import jsonable_encoder
-from typing import Any, Optional
+from pydantic import BaseModel, ConfigDict, TypeAdapter
+from typing import Any, Dict, Generic, Optional, Type, TypeVar
+from core.request_context import get_request_state
 
-def success_response(data: Any = None, message: str = "Operation successful", status_code: int = 200):
+try:
+    import orjson
+except ImportError:  # stdlib json fallback, same output but slower
+    orjson = None
+
+T = TypeVar("T")
+
+
+class ResponseEnvelope(BaseModel, Generic[T]):
+    """The {success, message, data} wrapper every endpoint returns."""
+    model_config = ConfigDict(from_attributes=True)
+
+    success: bool
+    message: str
+    data: Optional[T] = None
+
+
+# One compiled serializer per response schema, built on first use
+_envelope_adapters: Dict[Any, TypeAdapter] = {}
+
+
+def envelope_adapter(schema: Any) -> TypeAdapter:
+    adapter = _envelope_adapters.get(schema)
+    if adapter is None:
+        adapter = TypeAdapter(ResponseEnvelope[schema])
+        _envelope_adapters[schema] = adapter
+    return adapter
+
+
+def _orjson_default(obj: Any):
+    # Types orjson does not know natively (sets, Decimals, pydantic models, ORM rows)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return jsonable_encoder(obj)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson in one pass instead of jsonable_encoder + json.dumps."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(jsonable_encoder(content))
+        return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _respond(success: bool, message: str, data: Any, status_code: int, schema: Optional[Type] = None):
     content = {
-        "success": True,
+        "success": success,
         "message": message,
         "data": data
     }
-    return JSONResponse(
-        status_code=status_code,
-        content=jsonable_encoder(content)
-    )
+    if schema is not None:
+        # Validated against the endpoint schema (ORM objects via from_attributes)
+        # and serialized straight to bytes by pydantic-core
+        adapter = envelope_adapter(schema)
+        body = adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+        response = Response(content=body, status_code=status_code, media_type="application/json")
+    else:
+        response = FastJSONResponse(status_code=status_code, content=content)
+
+    # ETag computed by check_not_modified for @conditional_get routes
+    state = get_request_state()
+    if success and status_code == 200 and state and state.get("etag"):
+        response.headers["ETag"] = state["etag"]
+        response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def success_response(data: Any = None, message: str = "Operation successful", status_code: int = 200,
+                     schema: Optional[Type] = None):
+    return _respond(True, message, data, status_code, schema)
 
 def error_response(message: str = "An error occurred", data: Any = None, status_code: int = 400):
-    content = {
-        "success": False,
-        "message": message,
-        "data": data
-    }
-    return JSONResponse(
-        status_code=status_code,
-        content=jsonable_encoder(content)
-    )
+    return _respond(False, message, data, status_code)
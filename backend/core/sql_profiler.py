@@ -0,0 +1,168 @@
+import json
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from core.config import settings
+from core.request_context import get_request_state
+
+# Opt-in per-request SQL profiler (SQL_PROFILING_ENABLED).
+#
+# Counts statements, total DB time and repeated statement "shapes" for every
+# HTTP request, logs requests that cross the configured thresholds and flags
+# likely N+1 patterns (the same shape executed many times). Endpoints can
+# declare a budget with @query_budget(n); with SQL_PROFILE_STRICT enabled
+# (e.g. in tests) a request over budget is answered with a 500 instead.
+
+_WS = re.compile(r"\s+")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def statement_shape(statement: str) -> str:
+    """Collapse literals and IN-lists so per-row lookups share one shape."""
+    shape = _STRING.sub("?", statement)
+    shape = _NUMBER.sub("?", shape)
+    shape = _IN_LIST.sub("(?...)", shape)
+    return _WS.sub(" ", shape).strip()
+
+
+def query_budget(max_queries: int):
+    """Declare the maximum number of SQL statements a route may execute.
+
+    Apply below the router decorator:
+
+        @router.get("/list")
+        @query_budget(4)
+        async def list_items(...): ...
+    """
+    def decorator(func):
+        func.__query_budget__ = max_queries
+        return func
+    return decorator
+
+
+def _route_budget(scope):
+    route = scope.get("route")
+    endpoint = getattr(route, "endpoint", None)
+    return getattr(endpoint, "__query_budget__", None)
+
+
+def install_sql_profiler(engine):
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("profile_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["profile_start"].pop()
+        state = get_request_state()
+        profile = state.get("sql_profile") if state else None
+        if profile is None:
+            return
+        profile["count"] += 1
+        profile["seconds"] += elapsed
+        profile["shapes"][statement_shape(statement)] += 1
+
+
+def _violations(profile: dict, budget) -> list:
+    problems = []
+    if budget is not None and profile["count"] > budget:
+        problems.append(f"query budget exceeded ({profile['count']} > {budget})")
+    elif profile["count"] > settings.SQL_PROFILE_MAX_QUERIES:
+        problems.append(f"{profile['count']} queries")
+    if profile["seconds"] * 1000 > settings.SQL_PROFILE_SLOW_MS:
+        problems.append(f"{profile['seconds'] * 1000:.1f} ms in DB")
+    for shape, count in profile["shapes"].most_common():
+        if count < settings.SQL_PROFILE_REPEAT_THRESHOLD:
+            break
+        problems.append(f"possible N+1: {count}x {shape[:160]}")
+    return problems
+
+
+class SQLProfilerMiddleware:
+    """Pure ASGI middleware; must run inside RequestContextMiddleware."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        state = get_request_state()
+        if scope["type"] != "http" or state is None:
+            return await self.app(scope, receive, send)
+
+        profile = {"count": 0, "seconds": 0.0, "shapes": Counter()}
+        state["sql_profile"] = profile
+        over_budget = {"replaced": False}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                budget = _route_budget(scope)
+                if settings.SQL_PROFILE_STRICT and budget is not None and profile["count"] > budget:
+                    # Swap the response for a 500 so tests fail loudly
+                    over_budget["replaced"] = True
+                    body = json.dumps({
+                        "success": False,
+                        "message": f"Query budget exceeded: {profile['count']} > {budget}",
+                        "data": {"queries": dict(profile["shapes"])},
+                    }).encode("utf-8")
+                    await send({
+                        "type": "http.response.start",
+                        "status": 500,
+                        "headers": [(b"content-type", b"application/json"),
+                                    (b"content-length", str(len(body)).encode())],
+                    })
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(profile["count"]).encode()))
+                headers.append((b"x-db-time-ms", f"{profile['seconds'] * 1000:.2f}".encode()))
+                message = {**message, "headers": headers}
+            elif over_budget["replaced"]:
+                return
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            problems = _violations(profile, _route_budget(scope))
+            if problems:
+                route = scope.get("route")
+                path = getattr(route, "path", scope["path"])
+                print(f"[sql_profiler] {scope['method']} {path}: " + "; ".join(problems))
+
+
+@contextmanager
+def count_queries(engine):
+    """Count statements executed on `engine` inside the block (any thread).
+
+    Useful in tests and benchmarks:
+
+        with count_queries(engine) as stats:
+            client.get("/api/assignment/list", headers=auth)
+        assert stats["count"] <= 3
+    """
+    from sqlalchemy import event
+
+    stats = {"count": 0, "shapes": Counter()}
+    lock = threading.Lock()
+
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        with lock:
+            stats["count"] += 1
+            stats["shapes"][statement_shape(statement)] += 1
+
+    event.listen(engine, "after_cursor_execute", _after)
+    try:
+        yield stats
+    finally:
+        event.remove(engine, "after_cursor_execute", _after)
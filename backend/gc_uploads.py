@@ -0,0 +1,24 @@
+"""Garbage-collect uploaded assignment blobs no longer referenced by any submission.
+
+Usage: python gc_uploads.py [--dry-run] [--grace-seconds N]
+"""
+import argparse
+import sys
+sys.path.insert(0, '.')
+
+from database import SessionLocal
+from core.blob_store import collect_garbage, GC_GRACE_SECONDS
+from routes.assignment import BLOB_DIR
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+parser.add_argument("--dry-run", action="store_true", help="Report what would be removed without deleting anything")
+parser.add_argument("--grace-seconds", type=int, default=GC_GRACE_SECONDS, help="Skip blobs modified more recently than this")
+args = parser.parse_args()
+
+db = SessionLocal()
+try:
+    summary = collect_garbage(db, BLOB_DIR, grace_seconds=args.grace_seconds, dry_run=args.dry_run)
+    print(f"[gc_uploads] Scanned {summary['scanned']} blobs, removed {summary['removed']} "
+          f"({summary['bytes_freed']} bytes){' (dry run)' if args.dry_run else ''}")
+finally:
+    db.close()
@@ -1,15 +1,32 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from database import engine, Base
+from fastapi.middleware.gzip import GZipMiddleware
+from core.request_context import RequestContextMiddleware
+from core.metrics import MetricsMiddleware, install_db_instrumentation, registry
+from core.sql_profiler import SQLProfilerMiddleware, install_sql_profiler
+from core.config import settings
+from database import engine
+from ai.base_provider import install_sdk_thread_pool
+from migrations import check_schema_current, upgrade as upgrade_schema
 from models.user import User  # Import User model to register it with SQLAlchemy Base
 from models.quiz import TopicMastery, QuizAttempt, UserResumeData
 from models.assignment import Assignment, AssignmentSubmission
-from routes import auth, resume, quiz, assignment, learning, interview
+from routes import auth, resume, quiz, assignment, learning, interview, admin
 
-# Automatically create tables
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema changes go through versioned migrations (python migrate_db.py);
+    # refuse to serve against an out-of-date schema unless told to migrate.
+    if settings.AUTO_MIGRATE:
+        upgrade_schema(engine)
+    else:
+        check_schema_current(engine)
+    install_sdk_thread_pool()
+    yield
 
-app = FastAPI(title="FastAPI Auth System")
+app = FastAPI(title="FastAPI Auth System", lifespan=lifespan)
 
 # Configure CORS
 origins = [
@@ -25,6 +42,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON bodies (dashboards, quizzes) for clients that accept gzip
+app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MINIMUM_SIZE)
+
+# Request latency / in-flight / per-request SQL metrics
+if settings.METRICS_ENABLED:
+    install_db_instrumentation(engine)
+    app.add_middleware(MetricsMiddleware)
+
+# Opt-in SQL profiling: query counts, DB time and N+1 detection per request
+if settings.SQL_PROFILING_ENABLED:
+    install_sql_profiler(engine)
+    app.add_middleware(SQLProfilerMiddleware)
+
+# Per-request state used to attribute telemetry to users and routes
+# (added last so it wraps the metrics and profiling middleware)
+app.add_middleware(RequestContextMiddleware)
+
 # Include Authentication Router
 app.include_router(auth.router)
 
@@ -43,6 +77,16 @@ app.include_router(learning.router)
 # Include Interview Router
 app.include_router(interview.router)
 
+# Include Admin Router
+app.include_router(admin.router)
+
 @app.get("/")
 def root():
     return {"message": "FastAPI Auth System is running"}
+
+if settings.METRICS_ENABLED:
+    # async so render() runs on the event loop, which is also the only
+    # place the metric dicts are mutated (no "dictionary changed size")
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
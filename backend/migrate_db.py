@@ -1,24 +1,29 @@
-import sqlite3
-import os
+"""Apply or inspect versioned schema migrations (see migrations/).
 
-db_path = os.path.join(os.getcwd(), "app.db")
+Usage:
+    python migrate_db.py            # apply all pending migrations
+    python migrate_db.py status     # show current / latest version and pending migrations
+    python migrate_db.py upgrade 2  # apply migrations up to version 2
+"""
+import sys
+sys.path.insert(0, '.')
 
-if os.path.exists(db_path):
-    print(f"Connecting to database at {db_path}")
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    try:
-        print("Attempting to add 'suggested_topics' column to 'user_resume_data' table...")
-        cursor.execute("ALTER TABLE user_resume_data ADD COLUMN suggested_topics JSON")
-        conn.commit()
-        print("Successfully added 'suggested_topics' column.")
-    except sqlite3.OperationalError as e:
-        if "duplicate column name" in str(e).lower():
-            print("Column 'suggested_topics' already exists.")
-        else:
-            print(f"Error adding column: {e}")
-    finally:
-        conn.close()
+from database import engine
+from migrations import current_version, latest_version, pending, upgrade
+
+command = sys.argv[1] if len(sys.argv) > 1 else "upgrade"
+
+if command == "status":
+    print(f"Database: {engine.url}")
+    print(f"Current version: {current_version(engine)}  Latest: {latest_version()}")
+    for m in pending(engine):
+        print(f"  pending {m.VERSION:04d}: {m.DESCRIPTION}")
+elif command == "upgrade":
+    target = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    applied = upgrade(engine, target)
+    if applied:
+        print(f"Schema upgraded to version {current_version(engine)}.")
+    else:
+        print(f"Schema already up to date (version {current_version(engine)}).")
 else:
-    print(f"Database file not found at {db_path}")
+    sys.exit(f"Unknown command '{command}'. Use 'status' or 'upgrade [version]'.")
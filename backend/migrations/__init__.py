@@ -0,0 +1,167 @@
+"""Versioned schema migrations.
+
+Each module in migrations/versions named ``vNNNN_<slug>.py`` defines
+``VERSION`` (int), ``DESCRIPTION`` (str) and ``upgrade(engine)``. Applied
+versions are recorded in the ``schema_version`` table. Migrations receive
+the engine rather than a connection so they can choose their own
+transaction boundaries (online index builds and batched backfills must not
+run inside one long transaction).
+
+Run ``python migrate_db.py`` to apply pending migrations.
+"""
+import importlib
+import pkgutil
+import time
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+
+def _load_migrations() -> list:
+    from migrations import versions
+
+    modules = []
+    for info in pkgutil.iter_modules(versions.__path__):
+        if info.name.startswith("v"):
+            modules.append(importlib.import_module(f"migrations.versions.{info.name}"))
+    modules.sort(key=lambda m: m.VERSION)
+
+    seen = set()
+    for m in modules:
+        if m.VERSION in seen:
+            raise RuntimeError(f"Duplicate migration version {m.VERSION}")
+        seen.add(m.VERSION)
+    return modules
+
+
+def latest_version() -> int:
+    migrations = _load_migrations()
+    return migrations[-1].VERSION if migrations else 0
+
+
+def _ensure_version_table(engine: Engine):
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_version ("
+            "version INTEGER PRIMARY KEY, "
+            "description VARCHAR NOT NULL, "
+            "applied_at TIMESTAMP NOT NULL)"
+        ))
+
+
+def current_version(engine: Engine) -> int:
+    if not inspect(engine).has_table("schema_version"):
+        return 0
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT MAX(version) FROM schema_version")).scalar() or 0
+
+
+def pending(engine: Engine) -> list:
+    applied = current_version(engine)
+    return [m for m in _load_migrations() if m.VERSION > applied]
+
+
+def upgrade(engine: Engine, target: Optional[int] = None) -> List[int]:
+    """Apply pending migrations in order (up to ``target``). Returns applied versions."""
+    _ensure_version_table(engine)
+    applied = []
+    for migration in pending(engine):
+        if target is not None and migration.VERSION > target:
+            break
+        print(f"[migrations] Applying {migration.VERSION:04d}: {migration.DESCRIPTION}")
+        started = time.perf_counter()
+        migration.upgrade(engine)
+        with engine.begin() as conn:
+            conn.execute(
+                text("INSERT INTO schema_version (version, description, applied_at) VALUES (:v, :d, :t)"),
+                {"v": migration.VERSION, "d": migration.DESCRIPTION, "t": datetime.utcnow()},
+            )
+        print(f"[migrations] Applied {migration.VERSION:04d} in {time.perf_counter() - started:.2f}s")
+        applied.append(migration.VERSION)
+    return applied
+
+
+def check_schema_current(engine: Engine):
+    """Raise SchemaOutOfDate unless every known migration has been applied."""
+    have, want = current_version(engine), latest_version()
+    if have < want:
+        raise SchemaOutOfDate(
+            f"Database schema is at version {have} but the code expects {want}. "
+            "Run `python migrate_db.py` before starting the server."
+        )
+    if have > want:
+        raise SchemaOutOfDate(
+            f"Database schema version {have} is newer than this code ({want}); refusing to start."
+        )
+
+
+# ── Helpers for migration modules ────────────────────────────────────────────
+
+def add_column_if_missing(engine: Engine, table: str, column: str, definition: str):
+    """ALTER TABLE ... ADD COLUMN, skipped if the column already exists.
+
+    Keep ``definition`` nullable or with a constant default so the statement
+    is a metadata-only change on PostgreSQL and SQLite.
+    """
+    columns = {c["name"] for c in inspect(engine).get_columns(table)}
+    if column in columns:
+        return
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {definition}"))
+
+
+def create_index_online(engine: Engine, name: str, table: str, columns: List[str], unique: bool = False):
+    """Create an index without blocking writes where the backend supports it.
+
+    PostgreSQL uses CREATE INDEX CONCURRENTLY, which must run outside a
+    transaction. SQLite has no online variant; its index builds are short
+    for the table sizes it is used with.
+    """
+    existing = {ix["name"] for ix in inspect(engine).get_indexes(table)}
+    if name in existing:
+        return
+    cols = ", ".join(columns)
+    unique_sql = "UNIQUE " if unique else ""
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text(f"CREATE {unique_sql}INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({cols})"))
+    else:
+        with engine.begin() as conn:
+            conn.execute(text(f"CREATE {unique_sql}INDEX IF NOT EXISTS {name} ON {table} ({cols})"))
+
+
+def batched_backfill(
+    engine: Engine,
+    select_sql: str,
+    compute: Callable[[dict], Optional[dict]],
+    update_sql: str,
+    batch_size: int = 1000,
+    pause_seconds: float = 0.0,
+) -> int:
+    """Backfill derived data in short transactions, keyed by ascending id.
+
+    ``select_sql`` must select an ``id`` column and accept ``:last_id`` and
+    ``:limit`` parameters (``WHERE id > :last_id ORDER BY id LIMIT :limit``).
+    ``compute`` maps a row to update parameters (or None to skip) that are
+    passed to ``update_sql`` via executemany. Returns rows updated.
+    """
+    last_id, total = 0, 0
+    while True:
+        with engine.connect() as conn:
+            rows = conn.execute(text(select_sql), {"last_id": last_id, "limit": batch_size}).mappings().all()
+        if not rows:
+            return total
+        updates = [u for u in (compute(dict(r)) for r in rows) if u is not None]
+        if updates:
+            with engine.begin() as conn:
+                conn.execute(text(update_sql), updates)
+            total += len(updates)
+        last_id = rows[-1]["id"]
+        if pause_seconds:
+            time.sleep(pause_seconds)
@@ -0,0 +1,82 @@
+"""Baseline: the tables as the old create_all at startup built them.
+
+Frozen copy of the schema from before versioned migrations; later model
+changes go into new migrations, never here. Existing databases already
+have these tables and CREATE is skipped for them. The columns
+migrate_db.py used to add by hand are added by v0002.
+"""
+from sqlalchemy import (
+    JSON, Boolean, Column, DateTime, Float, ForeignKey, Integer, MetaData, String, Table, Text, func,
+)
+
+VERSION = 1
+DESCRIPTION = "Baseline tables"
+
+
+def _baseline_metadata() -> MetaData:
+    metadata = MetaData()
+    Table(
+        "users", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("name", String, nullable=True),
+        Column("email", String, unique=True, index=True, nullable=False),
+        Column("hashed_password", String, nullable=False),
+        Column("is_active", Boolean),
+        Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    )
+    Table(
+        "topic_mastery", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+        Column("topic", String, index=True, nullable=False),
+        Column("mastery_score", Float),
+        Column("updated_at", DateTime(timezone=True), server_default=func.now()),
+    )
+    Table(
+        "quiz_attempts", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+        Column("topic", String, index=True, nullable=False),
+        Column("score", Float, nullable=False),
+        Column("total_questions", Integer, nullable=False),
+        Column("correct_answers", Integer, nullable=False),
+        Column("timestamp", DateTime(timezone=True), server_default=func.now()),
+    )
+    Table(
+        "user_resume_data", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("user_id", Integer, ForeignKey("users.id"), unique=True, nullable=False),
+        Column("role", String, nullable=True),
+        Column("topics", JSON, nullable=False),
+        Column("updated_at", DateTime(timezone=True), server_default=func.now()),
+    )
+    Table(
+        "assignments", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+        Column("title", String, index=True, nullable=False),
+        Column("topic", String, index=True, nullable=False),
+        Column("type", String, nullable=False),
+        Column("difficulty", String, nullable=False),
+        Column("instructions", Text, nullable=False),
+        Column("expected_deliverables", Text, nullable=False),
+        Column("evaluation_criteria", Text, nullable=False),
+        Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    )
+    Table(
+        "assignment_submissions", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("assignment_id", Integer, ForeignKey("assignments.id"), nullable=False),
+        Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+        Column("code_text", Text, nullable=True),
+        Column("file_path", String, nullable=True),
+        Column("github_link", String, nullable=True),
+        Column("score", Float, nullable=True),
+        Column("evaluation_json", JSON, nullable=True),
+        Column("submitted_at", DateTime(timezone=True), server_default=func.now()),
+    )
+    return metadata
+
+
+def upgrade(engine):
+    _baseline_metadata().create_all(bind=engine, checkfirst=True)
@@ -0,0 +1,60 @@
+"""Columns previously added by hand in migrate_db.py, plus evaluation_key backfill."""
+import hashlib
+
+from migrations import add_column_if_missing, batched_backfill, create_index_online
+
+VERSION = 2
+DESCRIPTION = "suggested_topics, evaluation cache columns and evaluation_key backfill"
+
+
+# Frozen copy of services.assignment_ai.evaluation_cache_key as of this
+# migration, so later changes to the live key do not change the backfill
+def _normalize_code(code_text):
+    if not code_text:
+        return ""
+    lines = code_text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip("\n")
+
+
+def _normalize_link(github_link):
+    if not github_link:
+        return ""
+    link = github_link.strip().rstrip("/")
+    if link.endswith(".git"):
+        link = link[:-4]
+    return link.lower()
+
+
+def evaluation_cache_key(assignment_context: dict, submission_data: dict) -> str:
+    parts = [
+        (assignment_context.get("title") or "").strip(),
+        (assignment_context.get("evaluation_criteria") or "").strip(),
+        _normalize_code(submission_data.get("code_text")),
+        _normalize_link(submission_data.get("github_link")),
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def upgrade(engine):
+    add_column_if_missing(engine, "user_resume_data", "suggested_topics", "JSON")
+    add_column_if_missing(engine, "assignment_submissions", "evaluation_key", "VARCHAR")
+    add_column_if_missing(engine, "assignment_submissions", "evaluation_cache_hit", "BOOLEAN DEFAULT FALSE")
+    create_index_online(engine, "ix_assignment_submissions_evaluation_key", "assignment_submissions", ["evaluation_key"])
+
+    # Existing evaluated submissions become cache entries too
+    def compute(row):
+        key = evaluation_cache_key(
+            {"title": row["title"], "evaluation_criteria": row["evaluation_criteria"]},
+            {"code_text": row["code_text"], "github_link": row["github_link"]},
+        )
+        return {"id": row["id"], "key": key}
+
+    batched_backfill(
+        engine,
+        "SELECT s.id, s.code_text, s.github_link, a.title, a.evaluation_criteria "
+        "FROM assignment_submissions s JOIN assignments a ON a.id = s.assignment_id "
+        "WHERE s.id > :last_id AND s.evaluation_key IS NULL AND s.evaluation_json IS NOT NULL "
+        "ORDER BY s.id LIMIT :limit",
+        compute,
+        "UPDATE assignment_submissions SET evaluation_key = :key WHERE id = :id",
+    )
@@ -0,0 +1,19 @@
+"""Composite indexes for the per-user lookups every request handler runs."""
+from migrations import create_index_online
+
+VERSION = 3
+DESCRIPTION = "Composite indexes for per-user mastery, quiz and submission lookups"
+
+INDEXES = [
+    ("ix_topic_mastery_user_topic", "topic_mastery", ["user_id", "topic"]),
+    ("ix_quiz_attempts_user_timestamp", "quiz_attempts", ["user_id", "timestamp"]),
+    ("ix_quiz_attempts_user_topic_timestamp", "quiz_attempts", ["user_id", "topic", "timestamp"]),
+    ("ix_assignments_user_id", "assignments", ["user_id", "id"]),
+    ("ix_assignment_submissions_user_submitted", "assignment_submissions", ["user_id", "submitted_at"]),
+    ("ix_assignment_submissions_assignment_submitted", "assignment_submissions", ["assignment_id", "submitted_at"]),
+]
+
+
+def upgrade(engine):
+    for name, table, columns in INDEXES:
+        create_index_online(engine, name, table, columns)
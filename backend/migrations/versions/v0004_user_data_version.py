@@ -0,0 +1,9 @@
+"""Per-user data version backing the ETags of polled read endpoints."""
+from migrations import add_column_if_missing
+
+VERSION = 4
+DESCRIPTION = "users.data_version for conditional GET"
+
+
+def upgrade(engine):
+    add_column_if_missing(engine, "users", "data_version", "INTEGER NOT NULL DEFAULT 0")
@@ -1,10 +1,11 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, JSON, Text
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, JSON, Text, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
 
 class Assignment(Base):
     __tablename__ = "assignments"
+    __table_args__ = (Index("ix_assignments_user_id", "user_id", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -22,6 +23,10 @@ class Assignment(Base):
 
 class AssignmentSubmission(Base):
     __tablename__ = "assignment_submissions"
+    __table_args__ = (
+        Index("ix_assignment_submissions_user_submitted", "user_id", "submitted_at"),
+        Index("ix_assignment_submissions_assignment_submitted", "assignment_id", "submitted_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     assignment_id = Column(Integer, ForeignKey("assignments.id"), nullable=False)
@@ -31,6 +36,8 @@ class AssignmentSubmission(Base):
     github_link = Column(String, nullable=True)
     score = Column(Float, nullable=True)
     evaluation_json = Column(JSON, nullable=True)
+    evaluation_key = Column(String, index=True, nullable=True)  # sha256 of assignment criteria + normalized submission
+    evaluation_cache_hit = Column(Boolean, default=False)
     submitted_at = Column(DateTime(timezone=True), server_default=func.now())
 
     user = relationship("User")
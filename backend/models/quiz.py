@@ -1,10 +1,11 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
 
 class TopicMastery(Base):
     __tablename__ = "topic_mastery"
+    __table_args__ = (Index("ix_topic_mastery_user_topic", "user_id", "topic"),)
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -16,6 +17,10 @@ class TopicMastery(Base):
 
 class QuizAttempt(Base):
     __tablename__ = "quiz_attempts"
+    __table_args__ = (
+        Index("ix_quiz_attempts_user_timestamp", "user_id", "timestamp"),
+        Index("ix_quiz_attempts_user_topic_timestamp", "user_id", "topic", "timestamp"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
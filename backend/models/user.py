@@ -10,4 +10,5 @@ class User(Base):
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
+    data_version = Column(Integer, nullable=False, default=0, server_default="0")  # bumped on writes, drives ETags
     created_at = Column(DateTime(timezone=True), server_default=func.now())
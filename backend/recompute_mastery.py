@@ -0,0 +1,29 @@
+"""Recompute TopicMastery for every user after changing the mastery weights.
+
+Scores all (user, topic) pairs in chunks with the vectorized engine in
+services/mastery_batch.py and writes changed rows back in bulk.
+
+Usage:
+    python recompute_mastery.py --dry-run
+    python recompute_mastery.py --chunk-users 10000
+"""
+import argparse
+import sys
+
+sys.path.insert(0, '.')
+
+from database import engine
+from services.mastery_batch import recompute_all
+
+parser = argparse.ArgumentParser(description="Recompute topic mastery for all users")
+parser.add_argument("--chunk-users", type=int, default=5000, help="Users loaded and written per chunk")
+parser.add_argument("--dry-run", action="store_true", help="Compute and report without writing")
+args = parser.parse_args()
+
+stats = recompute_all(engine, chunk_users=args.chunk_users, dry_run=args.dry_run)
+
+print(f"\n[recompute_mastery] {stats['pairs']} pairs in {stats['seconds']:.1f}s"
+      f"{' (dry run, nothing written)' if args.dry_run else ''}")
+print(f"  updated {stats['updated']}, inserted {stats['inserted']}, users changed {stats['users_changed']}")
+print("  risk:  " + ", ".join(f"{k} {v}" for k, v in stats["risk"].items()))
+print("  level: " + ", ".join(f"{k} {v}" for k, v in stats["level"].items()))
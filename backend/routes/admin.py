@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from typing import Any
+from core.response_utils import success_response
+from routes.auth import get_admin_user
+from ai.key_pool import pool_snapshot, render_prometheus as render_key_metrics
+from ai.prompts import prompt_registry
+from ai.usage import usage_stats
+
+router = APIRouter(prefix="/api/admin", tags=["Admin"])
+
+@router.get("/ai-usage")
+async def get_ai_usage(current_user: Any = Depends(get_admin_user)):
+    """AI token/latency usage aggregated per call site, prompt template, model route, user and endpoint."""
+    return success_response(data=usage_stats.snapshot())
+
+@router.get("/ai-usage/metrics", response_class=PlainTextResponse)
+async def get_ai_usage_metrics(current_user: Any = Depends(get_admin_user)):
+    """The same counters and the per-key pool series in Prometheus text format.
+
+    Kept off the public /metrics: scrape this with an admin token.
+    """
+    text = usage_stats.render_prometheus() + render_key_metrics()
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+@router.get("/prompts")
+async def get_prompt_templates(current_user: Any = Depends(get_admin_user)):
+    """Registered prompt templates with their versions and instruction fingerprints."""
+    return success_response(data=prompt_registry.describe())
+
+@router.get("/ai-keys")
+async def get_ai_keys(current_user: Any = Depends(get_admin_user)):
+    """Per-key rate-limit headroom, calls in flight and quarantine of the vendor key pools."""
+    return success_response(data=pool_snapshot())
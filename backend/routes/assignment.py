@@ -1,42 +1,50 @@
 from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form
 from core.response_utils import success_response, error_response
+from schemas.response_schema import AssignmentListItem, AssignmentOptionsResponse, AssignmentResponse
 from sqlalchemy.orm import Session
 from typing import List, Any, Optional
 import os
-import uuid
 from database import get_db
 from routes.auth import get_current_user
 from models.quiz import TopicMastery, UserResumeData, QuizAttempt
 from models.assignment import Assignment, AssignmentSubmission
-from services.assignment_ai import generate_assignment, evaluate_submission
+from services.assignment_ai import generate_assignment, evaluate_submission, evaluation_cache_key
+from services import pregeneration
+from core.config import settings
+from ai.usage import record_cache_hit
 from services.learning_engine import calculate_mastery, get_topic_level
+from core.blob_store import store_blob
+from core.sql_profiler import query_budget
+from core.http_cache import bump_data_version, conditional_get
+from services.topic_registry import canonical_topic
+from services.user_data_cache import get_mastery_map, get_resume_data, invalidate_user
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/api/assignment", tags=["Hybrid Assignment"])
 
 UPLOAD_DIR = "uploads/assignments"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+BLOB_DIR = os.path.join(UPLOAD_DIR, "blobs")
+os.makedirs(BLOB_DIR, exist_ok=True)
 
 class AssignmentGenerateRequest(BaseModel):
     topic: str
 
 @router.get("/options")
+@query_budget(3)
 async def get_assignment_options(
     current_user: Any = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Retrieve assignment options based on resume topics and mastery."""
-    resume_data = db.query(UserResumeData).filter(UserResumeData.user_id == current_user.id).first()
+    resume_data = get_resume_data(db, current_user)
     if not resume_data:
         return success_response(data={
             "skill_projects": [],
             "growth_projects": [],
             "capstone": "Career Execution Challenge"
-        })
+        }, schema=AssignmentOptionsResponse)
 
-    # Fetch mastery records
-    mastery_records = db.query(TopicMastery).filter(TopicMastery.user_id == current_user.id).all()
-    mastery_map = {m.topic: m.mastery_score for m in mastery_records}
+    mastery_map = get_mastery_map(db, current_user)
 
     skill_projects = resume_data.topics
     growth_projects = [t for t in resume_data.topics if mastery_map.get(t, 0) < 50]
@@ -45,28 +53,33 @@ async def get_assignment_options(
         "skill_projects": skill_projects,
         "growth_projects": growth_projects,
         "capstone": "Career Execution Challenge"
-    })
+    }, schema=AssignmentOptionsResponse)
 
 @router.get("/list")
+@conditional_get
+@query_budget(3)
 async def list_assignments(
     current_user: Any = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Retrieve all assignments for the current user with their submission status."""
     assignments = db.query(Assignment).filter(Assignment.user_id == current_user.id).order_by(Assignment.id.desc()).all()
-    
+
+    # Latest submission per assignment in one query instead of one per row
+    latest_by_assignment = {}
+    submissions = db.query(AssignmentSubmission.assignment_id, AssignmentSubmission.score).filter(
+        AssignmentSubmission.user_id == current_user.id
+    ).order_by(AssignmentSubmission.submitted_at.desc(), AssignmentSubmission.id.desc()).all()
+    for assignment_id, submission_score in submissions:
+        latest_by_assignment.setdefault(assignment_id, submission_score)
+
     result = []
     for a in assignments:
-        latest_submission = db.query(AssignmentSubmission).filter(
-            AssignmentSubmission.assignment_id == a.id,
-            AssignmentSubmission.user_id == current_user.id
-        ).order_by(AssignmentSubmission.submitted_at.desc()).first()
-        
         status = "pending"
         score = None
-        if latest_submission:
-            status = "graded" if latest_submission.score is not None else "submitted"
-            score = latest_submission.score
+        if a.id in latest_by_assignment:
+            score = latest_by_assignment[a.id]
+            status = "graded" if score is not None else "submitted"
 
         result.append({
             "id": a.id,
@@ -78,7 +91,7 @@ async def list_assignments(
             "created_at": a.id  # use as proxy for ordering
         })
     
-    return success_response(data=result)
+    return success_response(data=result, schema=List[AssignmentListItem])
 
 @router.post("/generate")
 async def generate_new_assignment(
@@ -91,24 +104,22 @@ async def generate_new_assignment(
         return error_response("Topic is required", status_code=400)
         
     role = "Software Engineer"
-    resume_data = db.query(UserResumeData).filter(UserResumeData.user_id == current_user.id).first()
+    resume_data = get_resume_data(db, current_user)
     if resume_data and resume_data.role:
         role = resume_data.role
 
-    mastery = db.query(TopicMastery).filter(
-        TopicMastery.user_id == current_user.id,
-        TopicMastery.topic == req.topic
-    ).first()
-    
-    mastery_score = mastery.mastery_score if mastery else None
+    topic = canonical_topic(req.topic)
+    mastery_score = get_mastery_map(db, current_user).get(topic)
     level = get_topic_level(mastery_score)
     
-    ai_assignment = await generate_assignment(req.topic, level, role)
+    ai_assignment = await pregeneration.take("assignment", current_user.id, topic, level, role)
+    if ai_assignment is None:
+        ai_assignment = await generate_assignment(topic, level, role)
     
     new_assignment = Assignment(
         user_id=current_user.id,
         title=ai_assignment["title"],
-        topic=req.topic,
+        topic=topic,
         type=ai_assignment["type"],
         difficulty=ai_assignment["difficulty"],
         instructions=ai_assignment["instructions"],
@@ -116,12 +127,14 @@ async def generate_new_assignment(
         evaluation_criteria=ai_assignment["evaluation_criteria"]
     )
     db.add(new_assignment)
+    bump_data_version(db, current_user.id)
     db.commit()
     db.refresh(new_assignment)
     
-    return success_response(data=new_assignment, message="Assignment generated")
+    return success_response(data=new_assignment, message="Assignment generated", schema=AssignmentResponse)
 
 @router.get("/{assignment_id}")
+@query_budget(3)
 async def get_assignment(
     assignment_id: int,
     current_user: Any = Depends(get_current_user),
@@ -185,23 +198,40 @@ async def submit_assignment(
         if len(content) > 5 * 1024 * 1024:
             return error_response("File too large (max 5MB)", status_code=400)
         
-        file_ext = os.path.splitext(file.filename)[1]
-        file_name = f"{uuid.uuid4()}{file_ext}"
-        file_path = os.path.join(UPLOAD_DIR, file_name)
-        
-        with open(file_path, "wb") as f:
-            f.write(content)
+        # Identical uploads share one content-addressed blob
+        file_ext = os.path.splitext(file.filename or "")[1]
+        file_path = store_blob(BLOB_DIR, content, file_ext)
 
-    evaluation = await evaluate_submission(
-        assignment_context={
-            "title": assignment.title,
-            "evaluation_criteria": assignment.evaluation_criteria
-        },
-        submission_data={
-            "code_text": code_text,
-            "github_link": github_link
-        }
-    )
+    assignment_context = {
+        "title": assignment.title,
+        "evaluation_criteria": assignment.evaluation_criteria
+    }
+    submission_data = {
+        "code_text": code_text,
+        "github_link": github_link
+    }
+
+    from datetime import datetime, timedelta
+
+    # Reuse a recent evaluation of the exact same submission instead of re-running the LLM
+    evaluation_key = evaluation_cache_key(assignment_context, submission_data)
+    cached_submission = None
+    if settings.EVALUATION_CACHE_TTL_SECONDS > 0:
+        cache_cutoff = datetime.utcnow() - timedelta(seconds=settings.EVALUATION_CACHE_TTL_SECONDS)
+        cached_submission = db.query(AssignmentSubmission).filter(
+            AssignmentSubmission.evaluation_key == evaluation_key,
+            AssignmentSubmission.evaluation_json.isnot(None),
+            AssignmentSubmission.submitted_at >= cache_cutoff
+        ).order_by(AssignmentSubmission.submitted_at.desc()).first()
+
+    if cached_submission:
+        evaluation = cached_submission.evaluation_json
+        record_cache_hit("evaluate")
+    else:
+        evaluation = await evaluate_submission(
+            assignment_context=assignment_context,
+            submission_data=submission_data
+        )
 
     assignment_score = evaluation.get("score", 0)
 
@@ -212,7 +242,9 @@ async def submit_assignment(
         file_path=file_path,
         github_link=github_link,
         score=assignment_score,
-        evaluation_json=evaluation
+        evaluation_json=evaluation,
+        evaluation_key=evaluation_key,
+        evaluation_cache_hit=cached_submission is not None
     )
     db.add(submission)
 
@@ -224,7 +256,6 @@ async def submit_assignment(
     
     quiz_score = latest_quiz.score if latest_quiz else None
     
-    from datetime import datetime, timedelta
     seven_days_ago = datetime.utcnow() - timedelta(days=7)
     recent_quizzes = db.query(QuizAttempt).filter(
         QuizAttempt.user_id == current_user.id,
@@ -257,14 +288,24 @@ async def submit_assignment(
     else:
         mastery.mastery_score = new_mastery_score
 
+    bump_data_version(db, current_user.id)
     db.commit()
+    invalidate_user(current_user.id)
     db.refresh(submission)
+
+    # The next assignment on this topic is usually requested right away
+    topic = assignment.topic
+    resume_data = get_resume_data(db, current_user)
+    role = resume_data.role if resume_data and resume_data.role else "Software Engineer"
+    pregeneration.schedule("assignment", current_user.id, topic, new_level, role,
+                           lambda: generate_assignment(topic, new_level, role))
     
     response_data = {
         "submission_id": submission.id,
         "score": assignment_score,
         "evaluation": evaluation,
-        "new_mastery": mastery.mastery_score
+        "new_mastery": mastery.mastery_score,
+        "cached_evaluation": submission.evaluation_cache_hit
     }
     
     if old_level != new_level and new_mastery_score > (old_score or 0):
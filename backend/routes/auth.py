@@ -1,26 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from typing import Optional
-from database import get_db
+from database import SessionLocal, get_db
 from models.user import User
 from schemas.user_schema import UserCreate, UserLogin, UserResponse, Token, UserUpdate, PasswordUpdate
 from core.security import hash_password, verify_password, create_access_token
 from core.config import settings
 from core.response_utils import success_response, error_response
+from core.request_context import bind_user
+from core.http_cache import check_not_modified
 from jose import jwt, JWTError
 from datetime import timedelta
 from fastapi import File, UploadFile, Form
-from services.resume_ai import analyze_resume_with_ai
-import fitz # PyMuPDF
+from services.resume_ai import analyze_resume_with_ai, store_resume_topics
+from services.skill_extractor import SkillExtraction, extract_skills
+from services.topic_registry import canonical_topics
 
 router = APIRouter(prefix="/api/auth", tags=["Auth"])
 
 security = HTTPBearer()
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
-    token = credentials.credentials
-    
+def user_from_token(token: str, db: Session) -> User:
+    """Resolve a bearer token to its user; raises 401 if invalid or expired."""
     # The prompt explicitly specifies the message "Token expired" or 401
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -42,8 +44,24 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
         raise credentials_exception
     return user
 
+def get_current_user(request: Request, credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+    user = user_from_token(credentials.credentials, db)
+
+    # Attribute per-request telemetry (e.g. AI usage) to this user and route
+    route = request.scope.get("route")
+    bind_user(user.id, f"{request.method} {route.path}" if route else None)
+    check_not_modified(request, user)
+    return user
+
+def get_admin_user(current_user: User = Depends(get_current_user)):
+    admin_emails = {e.strip().lower() for e in settings.ADMIN_EMAILS.split(",") if e.strip()}
+    if current_user.email.lower() not in admin_emails:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return current_user
+
 @router.post("/signup", status_code=status.HTTP_201_CREATED)
 async def signup(
+    background_tasks: BackgroundTasks,
     name: str = Form(...),
     email: str = Form(...),
     password: str = Form(...),
@@ -66,21 +84,17 @@ async def signup(
         # Handle Resume Upload if provided
         if file and role:
             content = await file.read()
+            import fitz  # PyMuPDF, imported on first use
             doc = fitz.open(stream=content, filetype="pdf")
             resume_text = "\n".join([page.get_text() for page in doc])
             doc.close()
             
-            ai_result = await analyze_resume_with_ai(resume_text, role)
-            
-            from models.quiz import UserResumeData
-            new_resume_data = UserResumeData(
-                user_id=new_user.id, 
-                role=role, 
-                topics=ai_result.get("extracted_topics", []),
-                suggested_topics=ai_result.get("suggested_learning_topics", [])
-            )
-            db.add(new_resume_data)
-            db.commit()
+            # Topics are extracted locally and stored now; the LLM analysis
+            # (suggested topics, and the topics themselves when the resume
+            # has no skills section) finishes after the response is sent
+            skills = extract_skills(resume_text)
+            store_resume_topics(db, new_user.id, role, topics=skills.topics, suggested_topics=[])
+            background_tasks.add_task(_complete_resume_analysis, new_user.id, role, resume_text, skills)
 
         return success_response(
             data={"id": new_user.id, "email": new_user.email, "name": new_user.name},
@@ -92,6 +106,21 @@ async def signup(
         traceback.print_exc()
         return error_response(str(e), status_code=500)
 
+async def _complete_resume_analysis(user_id: int, role: str, resume_text: str, skills: SkillExtraction):
+    """Background part of signup: LLM resume analysis with its own session."""
+    db = SessionLocal()
+    try:
+        ai_result = await analyze_resume_with_ai(resume_text, role, skills if skills.from_skills_section else None)
+        store_resume_topics(
+            db, user_id, role,
+            topics=canonical_topics(ai_result.get("extracted_topics", [])) or None,
+            suggested_topics=canonical_topics(ai_result.get("suggested_learning_topics", [])),
+        )
+    except Exception as e:
+        print(f"[auth] Background resume analysis failed for user {user_id}: {str(e)}")
+    finally:
+        db.close()
+
 @router.post("/login")
 def login(user: UserLogin, db: Session = Depends(get_db)):
     db_user = db.query(User).filter(User.email == user.email).first()
@@ -1,17 +1,23 @@
-from fastapi import APIRouter, Depends, File, Form, UploadFile
+import json
+
+from fastapi import APIRouter, Depends, File, Form, Request, UploadFile, WebSocket, WebSocketDisconnect
 from typing import Any
 from fastapi import HTTPException, status
-from openai import OpenAI
 
 from core.config import settings
 from core.response_utils import success_response, error_response
-from routes.auth import get_current_user
+from core.request_context import bind_user
+from database import SessionLocal
+from routes.auth import get_current_user, user_from_token
 from schemas.interview_schema import (
     StartInterviewRequest,
     SubmitAnswerRequest,
 )
-from services.interview_ai import evaluate_interview_answer
+from ai.stt import AudioTooLarge
+from services.voice_pipeline import EmptyTranscript, iter_upload, process_voice_answer
 from services.interview_session_service import (
+    LiveInterview,
+    get_session,
     start_interview as svc_start_interview,
     submit_answer as svc_submit_answer,
 )
@@ -100,6 +106,18 @@ async def submit_answer(
         )
 
 
+def _voice_error(e: Exception):
+    if isinstance(e, AudioTooLarge):
+        return error_response(str(e), status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+    if isinstance(e, EmptyTranscript):
+        return error_response(str(e), status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    return error_response(
+        "Failed to process voice answer.",
+        data={"error": str(e)},
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+    )
+
+
 @router.post("/voice-answer")
 async def submit_voice_answer(
     audio: UploadFile = File(...),
@@ -107,45 +125,198 @@ async def submit_voice_answer(
     current_user: Any = Depends(get_current_user),
 ):
     try:
-        raw_bytes = await audio.read()
-        if not raw_bytes:
+        # Peek so an empty upload is rejected before any backend work
+        first = await audio.read(settings.STT_CHUNK_BYTES)
+        if not first:
             return error_response("Empty audio file received.", status_code=400)
 
-        import io
-
-        audio_file = io.BytesIO(raw_bytes)
-        audio_file.name = audio.filename or "answer.webm"
-
-        client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        async def chunks():
+            yield first
+            async for chunk in iter_upload(audio, settings.STT_CHUNK_BYTES):
+                yield chunk
 
-        transcription = client.audio.transcriptions.create(
-            model="gpt-4o-transcribe",
-            file=audio_file,
+        result = await process_voice_answer(
+            chunks(),
+            filename=audio.filename or "answer.webm",
+            question=question,
+            role=getattr(current_user, "role", "Software Engineer"),
+        )
+        return success_response(
+            data={
+                "transcript": result.transcript,
+                "feedback": result.feedback,
+            }
         )
+    except Exception as e:
+        return _voice_error(e)
 
-        transcript_text = getattr(transcription, "text", None) or ""
-        if not transcript_text.strip():
-            return error_response(
-                "Could not transcribe audio. Please try again.",
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
 
-        feedback = await evaluate_interview_answer(
+@router.post("/voice-answer/stream")
+async def submit_voice_answer_stream(
+    request: Request,
+    question: str,
+    filename: str = "answer.webm",
+    current_user: Any = Depends(get_current_user),
+):
+    """
+    Voice answer sent as the raw request body (e.g. chunked transfer from a
+    MediaRecorder), transcribed while it is still being uploaded.
+    """
+    try:
+        result = await process_voice_answer(
+            (chunk async for chunk in request.stream() if chunk),
+            filename=filename,
             question=question,
-            answer_transcript=transcript_text,
             role=getattr(current_user, "role", "Software Engineer"),
         )
-
         return success_response(
             data={
-                "transcript": transcript_text,
-                "feedback": feedback,
+                "transcript": result.transcript,
+                "feedback": result.feedback,
             }
         )
     except Exception as e:
-        return error_response(
-            "Failed to process voice answer.",
-            data={"error": str(e)},
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        )
+        return _voice_error(e)
+
+
+async def _accept_socket(websocket: WebSocket, token: str, endpoint: str):
+    """Authenticate a WebSocket by its token and accept it; None if rejected."""
+    db = SessionLocal()
+    try:
+        user = user_from_token(token, db)
+    except HTTPException:
+        await websocket.close(code=1008)
+        return None
+    finally:
+        db.close()
+    bind_user(user.id, endpoint)
+    await websocket.accept()
+    return user
+
+
+async def _receive_object(websocket: WebSocket) -> dict:
+    """The next client message as a JSON object; ValueError for anything else."""
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    try:
+        data = json.loads(message.get("text") or "")
+    except json.JSONDecodeError:
+        raise ValueError("Messages must be JSON objects.")
+    if not isinstance(data, dict):
+        raise ValueError("Messages must be JSON objects.")
+    return data
+
+
+@router.websocket("/voice/ws")
+async def voice_answer_socket(websocket: WebSocket, token: str):
+    """
+    Voice answer over a WebSocket (token passed as a query parameter).
+
+    The client sends {"type": "start", "question", "filename"}, then the
+    audio as binary frames, then {"type": "end"}. The server streams back
+    transcript_partial / transcript / feedback events (see
+    services/voice_pipeline.py) and finishes with
+    {"type": "done", "transcript", "feedback"} or {"type": "error", ...}.
+    """
+    user = await _accept_socket(websocket, token, "WS /api/interview/voice/ws")
+    if user is None:
+        return
 
+    try:
+        try:
+            start = await _receive_object(websocket)
+        except ValueError:
+            start = {}
+        if start.get("type") != "start" or not start.get("question"):
+            await websocket.send_json({"type": "error", "message": "Expected a start message with a question."})
+            await websocket.close()
+            return
+
+        async def frames():
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code", 1000))
+                if message.get("bytes"):
+                    yield message["bytes"]
+                elif message.get("text") and json.loads(message["text"]).get("type") == "end":
+                    return
+
+        try:
+            result = await process_voice_answer(
+                frames(),
+                filename=start.get("filename") or "answer.webm",
+                question=start["question"],
+                role=getattr(user, "role", "Software Engineer"),
+                on_event=websocket.send_json,
+            )
+            await websocket.send_json({"type": "done", "transcript": result.transcript, "feedback": result.feedback})
+        except WebSocketDisconnect:
+            raise
+        except Exception as e:
+            await websocket.send_json({"type": "error", "message": "Failed to process voice answer.", "error": str(e)})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+
+@router.websocket("/ws")
+async def interview_socket(websocket: WebSocket, token: str):
+    """
+    Live interview over a WebSocket (token passed as a query parameter).
+
+    The first client message opens the session, either
+    {"type": "start", "role", "skills", "difficulty", "resume_text"} or
+    {"type": "resume", "session_id"}; then each {"type": "answer", "answer_text"}
+    gets the next question immediately while the previous answer is scored
+    in the background (see LiveInterview for the messages sent back).
+    """
+    user = await _accept_socket(websocket, token, "WS /api/interview/ws")
+    if user is None:
+        return
+
+    live = None
+    try:
+        while True:
+            try:
+                message = await _receive_object(websocket)
+            except ValueError as e:
+                await (live.send if live else websocket.send_json)({"type": "error", "message": str(e)})
+                continue
+            kind = message.get("type")
+            try:
+                if kind == "answer" and live is not None:
+                    await live.answer(message.get("answer_text", ""))
+                elif kind == "start" and live is None:
+                    skills = message.get("skills") or []
+                    if isinstance(skills, str):
+                        skills = [s.strip() for s in skills.split(",") if s.strip()]
+                    result = await svc_start_interview(
+                        user_id=user.id,
+                        req=StartInterviewRequest(
+                            resume_text=message.get("resume_text", ""),
+                            role=message.get("role", ""),
+                            skills=skills,
+                            difficulty=message.get("difficulty", "Medium"),
+                        ),
+                    )
+                    live = LiveInterview(get_session(result.session_id, user.id), websocket.send_json)
+                    await live.send({"type": "session", "session_id": result.session_id,
+                                     "total_questions": result.total_questions})
+                    await live.send_current_question()
+                elif kind == "resume" and live is None:
+                    live = LiveInterview(get_session(message.get("session_id", ""), user.id), websocket.send_json)
+                    await live.send_current_question()
+                else:
+                    raise ValueError(f"Unexpected message type: {kind}")
+            except ValueError as e:
+                await (live.send if live else websocket.send_json)({"type": "error", "message": str(e)})
+            except Exception as e:
+                await (live.send if live else websocket.send_json)(
+                    {"type": "error", "message": "Failed to process message.", "error": str(e)})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if live is not None:
+            live.connected = False
@@ -1,16 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from core.response_utils import success_response, error_response
+from schemas.response_schema import DashboardResponse, LearningTopic
 from sqlalchemy.orm import Session
 from typing import List, Any, Optional
 from datetime import datetime, timedelta
 from database import get_db
 from routes.auth import get_current_user
+from core.sql_profiler import query_budget
+from core.http_cache import conditional_get
+from services.user_data_cache import get_mastery_map, get_resume_data
 from models.quiz import TopicMastery, UserResumeData, QuizAttempt
 from models.assignment import AssignmentSubmission
 from services.learning_engine import (
     calculate_mastery, 
     calculate_risk, 
     generate_study_plan,
+    generate_starter_plan,
     adaptive_difficulty,
     get_topic_level,
     fetch_internet_resources
@@ -20,6 +25,8 @@ from pydantic import BaseModel
 router = APIRouter(prefix="/api/learning", tags=["Learning Engine"])
 
 @router.get("/dashboard")
+@conditional_get
+@query_budget(6)
 async def get_learning_dashboard(
     current_user: Any = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -27,7 +34,7 @@ async def get_learning_dashboard(
     """Aggregate all learning metrics for the student dashboard."""
     
     # 1. Fetch Resume Data
-    resume_data = db.query(UserResumeData).filter(UserResumeData.user_id == current_user.id).first()
+    resume_data = get_resume_data(db, current_user)
     resume_topics = resume_data.topics if resume_data and resume_data.topics else []
     suggested_topics = resume_data.suggested_topics if resume_data and resume_data.suggested_topics else []
     
@@ -38,8 +45,7 @@ async def get_learning_dashboard(
     role = resume_data.role if resume_data else "Software Engineer"
 
     # 2. Fetch Performance Data
-    mastery_records = db.query(TopicMastery).filter(TopicMastery.user_id == current_user.id).all()
-    mastery_map = {m.topic: m.mastery_score for m in mastery_records}
+    mastery_map = get_mastery_map(db, current_user)
     
     quiz_attempts = db.query(QuizAttempt).filter(QuizAttempt.user_id == current_user.id).all()
     assignment_submissions = db.query(AssignmentSubmission).filter(AssignmentSubmission.user_id == current_user.id).all()
@@ -87,25 +93,12 @@ async def get_learning_dashboard(
             "level": level
         })
 
-    # 6. Default Behavior (New User) & Study Plan
+    # 6. Recommendations and study plan
     if is_new_user:
         recommended_quiz = improvement_topics[0] if improvement_topics else (resume_topics[0] if resume_topics else "General Aptitude")
         recommended_assignment = resume_topics[0] if resume_topics else "Foundational Project"
-        from services.learning_engine import generate_starter_plan
+        # Falls back to a basic plan on its own errors
         study_plan = await generate_starter_plan(resume_topics, suggested_topics, role)
-        
-        return success_response(data={
-            "is_new_user": True,
-            "mastery_heatmap": mastery_heatmap,
-            "high_risk_topics": [],
-            "resume_topics": resume_topics,
-            "improvement_topics": improvement_topics,
-            "resume_strength_topics": resume_strength_topics,
-            "recommended_quiz_topic": recommended_quiz,
-            "recommended_assignment_topic": recommended_assignment,
-            "performance_trend": [],
-            "study_plan": study_plan
-        })
     else:
         recommended_quiz = high_risk_topics[0] if high_risk_topics else (sorted_topics[0] if sorted_topics else "")
         recommended_assignment = high_risk_topics[-1] if high_risk_topics else (sorted_topics[-1] if sorted_topics else "")
@@ -115,19 +108,19 @@ async def get_learning_dashboard(
     # 7. Performance Trend (Last 10 attempts)
     sorted_quizzes = sorted(quiz_attempts, key=lambda x: x.timestamp, reverse=True)[:10]
     sorted_asgn = sorted(assignment_submissions, key=lambda x: x.submitted_at, reverse=True)[:10]
-    
+
     trend = []
     for q in sorted_quizzes:
         trend.append({"type": "Quiz", "score": q.score, "date": q.timestamp, "topic": q.topic})
     for a in sorted_asgn:
         trend.append({"type": "Assignment", "score": a.score, "date": a.submitted_at, "topic": "Project"})
-    
+
     trend.sort(key=lambda x: x["date"])
 
     return success_response(data={
-        "is_new_user": False,
+        "is_new_user": is_new_user,
         "mastery_heatmap": mastery_heatmap,
-        "high_risk_topics": high_risk_topics,
+        "high_risk_topics": [] if is_new_user else high_risk_topics,
         "resume_topics": resume_topics,
         "improvement_topics": improvement_topics,
         "resume_strength_topics": resume_strength_topics,
@@ -135,16 +128,18 @@ async def get_learning_dashboard(
         "recommended_assignment_topic": recommended_assignment,
         "performance_trend": trend[-10:],
         "study_plan": study_plan
-    })
+    }, schema=DashboardResponse)
 
 
 
 @router.get("/topics")
+@conditional_get
+@query_budget(2)
 async def get_learning_topics(
     current_user: Any = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    resume_data = db.query(UserResumeData).filter(UserResumeData.user_id == current_user.id).first()
+    resume_data = get_resume_data(db, current_user)
     topics = []
     
     if resume_data:
@@ -179,17 +174,18 @@ async def get_learning_topics(
             }
         ]
         
-    return success_response(data=topics)
+    return success_response(data=topics, schema=List[LearningTopic])
 
 
 @router.get("/topic/{topic_id}")
+@query_budget(2)
 async def get_topic_detail(
     topic_id: str,
     current_user: Any = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     title = f"Topic {topic_id}"
-    resume_data = db.query(UserResumeData).filter(UserResumeData.user_id == current_user.id).first()
+    resume_data = get_resume_data(db, current_user)
     
     if resume_data:
         all_topics = (resume_data.topics or []) + (resume_data.suggested_topics or [])
@@ -1,18 +1,98 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from core.response_utils import success_response, error_response
+from schemas.response_schema import QuizOptionsResponse, QuizResponse
 from sqlalchemy.orm import Session
 from typing import List, Any, Optional
 from database import get_db
 from routes.auth import get_current_user
+from core.sql_profiler import query_budget
+from core.http_cache import bump_data_version, conditional_get
+from services.topic_registry import canonical_topic
+from services.user_data_cache import get_mastery_map, get_resume_data, invalidate_user
 from models.quiz import TopicMastery, QuizAttempt, UserResumeData
-from services.quiz_ai import generate_quiz
+from services.quiz_ai import generate_quiz, generate_quiz_batch, quiz_payload
+from services import pregeneration
+from services.task_group import SubtaskGroup
 from services.learning_engine import calculate_mastery, get_topic_level
 from models.assignment import AssignmentSubmission
+from core.config import settings
 from datetime import datetime, timedelta
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/api/quiz", tags=["Adaptive Quiz"])
 
+PULSE_QUIZ_NAME = "Career Readiness Pulse Assessment"
+PULSE_QUESTIONS = 5
+# Share of the pulse quiz drawn from weak, medium and strong topics
+PULSE_MIX = ((0.6, "weak"), (0.3, "medium"), (0.1, "strong"))
+
+def _pulse_sections(topics: List[str], mastery_map: dict) -> List[tuple]:
+    """(topic, level, question count) for the mixed quiz, weakest topics first.
+
+    Without any mastery yet it is a diagnostic spread evenly over the resume
+    topics; otherwise PULSE_MIX of the questions come from weak (<40),
+    medium (40-70) and strong (>70) topics, skipping empty groups.
+    """
+    if not mastery_map:
+        groups = [(1.0, list(topics))]
+    else:
+        by_band = {
+            "weak": [t for t in topics if mastery_map.get(t, 0) < 40],
+            "medium": [t for t in topics if 40 <= mastery_map.get(t, 0) <= 70],
+            "strong": [t for t in topics if mastery_map.get(t, 0) > 70],
+        }
+        groups = [(share, by_band[band]) for share, band in PULSE_MIX if by_band[band]]
+    if not groups:
+        return []
+
+    # Largest-remainder split of PULSE_QUESTIONS over the non-empty groups
+    total_share = sum(share for share, _ in groups)
+    quotas = [share / total_share * PULSE_QUESTIONS for share, _ in groups]
+    counts = [int(q) for q in quotas]
+    for i in sorted(range(len(groups)), key=lambda i: quotas[i] - counts[i], reverse=True)[:PULSE_QUESTIONS - sum(counts)]:
+        counts[i] += 1
+
+    per_topic: dict = {}
+    for (_, group_topics), count in zip(groups, counts):
+        for i in range(count):
+            topic = group_topics[i % len(group_topics)]
+            per_topic[topic] = per_topic.get(topic, 0) + 1
+    return [(topic, get_topic_level(mastery_map.get(topic)), count) for topic, count in per_topic.items()]
+
+async def _pulse_questions(sections: List[tuple], role: str) -> List[dict]:
+    """PULSE_QUESTIONS questions for `sections` from one batched call.
+
+    Sections the batch could not produce are generated on their own as a
+    standalone quiz; if the quiz is still short it fails rather than being
+    served with fewer questions.
+    """
+    generated = await generate_quiz_batch(sections, role)
+    missing = [(topic, level) for topic, level, _ in sections if (topic, level) not in generated]
+    if missing:
+        print(f"[quiz] Pulse quiz: generating {len(missing)} missing section(s) separately")
+        async with SubtaskGroup() as group:
+            for topic, level in missing:
+                group.spawn(f"{topic}|{level}", generate_quiz(topic, level, role))
+        for topic, level in missing:
+            quiz = group.result(f"{topic}|{level}", default=None)
+            if quiz:
+                generated[(topic, level)] = quiz["questions"]
+
+    questions = [q for topic, level, count in sections for q in generated.get((topic, level), [])[:count]]
+    if len(questions) < PULSE_QUESTIONS:
+        raise HTTPException(status_code=500, detail="Failed to generate AI quiz.")
+    for i, q in enumerate(questions):
+        q["id"] = i + 1
+    return questions
+
+async def _full_quizzes(pairs: List[tuple], role: str) -> dict:
+    """Standalone 5-question quizzes for (topic, level) pairs from one batched call."""
+    generated = await generate_quiz_batch([(topic, level, 5) for topic, level in pairs], role)
+    return {
+        (topic, level): quiz_payload(f"{level} Quiz: {topic}", topic, level, questions)
+        for (topic, level), questions in generated.items()
+    }
+
 class QuizGenerateRequest(BaseModel):
     topic: str
 
@@ -22,32 +102,32 @@ class QuizSubmitRequest(BaseModel):
     total_questions: int
 
 @router.get("/options")
+@conditional_get
+@query_budget(3)
 async def get_quiz_options(
     current_user: Any = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Retrieve quiz options based on resume topics and mastery."""
-    resume_data = db.query(UserResumeData).filter(UserResumeData.user_id == current_user.id).first()
+    resume_data = get_resume_data(db, current_user)
     if not resume_data:
         return success_response(data={
             "resume_topics": [],
             "recommended_topics": [],
-            "mixed_quiz_name": "Career Readiness Pulse Assessment",
+            "mixed_quiz_name": PULSE_QUIZ_NAME,
             "mode": "Diagnostic Mode"
-        })
+        }, schema=QuizOptionsResponse)
 
-    # Fetch mastery records
-    mastery_records = db.query(TopicMastery).filter(TopicMastery.user_id == current_user.id).all()
-    mastery_map = {m.topic: m.mastery_score for m in mastery_records}
+    mastery_map = get_mastery_map(db, current_user)
 
     recommended_topics = [t for t in resume_data.topics if mastery_map.get(t, 0) < 50]
     
     return success_response(data={
         "resume_topics": resume_data.topics,
         "recommended_topics": recommended_topics,
-        "mixed_quiz_name": "Career Readiness Pulse Assessment",
-        "mode": "Diagnostic" if not mastery_records else "Adaptive"
-    })
+        "mixed_quiz_name": PULSE_QUIZ_NAME,
+        "mode": "Diagnostic" if not mastery_map else "Adaptive"
+    }, schema=QuizOptionsResponse)
 
 @router.post("/generate")
 async def generate_new_quiz(
@@ -60,47 +140,37 @@ async def generate_new_quiz(
         return error_response("Topic is required", status_code=400)
         
     role = "Software Engineer"
-    resume_data = db.query(UserResumeData).filter(UserResumeData.user_id == current_user.id).first()
+    resume_data = get_resume_data(db, current_user)
     if resume_data and resume_data.role:
         role = resume_data.role
 
-    if quiz_req.topic == "Career Readiness Pulse Assessment":
+    if quiz_req.topic == PULSE_QUIZ_NAME:
         if not resume_data:
              return error_response("Resume data required for mixed quiz.", status_code=400)
         
-        # Get all mastery records
-        mastery_records = db.query(TopicMastery).filter(TopicMastery.user_id == current_user.id).all()
-        mastery_map = {m.topic: m.mastery_score for m in mastery_records}
-        
-        # Split topics
-        weak = [t for t in resume_data.topics if mastery_map.get(t, 0) < 40]
-        medium = [t for t in resume_data.topics if 40 <= mastery_map.get(t, 0) <= 70]
-        strong = [t for t in resume_data.topics if mastery_map.get(t, 0) > 70]
-        
-        if not mastery_records:
-             focus_prompt = f"Diagnostic mixed quiz covering: {', '.join(resume_data.topics)}"
-             mastery_score = None
-        else:
-             focus_prompt = (
-                 f"Mixed quiz: 60% from weak topics ({', '.join(weak) or 'N/A'}), "
-                 f"30% from medium topics ({', '.join(medium) or 'N/A'}), "
-                 f"10% from strong topics ({', '.join(strong) or 'N/A'})"
-             )
-             mastery_score = 50 
-        
-        level = get_topic_level(mastery_score)
-        quiz = await generate_quiz(quiz_req.topic, level, role, difficulty="Mixed")
-        return success_response(data=quiz)
+        mastery_map = get_mastery_map(db, current_user)
+        sections = _pulse_sections(resume_data.topics, mastery_map)
+        if not sections:
+             return error_response("Resume data required for mixed quiz.", status_code=400)
 
-    mastery = db.query(TopicMastery).filter(
-        TopicMastery.user_id == current_user.id,
-        TopicMastery.topic == quiz_req.topic
-    ).first()
-    
-    mastery_score = mastery.mastery_score if mastery else None
+        # One provider call for every topic instead of one per topic
+        questions = await _pulse_questions(sections, role)
+
+        if settings.PREGEN_PULSE_ENABLED:
+            # The weakest topics are the likely next quizzes: fetch them in one batch too
+            next_pairs = [(topic, level) for topic, level, _ in sections][:settings.PREGEN_PULSE_TOPICS]
+            pregeneration.schedule_batch("quiz", current_user.id, role, next_pairs,
+                                         lambda pairs: _full_quizzes(pairs, role))
+        return success_response(data=quiz_payload(PULSE_QUIZ_NAME, PULSE_QUIZ_NAME, "Mixed", questions),
+                                schema=QuizResponse)
+
+    topic = canonical_topic(quiz_req.topic)
+    mastery_score = get_mastery_map(db, current_user).get(topic)
     level = get_topic_level(mastery_score)
-    quiz = await generate_quiz(quiz_req.topic, level, role)
-    return success_response(data=quiz)
+    quiz = await pregeneration.take("quiz", current_user.id, topic, level, role)
+    if quiz is None:
+        quiz = await generate_quiz(topic, level, role)
+    return success_response(data=quiz, schema=QuizResponse)
 
 @router.post("/submit")
 async def submit_quiz(
@@ -109,6 +179,7 @@ async def submit_quiz(
     db: Session = Depends(get_db)
 ):
     """Calculate score, update mastery, and record attempt."""
+    topic = canonical_topic(submission.topic)
     score = (submission.correct_answers / submission.total_questions) * 100 if submission.total_questions > 0 else 0
     
     # Consistency Logic
@@ -127,7 +198,7 @@ async def submit_quiz(
     from models.assignment import Assignment
     latest_assignment = db.query(AssignmentSubmission).join(Assignment).filter(
         AssignmentSubmission.user_id == current_user.id,
-        Assignment.topic == submission.topic
+        Assignment.topic == topic
     ).order_by(AssignmentSubmission.submitted_at.desc()).first()
     
     assignment_score = latest_assignment.score if latest_assignment else None
@@ -135,7 +206,7 @@ async def submit_quiz(
     # FIX: Fetch mastery record first to get old level
     mastery = db.query(TopicMastery).filter(
         TopicMastery.user_id == current_user.id,
-        TopicMastery.topic == submission.topic
+        TopicMastery.topic == topic
     ).first()
     
     old_score = mastery.mastery_score if mastery else None
@@ -148,7 +219,7 @@ async def submit_quiz(
     if not mastery:
         mastery = TopicMastery(
             user_id=current_user.id,
-            topic=submission.topic,
+            topic=topic,
             mastery_score=new_mastery_score
         )
         db.add(mastery)
@@ -158,14 +229,22 @@ async def submit_quiz(
     # Record attempt
     attempt = QuizAttempt(
         user_id=current_user.id,
-        topic=submission.topic,
+        topic=topic,
         score=score,
         total_questions=submission.total_questions,
         correct_answers=submission.correct_answers
     )
     db.add(attempt)
+    bump_data_version(db, current_user.id)
     db.commit()
-    
+    invalidate_user(current_user.id)
+
+    # The next quiz on this topic is usually requested right away
+    resume_data = get_resume_data(db, current_user)
+    role = resume_data.role if resume_data and resume_data.role else "Software Engineer"
+    pregeneration.schedule("quiz", current_user.id, topic, new_level, role,
+                           lambda: generate_quiz(topic, new_level, role))
+
     response_data = {
         "score": round(score, 2),
         "topic_accuracy": round(score, 2),
@@ -174,7 +253,7 @@ async def submit_quiz(
     
     if old_level != new_level and new_mastery_score > (old_score or 0):
         response_data["level_up"] = True
-        response_data["topic"] = submission.topic
+        response_data["topic"] = topic
         response_data["new_level"] = new_level
     
     return success_response(data=response_data)
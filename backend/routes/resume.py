@@ -2,14 +2,15 @@ from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile,
 from pydantic import BaseModel
 from typing import List, Any, Optional
 from core.response_utils import success_response, error_response
-import fitz  # PyMuPDF
 from sqlalchemy.orm import Session
 from database import get_db
-from models.quiz import UserResumeData
 
 from routes.auth import get_current_user
 from core.config import settings
-from services.resume_ai import analyze_resume_with_ai
+from ai.key_pool import configured_keys
+from services.topic_registry import canonical_topics
+from services.resume_ai import analyze_resume_with_ai, store_resume_topics
+from services.skill_extractor import extract_skills
 
 router = APIRouter(prefix="/api/resume", tags=["Resume Analysis"])
 
@@ -45,6 +46,7 @@ async def analyze_resume(
                 detail="File size exceeds 5 MB limit.",
             )
         try:
+            import fitz  # PyMuPDF, imported on first use
             doc = fitz.open(stream=content, filetype="pdf")
             extracted_pages = []
             for page in doc:
@@ -77,33 +79,27 @@ async def analyze_resume(
         )
 
     # Ensure OpenAI API key is configured
-    if not settings.OPENAI_API_KEY:
+    if settings.AI_PROVIDER == "openai" and not configured_keys("openai"):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="OpenAI API key is not configured.",
         )
 
+    # Topics from the local extractor are usable right away. With a skills
+    # section they are final and the LLM only scores the resume and suggests
+    # what to learn next; without one the LLM extracts the topics as well
+    skills = extract_skills(resume_text)
+    if skills.topics:
+        store_resume_topics(db, current_user.id, role, topics=skills.topics)
+
     # Call AI analysis service
-    ai_result = await analyze_resume_with_ai(resume_text, role)
+    ai_result = await analyze_resume_with_ai(resume_text, role, skills if skills.from_skills_section else None)
 
-    # Save extracted topics to DB for Adaptive Quiz
-    extracted_topics = ai_result.get("extracted_topics", [])
-    suggested_topics = ai_result.get("suggested_learning_topics", [])
+    # Save extracted topics to DB for Adaptive Quiz (canonical names, see topic_registry)
+    extracted_topics = canonical_topics(ai_result.get("extracted_topics", []))
+    suggested_topics = canonical_topics(ai_result.get("suggested_learning_topics", []))
     if extracted_topics or suggested_topics:
-        user_resume = db.query(UserResumeData).filter(UserResumeData.user_id == current_user.id).first()
-        if user_resume:
-            user_resume.topics = extracted_topics
-            user_resume.suggested_topics = suggested_topics
-            user_resume.role = role
-        else:
-            new_resume_data = UserResumeData(
-                user_id=current_user.id, 
-                role=role, 
-                topics=extracted_topics,
-                suggested_topics=suggested_topics
-            )
-            db.add(new_resume_data)
-        db.commit()
+        store_resume_topics(db, current_user.id, role, topics=extracted_topics, suggested_topics=suggested_topics)
 
     # Compute weighted resume strength
     try:
@@ -124,4 +120,16 @@ async def analyze_resume(
         + structure_score * 0.10
     )
 
+    response_payload = {
+        "resume_strength": resume_strength,
+        "skill_relevance": skill_relevance,
+        "project_depth": project_depth,
+        "experience_score": experience_score,
+        "structure_score": structure_score,
+        "missing_skills": ai_result.get("missing_skills", []),
+        "recommendations": ai_result.get("recommendations", []),
+        "extracted_topics": extracted_topics,
+        "suggested_learning_topics": suggested_topics,
+    }
+
     return success_response(data=response_payload, message="Resume analyzed successfully")
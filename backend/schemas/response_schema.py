@@ -0,0 +1,91 @@
+"""Response schemas for the hot read endpoints.
+
+Passed as ``success_response(..., schema=...)`` so the payload is validated
+and serialized by a precompiled pydantic-core serializer. Parts produced by
+the AI (quiz questions, study plans) stay loosely typed.
+"""
+from pydantic import BaseModel, ConfigDict
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+
+# ── Learning ────────────────────────────────────────────────────────────────
+
+class HeatmapEntry(BaseModel):
+    topic: str
+    mastery: Optional[float] = None
+    risk: str
+    level: str
+
+class TrendPoint(BaseModel):
+    type: str
+    score: Optional[float] = None
+    date: datetime
+    topic: str
+
+class DashboardResponse(BaseModel):
+    is_new_user: bool
+    mastery_heatmap: List[HeatmapEntry]
+    high_risk_topics: List[str]
+    resume_topics: List[str]
+    improvement_topics: List[str]
+    resume_strength_topics: List[str]
+    recommended_quiz_topic: str
+    recommended_assignment_topic: str
+    performance_trend: List[TrendPoint]
+    study_plan: Any  # AI output: usually an object, but not guaranteed
+
+class LearningTopic(BaseModel):
+    id: str
+    title: str
+    description: str
+    progress: int
+    totalModules: int
+    completedModules: int
+
+
+# ── Quiz ────────────────────────────────────────────────────────────────────
+
+class QuizOptionsResponse(BaseModel):
+    resume_topics: List[str]
+    recommended_topics: List[str]
+    mixed_quiz_name: str
+    mode: str
+
+class QuizResponse(BaseModel):
+    title: str
+    topic: str
+    difficulty: str
+    time_limit: int
+    questions: List[Dict[str, Any]]
+
+
+# ── Assignment ──────────────────────────────────────────────────────────────
+
+class AssignmentOptionsResponse(BaseModel):
+    skill_projects: List[str]
+    growth_projects: List[str]
+    capstone: str
+
+class AssignmentListItem(BaseModel):
+    id: int
+    title: str
+    topic: str
+    difficulty: str
+    status: str
+    score: Optional[float] = None
+    created_at: int
+
+class AssignmentResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    user_id: int
+    title: str
+    topic: str
+    type: str
+    difficulty: str
+    instructions: str
+    expected_deliverables: str
+    evaluation_criteria: str
+    created_at: Optional[datetime] = None
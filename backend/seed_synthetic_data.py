@@ -0,0 +1,244 @@
+"""Populate the database with synthetic learning data for scaling tests.
+
+Generates users with resume topics, quiz attempts, assignments, submissions
+and the resulting TopicMastery rows, using bulk executemany inserts in
+chunks so 10k-1M row datasets can be produced quickly.
+
+Usage:
+    python seed_synthetic_data.py --users 1000
+    python seed_synthetic_data.py --users 20000 --quizzes-per-topic 6 --chunk-size 500
+    DATABASE_URL=sqlite:///./bench.db python seed_synthetic_data.py --users 50000
+
+All generated users share the password given by --password.
+"""
+import argparse
+import math
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, '.')
+
+from sqlalchemy import func, select, text
+
+from database import engine
+from migrations import upgrade
+from models.user import User
+from models.quiz import TopicMastery, QuizAttempt, UserResumeData
+from models.assignment import Assignment, AssignmentSubmission
+from core.security import hash_password
+from services.learning_engine import calculate_mastery
+
+TOPIC_POOL = [
+    "Python", "JavaScript", "React", "SQL", "Git", "REST APIs", "FastAPI", "Django", "Node.js",
+    "TypeScript", "Docker", "Kubernetes", "AWS", "CI/CD", "Redis", "PostgreSQL", "MongoDB",
+    "System Design", "Data Structures", "Algorithms", "GraphQL", "Microservices", "Linux",
+    "Testing", "HTML", "CSS", "Java", "Spring Boot", "Go", "Machine Learning",
+]
+ROLES = ["Backend Developer", "Frontend Developer", "Full Stack Developer", "Data Engineer", "DevOps Engineer"]
+LEVELS = ["Basic", "Intermediate", "Advanced"]
+
+parser = argparse.ArgumentParser(description="Generate synthetic learning data")
+parser.add_argument("--users", type=int, default=1000)
+parser.add_argument("--topics-per-user", type=int, default=6, help="Mean resume topics per user")
+parser.add_argument("--quizzes-per-topic", type=float, default=3.0, help="Mean quiz attempts per practiced topic")
+parser.add_argument("--assignments-per-topic", type=float, default=1.0, help="Mean assignments per practiced topic")
+parser.add_argument("--submissions-per-assignment", type=float, default=1.5, help="Mean submissions per assignment")
+parser.add_argument("--active-ratio", type=float, default=0.7, help="Fraction of users with any activity")
+parser.add_argument("--days", type=int, default=90, help="Spread activity over this many past days")
+parser.add_argument("--chunk-size", type=int, default=1000, help="Users generated and inserted per transaction")
+parser.add_argument("--password", default="synthetic123")
+parser.add_argument("--seed", type=int, default=42)
+args = parser.parse_args()
+
+rng = random.Random(args.seed)
+
+# Zipf-like topic popularity: a few topics dominate, long tail of others
+_topic_weights = [1.0 / (rank + 1) ** 0.9 for rank in range(len(TOPIC_POOL))]
+
+
+def _poisson(mean: float) -> int:
+    # Knuth's method is fine for the small means used here
+    limit, k, p = math.exp(-mean), 0, 1.0
+    while True:
+        p *= rng.random()
+        if p <= limit:
+            return k
+        k += 1
+
+
+def _pick_topics(count: int):
+    chosen = set()
+    while len(chosen) < min(count, len(TOPIC_POOL)):
+        chosen.add(rng.choices(TOPIC_POOL, weights=_topic_weights)[0])
+    return list(chosen)
+
+
+def _timestamp(now: datetime) -> datetime:
+    # Activity skews recent: exponential decay over the window
+    days_ago = min(args.days, rng.expovariate(3.0 / args.days))
+    return now - timedelta(days=days_ago, seconds=rng.randint(0, 86399))
+
+
+def _next_id(conn, table) -> int:
+    return (conn.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+
+
+def generate_chunk(conn, first_user_no: int, count: int, hashed_pwd: str, run_tag: str, now: datetime):
+    users_t = User.__table__
+    ids = {t: _next_id(conn, t.__table__) for t in (User, Assignment)}
+
+    users, resumes, quizzes, assignments, submissions, masteries = [], [], [], [], [], []
+
+    for n in range(first_user_no, first_user_no + count):
+        user_id = ids[User]
+        ids[User] += 1
+        users.append({
+            "id": user_id,
+            "name": f"Synthetic User {n}",
+            "email": f"synthetic_{run_tag}_{n}@example.com",
+            "hashed_password": hashed_pwd,
+            "is_active": True,
+            "created_at": now - timedelta(days=rng.uniform(0, args.days)),
+        })
+
+        topics = _pick_topics(max(1, _poisson(args.topics_per_user)))
+        suggested = _pick_topics(rng.randint(2, 5))
+        resumes.append({
+            "user_id": user_id,
+            "role": rng.choice(ROLES),
+            "topics": topics,
+            "suggested_topics": [t for t in suggested if t not in topics],
+            "updated_at": now,
+        })
+
+        if rng.random() > args.active_ratio:
+            continue
+
+        # Per-user ability drives all scores so topics of one user correlate
+        ability = rng.betavariate(2.5, 2.0) * 100
+        practiced = [t for t in topics if rng.random() < 0.7] or topics[:1]
+        activity_times = []
+        user_rows = []
+
+        for topic in practiced:
+            topic_skill = min(100, max(0, rng.gauss(ability, 12)))
+            latest_quiz, latest_assignment = None, None
+
+            for _ in range(_poisson(args.quizzes_per_topic)):
+                total = rng.choice([5, 5, 5, 10])
+                score_target = min(100, max(0, rng.gauss(topic_skill, 15)))
+                correct = round(total * score_target / 100)
+                ts = _timestamp(now)
+                quizzes.append({
+                    "user_id": user_id, "topic": topic, "score": correct / total * 100,
+                    "total_questions": total, "correct_answers": correct, "timestamp": ts,
+                })
+                activity_times.append(ts)
+                if latest_quiz is None or ts > latest_quiz[0]:
+                    latest_quiz = (ts, correct / total * 100)
+
+            for _ in range(_poisson(args.assignments_per_topic)):
+                assignment_id = ids[Assignment]
+                ids[Assignment] += 1
+                created = _timestamp(now)
+                level = LEVELS[min(2, int(topic_skill // 40))]
+                assignments.append({
+                    "id": assignment_id, "user_id": user_id,
+                    "title": f"{level} Assignment on {topic}", "topic": topic, "type": "coding",
+                    "difficulty": level,
+                    "instructions": f"**Problem Statement:**\nBuild a small {topic} exercise.",
+                    "expected_deliverables": "Code submission",
+                    "evaluation_criteria": "Correctness, Structure, Edge cases",
+                    "created_at": created,
+                })
+                for _ in range(_poisson(args.submissions_per_assignment)):
+                    score = round(min(100, max(0, rng.gauss(topic_skill, 10))))
+                    ts = created + timedelta(hours=rng.uniform(1, 72))
+                    submissions.append({
+                        "assignment_id": assignment_id, "user_id": user_id,
+                        "code_text": "def solve(data):\n    return sorted(data)\n",
+                        "file_path": None, "github_link": None, "score": score,
+                        "evaluation_json": {"score": score, "concept_coverage": "synthetic",
+                                            "mistakes": [], "improvement_suggestions": []},
+                        "submitted_at": ts,
+                    })
+                    activity_times.append(ts)
+                    if latest_assignment is None or ts > latest_assignment[0]:
+                        latest_assignment = (ts, score)
+
+            user_rows.append((topic, latest_quiz, latest_assignment))
+
+        # Mastery mirrors the request handlers: latest quiz/assignment, and the
+        # consistency the handler saw when it wrote the row (activity in the 7
+        # days before the pair's latest quiz or submission, not counting it)
+        for topic, latest_quiz, latest_assignment in user_rows:
+            if latest_quiz is None and latest_assignment is None:
+                continue
+            written_at = max(latest[0] for latest in (latest_quiz, latest_assignment) if latest)
+            week_before = written_at - timedelta(days=7)
+            consistency = min(100, sum(1 for t in activity_times if week_before <= t < written_at) * 10)
+            mastery = calculate_mastery(
+                latest_quiz[1] if latest_quiz else None,
+                latest_assignment[1] if latest_assignment else None,
+                consistency,
+            )
+            if mastery is not None:
+                masteries.append({"user_id": user_id, "topic": topic, "mastery_score": mastery, "updated_at": now})
+
+    # executemany per table, parents first
+    conn.execute(users_t.insert(), users)
+    conn.execute(UserResumeData.__table__.insert(), resumes)
+    if assignments:
+        conn.execute(Assignment.__table__.insert(), assignments)
+    for table, rows in ((QuizAttempt.__table__, quizzes),
+                        (AssignmentSubmission.__table__, submissions),
+                        (TopicMastery.__table__, masteries)):
+        if rows:
+            conn.execute(table.insert(), rows)
+
+    return {
+        "users": len(users), "resume_data": len(resumes), "quiz_attempts": len(quizzes),
+        "assignments": len(assignments), "assignment_submissions": len(submissions),
+        "topic_mastery": len(masteries),
+    }
+
+
+def main():
+    upgrade(engine)
+
+    hashed_pwd = hash_password(args.password)  # hash once, bcrypt is deliberately slow
+    run_tag = f"{int(time.time())}"
+    now = datetime.utcnow()
+    totals = {}
+    started = time.perf_counter()
+
+    for first in range(0, args.users, args.chunk_size):
+        count = min(args.chunk_size, args.users - first)
+        with engine.begin() as conn:
+            counts = generate_chunk(conn, first, count, hashed_pwd, run_tag, now)
+        for k, v in counts.items():
+            totals[k] = totals.get(k, 0) + v
+        print(f"[seed] {first + count}/{args.users} users, {sum(totals.values())} rows "
+              f"({time.perf_counter() - started:.1f}s)")
+
+    # Explicit ids bypass PostgreSQL sequences; move them past the new rows
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            for table in (User.__table__, Assignment.__table__):
+                conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                    f"(SELECT COALESCE(MAX(id), 1) FROM {table.name}))"
+                ))
+
+    elapsed = time.perf_counter() - started
+    print("\n[seed] Done in %.1fs" % elapsed)
+    for k, v in totals.items():
+        print(f"  {k:<24} {v:>10}")
+    print(f"  {'rows/sec':<24} {sum(totals.values()) / max(elapsed, 1e-9):>10.0f}")
+    print(f"\nLogin as synthetic_{run_tag}_0@example.com / {args.password}")
+
+
+if __name__ == "__main__":
+    main()
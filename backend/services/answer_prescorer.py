@@ -0,0 +1,180 @@
+"""Local pre-scoring of interview answers.
+
+Every InterviewQuestion carries expected_keywords, so the keyword and
+completeness components of the score can be computed locally, in
+microseconds, instead of by the LLM:
+
+- keyword: share of expected keywords found in the answer. Keywords and
+  answer are tokenized and stemmed, then matched as phrases with an
+  Aho-Corasick automaton over stem sequences, so "trade-offs" matches
+  "tradeoff" and "trade off", and "scaling" matches "scalability".
+- completeness: answer length against the expected length for the
+  question's difficulty, plus structure signals (several sentences,
+  connectives such as "because" or "for example").
+
+prescore_answer() also flags answers that need no LLM at all: empty or
+trivial ("I don't know"; optionally anything under
+INTERVIEW_PRESCORE_MIN_WORDS). Everything else goes to the LLM: a few
+words can be entirely correct, and a correct answer may share no word
+with the question or its expected keywords.
+"""
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+from core.config import settings
+from services.phrase_automaton import PhraseAutomaton
+
+_WORD = re.compile(r"[a-z0-9]+(?:[+#]+)?")
+
+STOPWORDS = frozenset("""
+a an and are as at be been but by can could did do does for from had has have how i if in into is it its
+me my of on or our so that the their them then there these they this to was we were what when where which
+while who why will with would you your about also just than too very
+""".split())
+
+# Phrases that carry no content on their own ("I don't know", "no idea", ...)
+_NON_ANSWERS = re.compile(
+    r"^\W*(i\s+)?(do\s*n[o']?t|dont|don't)\s+know\W*$|^\W*(no\s+idea|not\s+sure|skip|pass|n/?a|idk|nothing)\W*$",
+    re.IGNORECASE,
+)
+
+_CONNECTIVES = ("because", "therefore", "for example", "for instance", "first", "then", "finally",
+                "however", "so that", "which means", "as a result", "trade")
+
+# Expected answer length (words) by question difficulty
+TARGET_WORDS = {"easy": 60, "medium": 100, "hard": 140}
+
+
+# ── Stemming ────────────────────────────────────────────────────────────────
+
+# Longest suffix first; stems shorter than 3 characters are left alone
+_SUFFIXES = ("ational", "ization", "ability", "fulness", "ousness", "iveness", "ations", "nesses",
+             "ments", "ation", "ility", "ement", "ities", "ness", "ment", "ings", "able", "ible",
+             "ity", "ies", "ing", "ers", "ion", "est", "ful", "ous", "ive", "ize", "ise", "ed",
+             "er", "ly", "es", "al", "s")
+
+
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """Crude suffix-stripping stemmer; only needs to be consistent, not linguistic."""
+    if len(word) <= 3 or not word.isalpha():
+        return word
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[: -len(suffix)]
+            break
+    # "scalab(le)" / "scal(ing)" / "scal(e)" all collapse to the same stem
+    if word.endswith("e") and len(word) > 3:
+        word = word[:-1]
+    if len(word) > 3 and word[-1] == word[-2] and word[-1] not in "aeiou":
+        word = word[:-1]  # "runn(ing)" -> "run"
+    return word
+
+
+def stems(text: str) -> List[str]:
+    return [stem(w) for w in _WORD.findall(text.casefold())]
+
+
+def keyword_stems(keyword: str) -> Tuple[str, ...]:
+    """Stem sequence of an expected keyword, joining hyphenated compounds.
+
+    "trade-offs" must match "tradeoffs" as well as "trade offs", so both the
+    split form and the joined form are indexed (see KeywordMatcher).
+    """
+    return tuple(s for s in stems(keyword) if s not in STOPWORDS) or tuple(stems(keyword))
+
+
+# ── Keyword matching ────────────────────────────────────────────────────────
+
+class KeywordMatcher:
+    """Multi-phrase matcher: finds all expected keywords in one pass over the answer."""
+
+    def __init__(self, keywords: Sequence[str]):
+        self.keywords = list(keywords)
+        self._automaton = PhraseAutomaton()
+        for index, keyword in enumerate(self.keywords):
+            for pattern in self._variants(keyword):
+                self._automaton.add(pattern, index)
+        self._automaton.build()
+
+    @staticmethod
+    def _variants(keyword: str):
+        split = keyword_stems(keyword)
+        yield split
+        joined = stem(re.sub(r"[^a-z0-9+#]", "", keyword.casefold()))
+        if joined and (joined,) != split:
+            yield (joined,)
+
+    def find(self, answer_stems: Sequence[str]) -> set:
+        """Indexes of the keywords occurring in the stemmed answer."""
+        return {index for _, _, index in self._automaton.find(answer_stems)}
+
+
+@lru_cache(maxsize=1024)
+def _matcher(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(keywords)
+
+
+# ── Scoring ─────────────────────────────────────────────────────────────────
+
+@dataclass
+class PreScore:
+    keyword: float
+    completeness: float
+    word_count: int
+    matched_keywords: List[str] = field(default_factory=list)
+    missing_keywords: List[str] = field(default_factory=list)
+    # "empty" | "trivial" when the LLM can be skipped
+    verdict: Optional[str] = None
+
+
+def _completeness(answer: str, word_count: int, difficulty: str) -> float:
+    target = TARGET_WORDS.get((difficulty or "").lower(), TARGET_WORDS["medium"])
+    length_score = min(1.0, word_count / target) * 70
+    sentences = len([s for s in re.split(r"[.!?\n]+", answer) if len(s.split()) >= 3])
+    lowered = answer.casefold()
+    connectives = sum(1 for c in _CONNECTIVES if c in lowered)
+    structure_score = min(15, 5 * max(0, sentences - 1)) + min(15, 5 * connectives)
+    return round(min(100.0, length_score + structure_score), 2)
+
+
+def prescore_answer(question, answer_text: str) -> PreScore:
+    """Local keyword/completeness scores and a skip verdict for one answer."""
+    answer = (answer_text or "").strip()
+    answer_stems = stems(answer)
+    word_count = len(answer_stems)
+    keywords = [k for k in question.expected_keywords if k and k.strip()]
+
+    matched_idx = _matcher(tuple(keywords)).find(answer_stems) if keywords else set()
+    matched = [k for i, k in enumerate(keywords) if i in matched_idx]
+    missing = [k for i, k in enumerate(keywords) if i not in matched_idx]
+    keyword_score = round(100.0 * len(matched) / len(keywords), 2) if keywords else 0.0
+
+    result = PreScore(
+        keyword=keyword_score,
+        completeness=_completeness(answer, word_count, question.difficulty) if answer else 0.0,
+        word_count=word_count,
+        matched_keywords=matched,
+        missing_keywords=missing,
+    )
+
+    if not answer_stems:
+        result.verdict = "empty"
+    elif _NON_ANSWERS.match(answer) or word_count < settings.INTERVIEW_PRESCORE_MIN_WORDS:
+        result.verdict = "trivial"
+    return result
+
+
+_SKIP_FEEDBACK = {
+    "empty": "No answer was given. Try to respond to every question, even briefly, and explain your reasoning.",
+    "trivial": "The answer is too short to evaluate. Explain your approach step by step and give a concrete example.",
+}
+
+
+def skip_feedback(prescore: PreScore) -> str:
+    feedback = _SKIP_FEEDBACK[prescore.verdict]
+    if prescore.missing_keywords:
+        feedback += f" A strong answer would mention: {', '.join(prescore.missing_keywords)}."
+    return feedback
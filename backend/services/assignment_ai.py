@@ -1,7 +1,69 @@
 from ai.provider_factory import get_ai_provider
+from ai.prompts import PromptTemplate, prompt_registry
+from ai.usage import record_retry
+from core.config import settings
+from services.submission_digest import digest_submission
+import hashlib
 import json
 from fastapi import HTTPException, status
 
+# Static instructions and schema first, per-request data last (see ai/prompts.py)
+ASSIGNMENT_PROMPT = prompt_registry.register(PromptTemplate(
+    "assignment.generate", 1,
+    instructions=(
+        "You are a senior technical educator.\n\n"
+        "Generate a practical assignment for the topic, level and role given at the end, "
+        "following the level instructions given there.\n\n"
+        "Return JSON only:\n"
+        "{\n"
+        "  \"title\": \"\",\n"
+        "  \"difficulty\": \"\",\n"
+        "  \"problem_statement\": \"\",\n"
+        "  \"requirements\": [],\n"
+        "  \"constraints\": [],\n"
+        "  \"expected_output\": \"\",\n"
+        "  \"evaluation_criteria\": []\n"
+        "}\n\n"
+        "Do NOT generate theory explanation.\n"
+        "Do NOT ask random questions.\n"
+        "Make it practical and skill-based."
+    ),
+    data=(
+        "Topic: $topic\n"
+        "Level: $level\n"
+        "Role: $role\n\n"
+        "Level Instructions: $level_instructions\n"
+    ),
+))
+
+EVALUATION_PROMPT = prompt_registry.register(PromptTemplate(
+    "assignment.evaluate", 1,
+    instructions=(
+        "You are an expert technical evaluator.\n"
+        "Evaluate the assignment submission given at the end strictly based on:\n"
+        "- Logical correctness\n"
+        "- Concept application\n"
+        "- Code structure\n"
+        "- Completeness\n"
+        "- Efficiency\n\n"
+        "Return ONLY JSON with this structure:\n"
+        "{\n"
+        "  \"score\": int (0-100),\n"
+        "  \"concept_coverage\": \"string\",\n"
+        "  \"mistakes\": [\"string\"],\n"
+        "  \"improvement_suggestions\": [\"string\"]\n"
+        "}\n"
+    ),
+    data=(
+        "Assignment Context:\n"
+        "Title: $title\n"
+        "Criteria: $criteria\n\n"
+        "Submission Content:\n"
+        "${digest}Code/Text: $code\n"
+        "GitHub: $github\n"
+    ),
+))
+
 async def generate_assignment(
     topic: str,
     level: str,
@@ -18,31 +80,14 @@ async def generate_assignment(
     else:  # Advanced
         level_instructions = "Generate a mini project. Include: Problem statement, Requirements, Edge cases, Evaluation criteria."
 
-    system_prompt = (
-        "You are a senior technical educator.\n\n"
-        f"Generate a practical assignment for:\n"
-        f"Topic: {topic}\n"
-        f"Level: {level}\n"
-        f"Role: {role}\n\n"
-        f"Level Instructions: {level_instructions}\n\n"
-        "Return JSON only:\n"
-        "{\n"
-        "  \"title\": \"\",\n"
-        "  \"difficulty\": \"\",\n"
-        "  \"problem_statement\": \"\",\n"
-        "  \"requirements\": [],\n"
-        "  \"constraints\": [],\n"
-        "  \"expected_output\": \"\",\n"
-        "  \"evaluation_criteria\": []\n"
-        "}\n\n"
-        "Do NOT generate theory explanation.\n"
-        "Do NOT ask random questions.\n"
-        "Make it practical and skill-based."
-    )
+    system_prompt = ASSIGNMENT_PROMPT.render(
+        topic=topic, level=level, role=role, level_instructions=level_instructions)
 
-    provider = get_ai_provider()
+    provider = get_ai_provider("assignment")
     
     for attempt_num in range(2):
+        if attempt_num > 0:
+            record_retry("assignment")
         try:
             content = await provider.generate(system_prompt)
             print("--- RAW AI OUTPUT (ASSIGNMENT) ---")
@@ -96,41 +141,65 @@ async def generate_assignment(
             
     raise HTTPException(status_code=500, detail="Failed to generate assignment after retries.")
 
+def _normalize_code(code_text):
+    """Normalize a pasted submission so whitespace-only edits hash identically."""
+    if not code_text:
+        return ""
+    lines = code_text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip("\n")
+
+def _normalize_link(github_link):
+    if not github_link:
+        return ""
+    link = github_link.strip().rstrip("/")
+    if link.endswith(".git"):
+        link = link[:-4]
+    return link.lower()
+
+def evaluation_cache_key(assignment_context: dict, submission_data: dict) -> str:
+    """Stable hash of everything the evaluator sees, used to reuse prior evaluations."""
+    parts = [
+        (assignment_context.get("title") or "").strip(),
+        (assignment_context.get("evaluation_criteria") or "").strip(),
+        _normalize_code(submission_data.get("code_text")),
+        _normalize_link(submission_data.get("github_link")),
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
 async def evaluate_submission(
     assignment_context: dict,
     submission_data: dict
 ):
     """Evaluate a submission against assignment criteria."""
     
-    system_prompt = (
-        "You are an expert technical evaluator.\n"
-        "Evaluate the following assignment submission strictly based on:\n"
-        "- Logical correctness\n"
-        "- Concept application\n"
-        "- Code structure\n"
-        "- Completeness\n"
-        "- Efficiency\n\n"
-        "Assignment Context:\n"
-        f"Title: {assignment_context.get('title')}\n"
-        f"Criteria: {assignment_context.get('evaluation_criteria')}\n\n"
-        "Return ONLY JSON with this structure:\n"
-        "{\n"
-        "  \"score\": int (0-100),\n"
-        "  \"concept_coverage\": \"string\",\n"
-        "  \"mistakes\": [\"string\"],\n"
-        "  \"improvement_suggestions\": [\"string\"]\n"
-        "}\n"
-    )
+    # Bound prompt size by the token budget rather than by submission size
+    digest = digest_submission(submission_data.get("code_text"), settings.EVALUATION_TOKEN_BUDGET)
+    if digest["truncated"]:
+        print(f"[assignment_ai] Submission digested: ~{digest['original_tokens']} -> ~{digest['digest_tokens']} tokens")
 
-    user_content = (
-        f"Submission Content:\n"
-        f"Code/Text: {submission_data.get('code_text', 'N/A')}\n"
-        f"GitHub: {submission_data.get('github_link', 'N/A')}\n"
+    user_content = ""
+    if digest["summary"]:
+        user_content += (
+            f"Structure ({digest['language']}):\n"
+            + "\n".join(f"- {line}" for line in digest["summary"])
+            + "\n"
+        )
+    if digest["truncated"]:
+        user_content += (
+            "Note: the code below was condensed to fit the review budget (comments removed, "
+            "some bodies elided). Do not penalize elided sections as missing.\n"
+        )
+    system_prompt = EVALUATION_PROMPT.render(
+        title=assignment_context.get("title"),
+        criteria=assignment_context.get("evaluation_criteria"),
+        digest=user_content,
+        code=digest["code"] or "N/A",
+        github=submission_data.get("github_link") or "N/A",
     )
 
     try:
-        provider = get_ai_provider()
-        content = await provider.generate(system_prompt + user_content)
+        provider = get_ai_provider("evaluate")
+        content = await provider.generate(system_prompt)
         
         # Clean markdown
         if content.startswith("```json"):
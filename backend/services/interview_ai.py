@@ -1,35 +1,51 @@
+from typing import Awaitable, Callable, Optional
+
+from ai.prompts import PromptTemplate, prompt_registry
 from ai.provider_factory import get_ai_provider
 
+VOICE_FEEDBACK_PROMPT = prompt_registry.register(PromptTemplate(
+    "interview.voice_feedback", 1,
+    instructions=(
+        "You are an expert interview coach.\n\n"
+        "You will receive the candidate role, a technical or behavioral interview question and the "
+        "candidate's spoken answer (already transcribed from audio).\n\n"
+        "For the given question and answer, provide concise, high-signal feedback:\n"
+        "- Start with a 1–2 sentence overall assessment.\n"
+        "- Then give 3–5 specific, numbered suggestions for improvement.\n"
+        "- Focus on structure (e.g. STAR), clarity, depth, and real-world examples.\n"
+        "- Keep the total response under 250 words.\n\n"
+        "Format your response as plain text that can be shown directly in the UI."
+    ),
+    data=(
+        "Candidate role: $role\n\n"
+        "Interview question:\n$question\n\n"
+        "Candidate answer (transcribed):\n$answer\n"
+    ),
+))
+
 
 async def evaluate_interview_answer(
     question: str,
     answer_transcript: str,
     role: str = "Software Engineer",
+    on_delta: Optional[Callable[[str], Awaitable[None]]] = None,
 ) -> str:
     """
     Use the configured LLM provider to evaluate a spoken interview answer.
 
     Returns a natural-language feedback string that the frontend can display.
+    With `on_delta`, the response is streamed and each piece of text is passed
+    to the callback as it arrives.
     """
-    system_prompt = (
-        "You are an expert interview coach.\n\n"
-        f"Candidate role: {role}\n\n"
-        "You will receive a technical or behavioral interview question and the "
-        "candidate's spoken answer (already transcribed from audio).\n\n"
-        "For the given question and answer, provide concise, high-signal feedback:\n"
-        "- Start with a 1–2 sentence overall assessment.\n"
-        "- Then give 3–5 specific, numbered suggestions for improvement.\n"
-        "- Focus on structure (e.g. STAR), clarity, depth, and real-world examples.\n"
-        "- Keep the total response under 250 words.\n\n"
-        "Format your response as plain text that can be shown directly in the UI."
-    )
+    prompt = VOICE_FEEDBACK_PROMPT.render(role=role, question=question, answer=answer_transcript)
 
-    user_prompt = (
-        f"Interview question:\n{question}\n\n"
-        f"Candidate answer (transcribed):\n{answer_transcript}\n"
-    )
+    provider = get_ai_provider("interview_answer")
+    if on_delta is None:
+        return await provider.generate(prompt)
 
-    provider = get_ai_provider()
-    feedback = await provider.generate(system_prompt + "\n\n" + user_prompt)
-    return feedback
+    parts = []
+    async for chunk in provider.generate_stream(prompt):
+        parts.append(chunk)
+        await on_delta(chunk)
+    return "".join(parts).strip()
 
@@ -1,8 +1,14 @@
+import asyncio
+import bisect
 import json
 import uuid
-from typing import Dict, Tuple
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
 
+from ai.prompts import PromptTemplate, prompt_registry
 from ai.provider_factory import get_ai_provider
+from core.config import settings
+from core.metrics import Counter, Gauge, registry
 from schemas.interview_schema import (
     AnswerRecord,
     AnswerScoreBreakdown,
@@ -15,10 +21,18 @@ from schemas.interview_schema import (
     SubmitAnswerRequest,
     SubmitAnswerResponse,
 )
+from services.answer_prescorer import prescore_answer, skip_feedback
+from services.json_stream import StringFieldStream
+from services.task_group import SubtaskGroup
 
 
 _SESSIONS: Dict[str, InterviewSession] = {}
 
+registry.register(Gauge(
+    "interview_sessions_active", "Interview sessions held in memory", func=lambda: len(_SESSIONS)))
+interview_answers_scored = registry.register(Counter(
+    "interview_answers_scored_total", "Interview answers by how they were scored", ("outcome",)))
+
 
 def _classify_category_for_aggregation(category: str) -> str:
     c = category.lower()
@@ -92,79 +106,136 @@ def _compute_career_readiness_score(
     )
     return crs
 
-async def start_interview(
-    user_id: int,
-    req: StartInterviewRequest,
-) -> StartInterviewResponse:
-    provider = get_ai_provider()
+# Question mix of a session, one LLM call per category (5 questions in total)
+QUESTION_PLAN: List[Tuple[str, int]] = [
+    ("Technical", 2),
+    ("Behavioral", 1),
+    ("System Design", 1),
+    ("Project Deep Dive", 1),
+]
 
-    system_prompt = (
-        "You are an expert technical interviewer and career coach.\n"
-        "You must return STRICT JSON only, no markdown, matching the schema provided.\n"
-    )
+# Used when the resume screen fails but questions were generated
+NEUTRAL_RESUME_ANALYSIS = ResumeAnalysis(resume_strength_score=50, role_skill_match_score=50, missing_skills=[])
 
-    user_prompt = (
-        "Analyze the candidate resume and generate 5-7 interview questions.\n\n"
-        f"Target role: {req.role}\n"
-        f"Skill stack: {', '.join(req.skills)}\n"
-        f"Difficulty preference: {req.difficulty}\n\n"
-        "Resume text:\n"
-        f"{req.resume_text}\n\n"
-        "1) First, compute:\n"
+_SYSTEM_PROMPT = (
+    "You are an expert technical interviewer and career coach.\n"
+    "You must return STRICT JSON only, no markdown, matching the schema provided.\n\n"
+)
+
+# The candidate block is per-request data, so it goes after the instructions
+_CANDIDATE_DATA = (
+    "Target role: $role\n"
+    "Skill stack: $skills\n"
+    "Difficulty preference: $difficulty\n\n"
+    "Resume text:\n"
+    "$resume_text\n"
+)
+
+SCREEN_PROMPT = prompt_registry.register(PromptTemplate(
+    "interview.screen", 1,
+    instructions=(
+        _SYSTEM_PROMPT
+        + "Screen the candidate resume (given at the end) before the interview.\n\n"
+        "Compute:\n"
         "- resume_strength_score (0-100)\n"
         "- role_skill_match_score (0-100)\n"
         "- missing_skills (list of important skills missing for this role)\n\n"
-        "2) Then generate between 5 and 7 questions across these categories:\n"
-        "- Technical\n"
-        "- Behavioral\n"
-        "- System Design\n"
-        "- Project Deep Dive\n\n"
+        "Return JSON ONLY in this shape:\n"
+        "{\n"
+        "  \"resume_strength_score\": 0,\n"
+        "  \"role_skill_match_score\": 0,\n"
+        "  \"missing_skills\": []\n"
+        "}\n"
+    ),
+    data=_CANDIDATE_DATA,
+))
+
+QUESTIONS_PROMPT = prompt_registry.register(PromptTemplate(
+    "interview.questions", 2,
+    instructions=(
+        _SYSTEM_PROMPT
+        + "Write the requested number of interview question(s) in the category given at the end "
+        "for the candidate described there.\n\n"
         "For each question, provide:\n"
         "- question_id (short unique string)\n"
-        "- category (one of: Technical, Behavioral, System Design, Project Deep Dive)\n"
         "- difficulty (Easy, Medium, Hard)\n"
         "- question_text\n"
         "- expected_keywords (3-8 key phrases you expect in a strong answer)\n"
-        "- evaluation_guidelines (1-3 sentences)\n"
-        "- scoring_weights: always use {\"keyword\":0.30,\"technical\":0.30,\"logical\":0.20,\"terminology\":0.10,\"completeness\":0.10}\n\n"
+        "- evaluation_guidelines (1-3 sentences)\n\n"
         "Return JSON ONLY in this shape:\n"
         "{\n"
-        "  \"resume_analysis\": {\n"
-        "    \"resume_strength_score\": 0,\n"
-        "    \"role_skill_match_score\": 0,\n"
-        "    \"missing_skills\": []\n"
-        "  },\n"
         "  \"questions\": [\n"
         "    {\n"
         "      \"question_id\": \"q1\",\n"
-        "      \"category\": \"Technical\",\n"
         "      \"difficulty\": \"Medium\",\n"
         "      \"question_text\": \"...\",\n"
         "      \"expected_keywords\": [\"...\"],\n"
-        "      \"evaluation_guidelines\": \"...\",\n"
-        "      \"scoring_weights\": {\n"
-        "        \"keyword\": 0.30,\n"
-        "        \"technical\": 0.30,\n"
-        "        \"logical\": 0.20,\n"
-        "        \"terminology\": 0.10,\n"
-        "        \"completeness\": 0.10\n"
-        "      }\n"
+        "      \"evaluation_guidelines\": \"...\"\n"
         "    }\n"
         "  ]\n"
         "}\n"
-    )
+    ),
+    # The category calls of one session share everything up to these last lines
+    data=_CANDIDATE_DATA + "\nCategory: $category\nNumber of questions: $count\n",
+))
 
-    raw = await provider.generate(system_prompt + "\n\n" + user_prompt)
 
+def _candidate_values(req: StartInterviewRequest) -> dict:
+    return {
+        "role": req.role,
+        "skills": ", ".join(req.skills),
+        "difficulty": req.difficulty,
+        "resume_text": req.resume_text,
+    }
+
+
+def _parse_json(raw: str):
     if raw.startswith("```json"):
         raw = raw[7:-3]
     elif raw.startswith("```"):
         raw = raw[3:-3]
+    return json.loads(raw)
+
+
+async def _screen_resume(provider, req: StartInterviewRequest) -> ResumeAnalysis:
+    prompt = SCREEN_PROMPT.render(**_candidate_values(req))
+    data = _parse_json(await provider.generate(prompt))
+    return ResumeAnalysis(**data.get("resume_analysis", data))
+
+
+async def _category_questions(provider, req: StartInterviewRequest, category: str, count: int) -> List[InterviewQuestion]:
+    prompt = QUESTIONS_PROMPT.render(category=category, count=count, **_candidate_values(req))
+    data = _parse_json(await provider.generate(prompt))
+    # Category and weights are fixed by the plan, not left to the model
+    return [
+        InterviewQuestion(**{**q, "category": category, "scoring_weights": ScoringWeights()})
+        for q in data["questions"][:count]
+    ]
+
 
-    data = json.loads(raw)
+async def start_interview(
+    user_id: int,
+    req: StartInterviewRequest,
+) -> StartInterviewResponse:
+    """Create a session: resume screen and one question call per category, run concurrently.
+
+    Latency is that of the slowest sub-call. A failed category is dropped and
+    a failed resume screen falls back to NEUTRAL_RESUME_ANALYSIS; the session
+    only fails if no question could be generated.
+    """
+    provider = get_ai_provider("interview")
 
-    resume_analysis = ResumeAnalysis(**data["resume_analysis"])
-    questions = [InterviewQuestion(**q) for q in data["questions"]]
+    async with SubtaskGroup(timeout=settings.INTERVIEW_START_TIMEOUT_SECONDS) as group:
+        group.spawn("resume_analysis", _screen_resume(provider, req))
+        for category, count in QUESTION_PLAN:
+            group.spawn(category, _category_questions(provider, req, category, count))
+
+    questions = [q for category, _ in QUESTION_PLAN for q in group.result(category, default=[])]
+    if not questions:
+        raise ValueError(f"Could not generate interview questions: {group.errors}")
+    for i, question in enumerate(questions):
+        question.question_id = f"q{i + 1}"
+    resume_analysis = group.result("resume_analysis", default=NEUTRAL_RESUME_ANALYSIS)
 
     session_id = str(uuid.uuid4())
     session = InterviewSession(
@@ -183,38 +254,47 @@ async def start_interview(
     )
 
 
-async def submit_answer(
-    req: SubmitAnswerRequest,
-) -> SubmitAnswerResponse:
-    session = _SESSIONS.get(req.session_id)
-    if not session:
-        raise ValueError("Invalid or expired session_id.")
-
-    if session.current_question_index >= len(session.questions):
-        raise ValueError("All questions have already been answered.")
+@dataclass
+class AnswerEvaluation:
+    scores: AnswerScoreBreakdown
+    missing_concepts: List[str]
+    feedback: str
+    cci_score: Optional[float] = None
+    cci_classification: Optional[str] = None
+
+
+def _local_evaluation(prescore, feedback: str) -> AnswerEvaluation:
+    """Evaluation from the local pre-score alone (LLM skipped or unavailable)."""
+    scores = AnswerScoreBreakdown(
+        keyword=prescore.keyword,
+        technical=0,
+        logical=0,
+        terminology=0,
+        completeness=prescore.completeness,
+        total=0,
+    )
+    return AnswerEvaluation(scores=scores, missing_concepts=prescore.missing_keywords, feedback=feedback)
 
-    question = session.questions[session.current_question_index]
-    provider = get_ai_provider()
 
+def _weighted_total(question: InterviewQuestion, scores: AnswerScoreBreakdown) -> float:
     weights = question.scoring_weights
+    return (
+        scores.keyword * weights.keyword
+        + scores.technical * weights.technical
+        + scores.logical * weights.logical
+        + scores.terminology * weights.terminology
+        + scores.completeness * weights.completeness
+    )
 
-    eval_prompt = (
+
+EVAL_PROMPT = prompt_registry.register(PromptTemplate(
+    "interview.evaluate_answer", 1,
+    instructions=(
         "You are evaluating a single interview answer.\n"
         "Return STRICT JSON only, no markdown.\n\n"
-        f"Question category: {question.category}\n"
-        f"Difficulty: {question.difficulty}\n"
-        f"Question: {question.question_text}\n"
-        f"Expected keywords: {', '.join(question.expected_keywords)}\n"
-        f"Evaluation guidelines: {question.evaluation_guidelines}\n\n"
-        "Candidate answer:\n"
-        f"{req.answer_text}\n\n"
-        "Score the answer on these components (0-100 each):\n"
-        f"- keyword (weight {weights.keyword})\n"
-        f"- technical (weight {weights.technical})\n"
-        f"- logical (weight {weights.logical})\n"
-        f"- terminology (weight {weights.terminology})\n"
-        f"- completeness (weight {weights.completeness})\n\n"
-        "Then compute total as the weighted sum of these components.\n"
+        "The question, its expected keywords, the component weights and the candidate answer are given at the end.\n"
+        "Score the answer on the technical, logical and terminology components (0-100 each).\n"
+        "Keyword coverage and completeness are scored separately; do not score them.\n"
         "Also identify a short list of missing_concepts (terms, ideas, or steps that should be improved).\n"
         "Provide actionable feedback in 2-4 sentences.\n\n"
         "Additionally, evaluate communication clarity (0-100) considering grammar, structure (e.g. STAR), redundancy, and articulation.\n"
@@ -222,12 +302,9 @@ async def submit_answer(
         "Return JSON ONLY in this shape:\n"
         "{\n"
         "  \"scores\": {\n"
-        "    \"keyword\": 0,\n"
         "    \"technical\": 0,\n"
         "    \"logical\": 0,\n"
-        "    \"terminology\": 0,\n"
-        "    \"completeness\": 0,\n"
-        "    \"total\": 0\n"
+        "    \"terminology\": 0\n"
         "  },\n"
         "  \"missing_concepts\": [\"...\"],\n"
         "  \"feedback\": \"...\",\n"
@@ -236,50 +313,122 @@ async def submit_answer(
         "    \"cci_classification\": \"\"\n"
         "  }\n"
         "}\n"
-    )
+    ),
+    data=(
+        "Question category: $category\n"
+        "Difficulty: $difficulty\n"
+        "Question: $question\n"
+        "Expected keywords: $expected_keywords\n"
+        "Keywords found in the answer: $matched_keywords\n"
+        "Evaluation guidelines: $guidelines\n"
+        "Component weights: technical $w_technical, logical $w_logical, terminology $w_terminology\n\n"
+        "Candidate answer:\n"
+        "$answer\n"
+    ),
+))
 
-    raw = await provider.generate(eval_prompt)
 
-    if raw.startswith("```json"):
-        raw = raw[7:-3]
-    elif raw.startswith("```"):
-        raw = raw[3:-3]
+def _eval_prompt(question: InterviewQuestion, answer_text: str, matched_keywords: List[str]) -> str:
+    weights = question.scoring_weights
+    return EVAL_PROMPT.render(
+        category=question.category,
+        difficulty=question.difficulty,
+        question=question.question_text,
+        expected_keywords=", ".join(question.expected_keywords),
+        matched_keywords=", ".join(matched_keywords) or "none",
+        guidelines=question.evaluation_guidelines,
+        w_technical=weights.technical,
+        w_logical=weights.logical,
+        w_terminology=weights.terminology,
+        answer=answer_text,
+    )
 
-    data = json.loads(raw)
 
-    scores = AnswerScoreBreakdown(**data["scores"])
+async def evaluate_answer(
+    question: InterviewQuestion,
+    answer_text: str,
+    on_feedback: Optional[Callable[[str], Awaitable[None]]] = None,
+) -> AnswerEvaluation:
+    """Score one answer against its question.
 
-    recomputed_total = (
-        scores.keyword * weights.keyword
-        + scores.technical * weights.technical
-        + scores.logical * weights.logical
-        + scores.terminology * weights.terminology
-        + scores.completeness * weights.completeness
+    With `on_feedback`, the LLM response is streamed and the feedback text is
+    passed to the callback piece by piece as it arrives.
+    """
+    # Keyword and completeness are scored locally; empty and trivial
+    # answers are not worth an LLM call at all
+    prescore = prescore_answer(question, answer_text)
+    if settings.INTERVIEW_PRESCORE_ENABLED and prescore.verdict:
+        interview_answers_scored.inc(prescore.verdict)
+        evaluation = _local_evaluation(prescore, skip_feedback(prescore))
+        evaluation.scores.total = _weighted_total(question, evaluation.scores)
+        if on_feedback is not None:
+            await on_feedback(evaluation.feedback)
+        return evaluation
+
+    interview_answers_scored.inc("llm")
+    provider = get_ai_provider("interview_answer")
+    eval_prompt = _eval_prompt(question, answer_text, prescore.matched_keywords)
+
+    if on_feedback is None:
+        raw = await provider.generate(eval_prompt)
+    else:
+        feedback_stream = StringFieldStream("feedback")
+        chunks = []
+        async for chunk in provider.generate_stream(eval_prompt):
+            chunks.append(chunk)
+            delta = feedback_stream.feed(chunk)
+            if delta:
+                await on_feedback(delta)
+        raw = "".join(chunks).strip()
+    data = _parse_json(raw)
+
+    llm_scores = data.get("scores", {}) or {}
+    scores = AnswerScoreBreakdown(
+        keyword=prescore.keyword,
+        technical=llm_scores.get("technical", 0),
+        logical=llm_scores.get("logical", 0),
+        terminology=llm_scores.get("terminology", 0),
+        completeness=prescore.completeness,
+        total=0,
     )
-    scores.total = recomputed_total
-
-    missing_concepts = data.get("missing_concepts", [])
-    feedback = data.get("feedback", "")
+    scores.total = _weighted_total(question, scores)
 
     comm = data.get("communication", {}) or {}
-    cci_score = comm.get("cci_score")
-    cci_classification = comm.get("cci_classification")
-
-    record = AnswerRecord(
-        question_id=question.question_id,
-        answer_text=req.answer_text,
+    return AnswerEvaluation(
         scores=scores,
-        missing_concepts=missing_concepts,
-        feedback=feedback,
+        missing_concepts=data.get("missing_concepts", []),
+        feedback=data.get("feedback", ""),
+        cci_score=comm.get("cci_score"),
+        cci_classification=comm.get("cci_classification"),
     )
-    session.answers.append(record)
+
+
+def _apply_evaluation(
+    session: InterviewSession,
+    index: int,
+    answer_text: str,
+    evaluation: AnswerEvaluation,
+):
+    question = session.questions[index]
+    order = {q.question_id: i for i, q in enumerate(session.questions)}
+    # Live evaluations finish out of order; keep answers in question order
+    bisect.insort(session.answers, AnswerRecord(
+        question_id=question.question_id,
+        answer_text=answer_text,
+        scores=evaluation.scores,
+        missing_concepts=evaluation.missing_concepts,
+        feedback=evaluation.feedback,
+    ), key=lambda record: order[record.question_id])
 
     agg_category = _classify_category_for_aggregation(question.category)
     if agg_category == "technical":
-        session.technical_score_total += scores.total
+        session.technical_score_total += evaluation.scores.total
     else:
-        session.behavioral_score_total += scores.total
+        session.behavioral_score_total += evaluation.scores.total
+
 
+def _advance(session: InterviewSession) -> Tuple[Optional[InterviewQuestion], bool]:
+    """Move past the current question; returns (next question, whether it was the last)."""
     is_last = session.current_question_index == len(session.questions) - 1
 
     session.current_question_index += 1
@@ -291,6 +440,31 @@ async def submit_answer(
     next_question = (
         None if is_last else session.questions[session.current_question_index]
     )
+    return next_question, is_last
+
+
+def get_session(session_id: str, user_id: int) -> InterviewSession:
+    session = _SESSIONS.get(session_id)
+    if not session or session.user_id != user_id:
+        raise ValueError("Invalid or expired session_id.")
+    return session
+
+
+async def submit_answer(
+    req: SubmitAnswerRequest,
+) -> SubmitAnswerResponse:
+    session = _SESSIONS.get(req.session_id)
+    if not session:
+        raise ValueError("Invalid or expired session_id.")
+
+    if session.current_question_index >= len(session.questions):
+        raise ValueError("All questions have already been answered.")
+
+    index = session.current_question_index
+    question = session.questions[index]
+    evaluation = await evaluate_answer(question, req.answer_text)
+    _apply_evaluation(session, index, req.answer_text, evaluation)
+    next_question, is_last = _advance(session)
 
     irs = None
     classification = None
@@ -300,16 +474,110 @@ async def submit_answer(
         crs = _compute_career_readiness_score(session)
 
     return SubmitAnswerResponse(
-        final_score=scores.total,
-        component_breakdown=scores,
-        missing_concepts=missing_concepts,
-        feedback=feedback,
+        final_score=evaluation.scores.total,
+        component_breakdown=evaluation.scores,
+        missing_concepts=evaluation.missing_concepts,
+        feedback=evaluation.feedback,
         next_question=next_question,
         is_last_question=is_last,
         interview_readiness_score=irs,
         readiness_classification=classification,
-        cci_score=cci_score,
-        cci_classification=cci_classification,
+        cci_score=evaluation.cci_score,
+        cci_classification=evaluation.cci_classification,
         career_readiness_score=crs,
     )
 
+
+class LiveInterview:
+    """An interview session driven over a WebSocket connection.
+
+    answer() moves to the next question and sends it straight away; the
+    answer is evaluated in a background task that streams its feedback and
+    then sends the scores. Several evaluations may be in flight at once.
+    Once every answer is scored a summary with the readiness scores
+    follows. Evaluations finish and are recorded in the session even if the
+    client disconnects.
+
+    Messages sent: question, feedback (text delta), evaluation, summary, error.
+    """
+
+    def __init__(self, session: InterviewSession, send: Callable[[dict], Awaitable[None]]):
+        self.session = session
+        self._send = send
+        self._send_lock = asyncio.Lock()
+        self._pending: Set[asyncio.Task] = set()
+        self.connected = True
+
+    async def send(self, message: dict):
+        if not self.connected:
+            return
+        # Evaluation tasks and the receive loop share one socket
+        async with self._send_lock:
+            try:
+                await self._send(message)
+            except Exception:
+                self.connected = False
+
+    async def send_current_question(self):
+        index = self.session.current_question_index
+        if index < len(self.session.questions):
+            await self._send_question(self.session.questions[index], index)
+
+    async def _send_question(self, question: InterviewQuestion, index: int):
+        await self.send({
+            "type": "question",
+            "index": index,
+            "total_questions": len(self.session.questions),
+            "question": question.model_dump(),
+        })
+
+    async def answer(self, answer_text: str):
+        session = self.session
+        if session.current_question_index >= len(session.questions):
+            raise ValueError("All questions have already been answered.")
+
+        index = session.current_question_index
+        next_question, _ = _advance(session)
+        task = asyncio.create_task(self._evaluate(index, answer_text))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+        if next_question is not None:
+            await self._send_question(next_question, session.current_question_index)
+
+    async def _evaluate(self, index: int, answer_text: str):
+        question = self.session.questions[index]
+
+        async def on_feedback(text: str):
+            await self.send({"type": "feedback", "question_id": question.question_id, "delta": text})
+
+        try:
+            evaluation = await evaluate_answer(question, answer_text, on_feedback)
+        except Exception as e:
+            print(f"[interview] Live evaluation of {question.question_id} failed: {str(e)}")
+            # Keep the session complete with the locally computed scores
+            evaluation = _local_evaluation(
+                prescore_answer(question, answer_text),
+                "Detailed feedback is unavailable for this answer.",
+            )
+            evaluation.scores.total = _weighted_total(question, evaluation.scores)
+
+        _apply_evaluation(self.session, index, answer_text, evaluation)
+        await self.send({
+            "type": "evaluation",
+            "question_id": question.question_id,
+            "final_score": evaluation.scores.total,
+            "component_breakdown": evaluation.scores.model_dump(),
+            "missing_concepts": evaluation.missing_concepts,
+            "feedback": evaluation.feedback,
+            "cci_score": evaluation.cci_score,
+            "cci_classification": evaluation.cci_classification,
+        })
+
+        if len(self.session.answers) == len(self.session.questions):
+            irs, classification = _compute_readiness_score(self.session)
+            await self.send({
+                "type": "summary",
+                "interview_readiness_score": irs,
+                "readiness_classification": classification,
+                "career_readiness_score": _compute_career_readiness_score(self.session),
+            })
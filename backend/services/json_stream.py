@@ -0,0 +1,66 @@
+"""Incremental extraction of one string field from streamed JSON.
+
+The interview evaluation comes back as a JSON object whose "feedback"
+value is prose meant for the candidate. When the response is streamed,
+StringFieldStream picks that value out of the chunks as they arrive, so the
+text can be forwarded before the object is complete:
+
+    stream = StringFieldStream("feedback")
+    async for chunk in provider.generate_stream(prompt):
+        delta = stream.feed(chunk)   # decoded text of the field, if any yet
+
+Only a top-level-looking `"field": "..."` is tracked. The caller still
+parses the complete JSON at the end; this is purely for early display.
+"""
+import re
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class StringFieldStream:
+    def __init__(self, field: str):
+        self._start = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self._buffer = ""
+        self._pos = 0          # next unread index in _buffer once inside the value
+        self._state = "seek"   # seek -> inside -> done
+
+    def feed(self, chunk: str) -> str:
+        """Append a chunk; return newly decoded characters of the field value."""
+        if self._state == "done":
+            return ""
+        self._buffer += chunk
+        if self._state == "seek":
+            match = self._start.search(self._buffer)
+            if not match:
+                return ""
+            self._state, self._pos = "inside", match.end()
+
+        out = []
+        buffer, i = self._buffer, self._pos
+        while i < len(buffer):
+            ch = buffer[i]
+            if ch == '"':
+                self._state = "done"
+                i += 1
+                break
+            if ch != "\\":
+                out.append(ch)
+                i += 1
+                continue
+            # Escape sequence: wait for the rest of it if the chunk split it
+            if i + 1 >= len(buffer):
+                break
+            code = buffer[i + 1]
+            if code == "u":
+                if i + 6 > len(buffer):
+                    break
+                try:
+                    out.append(chr(int(buffer[i + 2:i + 6], 16)))
+                except ValueError:
+                    pass
+                i += 6
+            else:
+                out.append(_ESCAPES.get(code, code))
+                i += 2
+        self._pos = i
+        return "".join(out)
@@ -1,7 +1,96 @@
 from ai.provider_factory import get_ai_provider
+from ai.prompts import PromptTemplate, prompt_registry
 import json
 from typing import List, Optional
 
+# Mastery weights (quiz, assignment, consistency) by which scores are available.
+# Shared with the batch recompute in services/mastery_batch.py.
+MASTERY_WEIGHTS_BOTH = (0.50, 0.30, 0.20)
+MASTERY_WEIGHTS_QUIZ_ONLY = (0.70, 0.30)
+MASTERY_WEIGHTS_ASSIGNMENT_ONLY = (0.60, 0.40)
+
+# Below RISK_HIGH_BELOW is "High Risk", up to RISK_MODERATE_MAX (inclusive) "Moderate"
+RISK_HIGH_BELOW = 40
+RISK_MODERATE_MAX = 70
+# Below LEVEL_BASIC_BELOW is "Basic", up to LEVEL_INTERMEDIATE_MAX (inclusive) "Intermediate"
+LEVEL_BASIC_BELOW = 40
+LEVEL_INTERMEDIATE_MAX = 75
+
+_PLAN_SCHEMA = (
+    "{\n"
+    "  \"weekly_goal\": \"string\",\n"
+    "  \"daily_tasks\": [\n"
+    "    {\n"
+    "      \"day\": \"string\",\n"
+    "      \"focus_topic\": \"string\",\n"
+    "      \"tasks\": [\"string\", \"string\"]\n"
+    "    }\n"
+    "  ],\n"
+    "  \"mini_projects\": [\"string\"],\n"
+    "  \"revision_schedule\": [\"string\"]\n"
+    "}\n"
+)
+
+STUDY_PLAN_PROMPT = prompt_registry.register(PromptTemplate(
+    "plan.weekly", 1,
+    instructions=(
+        "You are an AI academic planner.\n"
+        "Generate a structured weekly study plan for the role and weak topics given at the end.\n"
+        "Return ONLY JSON with the following structure:\n"
+        + _PLAN_SCHEMA
+        + "Generate structured weekly study plan in JSON only.\n"
+    ),
+    data=(
+        "Role: $role\n"
+        "Weak topics: $weak_topics\n"
+    ),
+))
+
+STARTER_PLAN_PROMPT = prompt_registry.register(PromptTemplate(
+    "plan.starter", 1,
+    instructions=(
+        "You are an academic planner.\n"
+        "The user described at the end has not attempted any quiz or assignment yet.\n"
+        "Generate a beginner-friendly 7 day starter plan based on their resume topics "
+        "and suggested learning topics.\n"
+        "Return ONLY JSON with the structure:\n"
+        + _PLAN_SCHEMA
+        + "Generate beginner-friendly starter plan in JSON only.\n"
+    ),
+    data=(
+        "Role: $role\n"
+        "Resume Topics: $resume_topics\n"
+        "Suggested Learning Topics: $suggested_topics\n"
+    ),
+))
+
+RESOURCES_PROMPT = prompt_registry.register(PromptTemplate(
+    "resources.fetch", 1,
+    instructions=(
+        "You are an expert technical resource curator.\n"
+        "Generate high-quality learning resources for the topic and level given at the end, "
+        "matching the search intent.\n"
+        "Do NOT include spam links. Prefer official documentation and highly recognized platforms (YouTube, freeCodeCamp, MDN, official docs).\n"
+        "Provide real, standard URLs.\n"
+        "Return ONLY JSON with the structure:\n"
+        "{\n"
+        "  \"topic\": \"string\",\n"
+        "  \"level\": \"string\",\n"
+        "  \"resources\": {\n"
+        "    \"youtube\": [{\"title\": \"string\", \"url\": \"string\"}],\n"
+        "    \"documentation\": [{\"title\": \"string\", \"url\": \"string\"}],\n"
+        "    \"practice\": [{\"title\": \"string\", \"url\": \"string\"}],\n"
+        "    \"articles\": [{\"title\": \"string\", \"url\": \"string\"}]\n"
+        "  }\n"
+        "}\n"
+    ),
+    data=(
+        "Topic: $topic\n"
+        "Level: $level\n"
+        "Search intent: $search_intent\n"
+    ),
+))
+
 def calculate_mastery(
     quiz_score: Optional[float],
     assignment_score: Optional[float],
@@ -10,11 +99,14 @@ def calculate_mastery(
     """Calculates weighted mastery score based on performance and activity."""
     
     if quiz_score is not None and assignment_score is not None:
-        mastery = (quiz_score * 0.50) + (assignment_score * 0.30) + (consistency * 0.20)
+        wq, wa, wc = MASTERY_WEIGHTS_BOTH
+        mastery = (quiz_score * wq) + (assignment_score * wa) + (consistency * wc)
     elif quiz_score is not None:
-        mastery = (quiz_score * 0.70) + (consistency * 0.30)
+        wq, wc = MASTERY_WEIGHTS_QUIZ_ONLY
+        mastery = (quiz_score * wq) + (consistency * wc)
     elif assignment_score is not None:
-        mastery = (assignment_score * 0.60) + (consistency * 0.40)
+        wa, wc = MASTERY_WEIGHTS_ASSIGNMENT_ONLY
+        mastery = (assignment_score * wa) + (consistency * wc)
     else:
         return None
         
@@ -24,9 +116,9 @@ def calculate_risk(mastery: Optional[float]) -> str:
     """Detects risk levels based on mastery score."""
     if mastery is None:
         return "Not Attempted"
-    if mastery < 40:
+    if mastery < RISK_HIGH_BELOW:
         return "High Risk"
-    elif mastery <= 70:
+    elif mastery <= RISK_MODERATE_MAX:
         return "Moderate"
     else:
         return "Strong"
@@ -35,9 +127,9 @@ def get_topic_level(mastery: Optional[float]) -> str:
     """Determines topic difficulty level based on mastery."""
     if mastery is None:
         return "Basic"
-    if mastery < 40:
+    if mastery < LEVEL_BASIC_BELOW:
         return "Basic"
-    elif mastery <= 75:
+    elif mastery <= LEVEL_INTERMEDIATE_MAX:
         return "Intermediate"
     else:
         return "Advanced"
@@ -70,27 +162,11 @@ async def generate_study_plan(
             "revision_schedule": ["Weekly cumulative review"]
         }
 
-    system_prompt = (
-        "You are an AI academic planner.\n"
-        f"Generate a structured weekly study plan for a {role} focusing on these weak topics: {', '.join(weak_topics)}.\n"
-        "Return ONLY JSON with the following structure:\n"
-        "{\n"
-        "  \"weekly_goal\": \"string\",\n"
-        "  \"daily_tasks\": [\n"
-        "    {\n"
-        "      \"day\": \"string\",\n"
-        "      \"focus_topic\": \"string\",\n"
-        "      \"tasks\": [\"string\", \"string\"]\n"
-        "    }\n"
-        "  ],\n"
-        "  \"mini_projects\": [\"string\"],\n"
-        "  \"revision_schedule\": [\"string\"]\n"
-        "}\n"
-    )
+    system_prompt = STUDY_PLAN_PROMPT.render(role=role, weak_topics=", ".join(weak_topics))
 
     try:
-        provider = get_ai_provider()
-        content = await provider.generate(system_prompt + "\n\nGenerate structured weekly study plan in JSON only.")
+        provider = get_ai_provider("plan")
+        content = await provider.generate(system_prompt)
         
         # Clean potential markdown
         if content.startswith("```json"):
@@ -119,30 +195,15 @@ async def generate_starter_plan(
 ) -> dict:
     """Generates a foundational starter plan for new users."""
     
-    system_prompt = (
-        "You are an academic planner.\n"
-        f"User has not attempted any quiz or assignment for the role of {role}.\n"
-        f"Based on their Resume Topics: {', '.join(resume_topics)}\n"
-        f"And Suggested Learning Topics: {', '.join(suggested_topics)}\n"
-        "Generate a beginner-friendly 7 day starter plan.\n"
-        "Return ONLY JSON with the structure:\n"
-        "{\n"
-        "  \"weekly_goal\": \"string\",\n"
-        "  \"daily_tasks\": [\n"
-        "    {\n"
-        "      \"day\": \"string\",\n"
-        "      \"focus_topic\": \"string\",\n"
-        "      \"tasks\": [\"string\"]\n"
-        "    }\n"
-        "  ],\n"
-        "  \"mini_projects\": [\"string\"],\n"
-        "  \"revision_schedule\": [\"string\"]\n"
-        "}\n"
+    system_prompt = STARTER_PLAN_PROMPT.render(
+        role=role,
+        resume_topics=", ".join(resume_topics),
+        suggested_topics=", ".join(suggested_topics),
     )
 
     try:
-        provider = get_ai_provider()
-        content = await provider.generate(system_prompt + "\n\nGenerate beginner-friendly starter plan in JSON only.")
+        provider = get_ai_provider("plan")
+        content = await provider.generate(system_prompt)
         
         if content.startswith("```json"):
             content = content[7:-3]
@@ -172,27 +233,11 @@ async def fetch_internet_resources(topic: str, level: str) -> dict:
     else:
         search_intent = "advanced optimization, real world project, under the hood"
         
-    system_prompt = (
-        "You are an expert technical resource curator.\n"
-        f"Generate high-quality learning resources for the topic '{topic}' at a '{level}' level.\n"
-        f"Search intent involves: {search_intent}.\n"
-        "Do NOT include spam links. Prefer official documentation and highly recognized platforms (YouTube, freeCodeCamp, MDN, official docs).\n"
-        "Return ONLY JSON with the structure:\n"
-        "{\n"
-        "  \"topic\": \"string\",\n"
-        "  \"level\": \"string\",\n"
-        "  \"resources\": {\n"
-        "    \"youtube\": [{\"title\": \"string\", \"url\": \"string\"}],\n"
-        "    \"documentation\": [{\"title\": \"string\", \"url\": \"string\"}],\n"
-        "    \"practice\": [{\"title\": \"string\", \"url\": \"string\"}],\n"
-        "    \"articles\": [{\"title\": \"string\", \"url\": \"string\"}]\n"
-        "  }\n"
-        "}\n"
-    )
+    system_prompt = RESOURCES_PROMPT.render(topic=topic, level=level, search_intent=search_intent)
 
     try:
-        provider = get_ai_provider()
-        content = await provider.generate(system_prompt + "\n\nProvide real, standard URLs. Return ONLY JSON.")
+        provider = get_ai_provider("resources")
+        content = await provider.generate(system_prompt)
         
         if content.startswith("```json"):
             content = content[7:-3]
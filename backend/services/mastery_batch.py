@@ -0,0 +1,283 @@
+"""Vectorized mastery, risk and level computation for bulk recomputes.
+
+The request handlers score one (user, topic) pair at a time with
+calculate_mastery / calculate_risk / get_topic_level. When the weights in
+services/learning_engine.py change, recompute_all() rescores every pair:
+it walks users in id-ordered chunks, loads each chunk's quiz and submission
+history as columns, computes everything with NumPy and writes changed rows
+back with executemany. Used by recompute_mastery.py and bench_mastery.py,
+and by backfill_topics.py for just the users it touched.
+
+Inputs mirror what the handlers saw when they last wrote each row: the
+latest quiz score and the latest assignment submission score per (user,
+topic), and the user's consistency measured at that pair's latest quiz or
+submission: activity in the 7 days before it, not counting the row itself
+(the handlers count before adding it). With unchanged weights a recompute
+therefore writes nothing; bench_mastery.py --parity-users checks this.
+"""
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Engine
+
+from services.learning_engine import (
+    MASTERY_WEIGHTS_BOTH,
+    MASTERY_WEIGHTS_QUIZ_ONLY,
+    MASTERY_WEIGHTS_ASSIGNMENT_ONLY,
+    RISK_HIGH_BELOW,
+    RISK_MODERATE_MAX,
+    LEVEL_BASIC_BELOW,
+    LEVEL_INTERMEDIATE_MAX,
+)
+
+RISK_LABELS = np.array(["Not Attempted", "High Risk", "Moderate", "Strong"])
+LEVEL_LABELS = np.array(["Basic", "Intermediate", "Advanced"])
+
+
+# ── Vectorized scoring (NaN = missing) ──────────────────────────────────────
+
+def mastery_vector(quiz: np.ndarray, assignment: np.ndarray, consistency: np.ndarray) -> np.ndarray:
+    """calculate_mastery over arrays; NaN where neither score exists."""
+    has_quiz, has_assignment = ~np.isnan(quiz), ~np.isnan(assignment)
+    q, a = np.nan_to_num(quiz), np.nan_to_num(assignment)
+
+    wq, wa, wc = MASTERY_WEIGHTS_BOTH
+    both = q * wq + a * wa + consistency * wc
+    wq, wc = MASTERY_WEIGHTS_QUIZ_ONLY
+    quiz_only = q * wq + consistency * wc
+    wa, wc = MASTERY_WEIGHTS_ASSIGNMENT_ONLY
+    assignment_only = a * wa + consistency * wc
+
+    mastery = np.select(
+        [has_quiz & has_assignment, has_quiz, has_assignment],
+        [both, quiz_only, assignment_only],
+        default=np.nan,
+    )
+    return np.round(np.clip(mastery, 0, 100), 2)
+
+
+def risk_codes(mastery: np.ndarray) -> np.ndarray:
+    """calculate_risk as indexes into RISK_LABELS."""
+    return np.select(
+        [np.isnan(mastery), mastery < RISK_HIGH_BELOW, mastery <= RISK_MODERATE_MAX],
+        [0, 1, 2],
+        default=3,
+    )
+
+
+def level_codes(mastery: np.ndarray) -> np.ndarray:
+    """get_topic_level as indexes into LEVEL_LABELS (missing mastery is Basic)."""
+    return np.select(
+        [np.isnan(mastery) | (mastery < LEVEL_BASIC_BELOW), mastery <= LEVEL_INTERMEDIATE_MAX],
+        [0, 1],
+        default=2,
+    )
+
+
+# ── Columnar loading ────────────────────────────────────────────────────────
+
+WEEK_MS = 7 * 24 * 3600 * 1000
+
+
+def _columns(rows):
+    """(user_id, topic, score, time, id) rows as arrays; times in epoch milliseconds."""
+    users = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+    topics = np.array([r[1] for r in rows], dtype=object)
+    scores = np.fromiter((np.nan if r[2] is None else r[2] for r in rows), dtype=np.float64, count=len(rows))
+    # SQLite returns DATETIME columns of raw SQL as ISO strings; numpy parses both
+    times = np.array([r[3] for r in rows], dtype="datetime64[ms]").astype(np.int64)
+    ids = np.fromiter((r[4] for r in rows), dtype=np.int64, count=len(rows))
+    return users, topics, scores, times, ids
+
+
+def _latest_per_pair(users, topics, scores, times, ids) -> Dict[Tuple[int, str], Tuple[float, int, int]]:
+    """Columns ordered by (user_id, topic, time, id) -> (score, time, row index) of the last row per pair."""
+    if not len(users):
+        return {}
+    # A row is the latest of its pair if the next row belongs to another pair
+    last = np.ones(len(users), dtype=bool)
+    last[:-1] = (users[1:] != users[:-1]) | (topics[1:] != topics[:-1])
+    return dict(zip(zip(users[last].tolist(), topics[last].tolist()),
+                    zip(scores[last].tolist(), times[last].tolist(), np.flatnonzero(last).tolist())))
+
+
+def _activity_order(columns, known: np.ndarray, origin: int, stride: int):
+    """One table's rows in insertion order per user: sorted (user, time) keys
+    and each row's position among them (ties on time are broken by id)."""
+    users, _, _, times, ids = columns
+    order = np.lexsort((ids, times, users))
+    keys = (np.searchsorted(known, users) * stride + (times - origin))[order]
+    position = np.empty(len(order), dtype=np.int64)
+    position[order] = np.arange(len(order))
+    return keys, position
+
+
+def _select(sql: str, user_ids: Optional[List[int]], column: str = "user_id"):
+    """`sql` (with a {users} placeholder) restricted to the id range, and to
+    `user_ids` when given."""
+    users = f"{column} BETWEEN :lo AND :hi"
+    if user_ids is None:
+        return text(sql.format(users=users))
+    return text(sql.format(users=f"{users} AND {column} IN :ids")).bindparams(
+        bindparam("ids", expanding=True))
+
+
+def load_chunk(conn, first_user: int, last_user: int, user_ids: Optional[List[int]] = None):
+    """Per-pair arrays for users in [first_user, last_user] (only `user_ids`, if given)."""
+    bounds = {"lo": first_user, "hi": last_user}
+    if user_ids is not None:
+        bounds["ids"] = user_ids
+    quiz_rows = _columns(conn.execute(_select(
+        "SELECT user_id, topic, score, timestamp, id FROM quiz_attempts "
+        "WHERE {users} ORDER BY user_id, topic, timestamp, id", user_ids
+    ), bounds).all())
+    assignment_rows = _columns(conn.execute(_select(
+        "SELECT s.user_id, a.topic, s.score, s.submitted_at, s.id FROM assignment_submissions s "
+        "JOIN assignments a ON a.id = s.assignment_id "
+        "WHERE {users} ORDER BY s.user_id, a.topic, s.submitted_at, s.id", user_ids, "s.user_id"
+    ), bounds).all())
+    latest_quiz = _latest_per_pair(*quiz_rows)
+    latest_assignment = _latest_per_pair(*assignment_rows)
+
+    pairs = sorted(set(latest_quiz) | set(latest_assignment))
+    if not pairs:
+        return pairs, np.empty(0), np.empty(0), np.empty(0)
+    missing = (np.nan, np.iinfo(np.int64).min, 0)
+    quiz_latest = np.array([latest_quiz.get(p, missing) for p in pairs], dtype=object)
+    assignment_latest = np.array([latest_assignment.get(p, missing) for p in pairs], dtype=object)
+    quiz = quiz_latest[:, 0].astype(np.float64)
+    # A pair whose latest submission is still ungraded counts as "no assignment score"
+    assignment = assignment_latest[:, 0].astype(np.float64)
+
+    # Consistency as the handler computed it when it wrote the pair's row: the
+    # user's activity in the 7 days before that row, counted before adding it.
+    # Timestamps can tie (SQLite stores whole seconds): within a table rows are
+    # ordered by id, rows of the other table at the same time count as earlier.
+    all_times = np.concatenate([quiz_rows[3], assignment_rows[3]])
+    known = np.unique(np.concatenate([quiz_rows[0], assignment_rows[0]]))
+    origin = int(all_times.min()) - WEEK_MS
+    stride = int(all_times.max()) - origin + 1
+    quiz_order = _activity_order(quiz_rows, known, origin, stride)
+    assignment_order = _activity_order(assignment_rows, known, origin, stride)
+
+    quiz_times = quiz_latest[:, 1].astype(np.int64)
+    assignment_times = assignment_latest[:, 1].astype(np.int64)
+    from_quiz = quiz_times >= assignment_times
+    written_at = np.where(from_quiz, quiz_times, assignment_times)
+    rows = np.where(from_quiz, quiz_latest[:, 2], assignment_latest[:, 2]).astype(np.int64)
+    base = np.searchsorted(known, np.array([u for u, _ in pairs], dtype=np.int64)) * stride - origin
+    week_start, written = base + written_at - WEEK_MS, base + written_at
+
+    activity = np.zeros(len(pairs), dtype=np.int64)
+    for (own_keys, own_position), (other_keys, _), mask in (
+        (quiz_order, assignment_order, from_quiz),
+        (assignment_order, quiz_order, ~from_quiz),
+    ):
+        if not mask.any():
+            continue
+        same_table = own_position[rows[mask]] - np.searchsorted(own_keys, week_start[mask])
+        other_table = (np.searchsorted(other_keys, written[mask], side="right")
+                       - np.searchsorted(other_keys, week_start[mask]))
+        activity[mask] = same_table + other_table
+    consistency = np.minimum(100, activity.astype(np.float64) * 10)
+    return pairs, quiz, assignment, consistency
+
+
+def _user_chunks(engine: Engine, chunk_users: int, user_ids: Optional[Iterable[int]] = None):
+    """(first_id, last_id, ids) per chunk; ids is None when all users are walked."""
+    if user_ids is not None:
+        ids = sorted(set(user_ids))
+        for i in range(0, len(ids), chunk_users):
+            chunk = ids[i:i + chunk_users]
+            yield chunk[0], chunk[-1], chunk
+        return
+    last_id = 0
+    while True:
+        with engine.connect() as conn:
+            ids = conn.execute(
+                text("SELECT id FROM users WHERE id > :last ORDER BY id LIMIT :n"),
+                {"last": last_id, "n": chunk_users},
+            ).scalars().all()
+        if not ids:
+            return
+        yield ids[0], ids[-1], None
+        last_id = ids[-1]
+
+
+# ── Bulk recompute ──────────────────────────────────────────────────────────
+
+def recompute_all(engine: Engine, chunk_users: int = 5000, dry_run: bool = False,
+                  user_ids: Optional[Iterable[int]] = None) -> dict:
+    """Rescore every (user, topic) pair and write changed mastery rows back.
+
+    With `user_ids`, only those users' pairs are rescored.
+
+    Users whose mastery changed get their data_version bumped so cached
+    responses and ETags (core/http_cache.py) are invalidated.
+    """
+    stats = {"pairs": 0, "updated": 0, "inserted": 0, "users_changed": 0,
+             "risk": dict.fromkeys(RISK_LABELS.tolist(), 0),
+             "level": dict.fromkeys(LEVEL_LABELS.tolist(), 0)}
+    started = time.perf_counter()
+
+    for first_user, last_user, ids in _user_chunks(engine, chunk_users, user_ids):
+        with engine.connect() as conn:
+            pairs, quiz, assignment, consistency = load_chunk(conn, first_user, last_user, ids)
+            bounds = {"lo": first_user, "hi": last_user}
+            if ids is not None:
+                bounds["ids"] = ids
+            existing = {
+                (user_id, topic): (row_id, score)
+                for row_id, user_id, topic, score in conn.execute(_select(
+                    "SELECT id, user_id, topic, mastery_score FROM topic_mastery WHERE {users}", ids
+                ), bounds)
+            }
+        if not pairs:
+            continue
+
+        mastery = mastery_vector(quiz, assignment, consistency)
+        for label, count in zip(*np.unique(RISK_LABELS[risk_codes(mastery)], return_counts=True)):
+            stats["risk"][str(label)] += int(count)
+        for label, count in zip(*np.unique(LEVEL_LABELS[level_codes(mastery)], return_counts=True)):
+            stats["level"][str(label)] += int(count)
+        stats["pairs"] += len(pairs)
+
+        updates: List[dict] = []
+        inserts: List[dict] = []
+        changed_users = set()
+        for (user_id, topic), value in zip(pairs, mastery.tolist()):
+            if value != value:  # NaN: no graded activity, leave any existing row alone
+                continue
+            current = existing.get((user_id, topic))
+            if current is None:
+                inserts.append({"user_id": user_id, "topic": topic, "score": value})
+            elif current[1] is None or abs(current[1] - value) > 1e-9:
+                updates.append({"id": current[0], "score": value})
+            else:
+                continue
+            changed_users.add(user_id)
+
+        stats["updated"] += len(updates)
+        stats["inserted"] += len(inserts)
+        stats["users_changed"] += len(changed_users)
+        if dry_run or not changed_users:
+            continue
+
+        with engine.begin() as conn:
+            if updates:
+                conn.execute(text("UPDATE topic_mastery SET mastery_score = :score WHERE id = :id"), updates)
+            if inserts:
+                conn.execute(text(
+                    "INSERT INTO topic_mastery (user_id, topic, mastery_score) VALUES (:user_id, :topic, :score)"
+                ), inserts)
+            conn.execute(
+                text("UPDATE users SET data_version = data_version + 1 WHERE id = :id"),
+                [{"id": u} for u in sorted(changed_users)],
+            )
+        print(f"[mastery_batch] users {first_user}-{last_user}: {len(pairs)} pairs, "
+              f"{len(updates)} updated, {len(inserts)} inserted ({time.perf_counter() - started:.1f}s)")
+
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    return stats
@@ -0,0 +1,63 @@
+"""Aho–Corasick automaton over token sequences.
+
+Patterns are tuples of tokens (words, stems, ...), each carrying a value.
+find() reports every pattern occurrence in a token stream in a single
+pass, regardless of how many patterns are registered. Used by the interview
+answer pre-scorer and the resume skill extractor.
+"""
+from collections import deque
+from typing import Dict, Hashable, Iterator, List, Sequence, Tuple
+
+
+class PhraseAutomaton:
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # (value, pattern length) pairs ending at each node
+        self._out: List[List[Tuple[Hashable, int]]] = [[]]
+        self._built = False
+
+    def add(self, pattern: Sequence[str], value: Hashable):
+        if not pattern:
+            return
+        if self._built:
+            raise RuntimeError("Cannot add patterns after build()")
+        node = 0
+        for symbol in pattern:
+            nxt = self._goto[node].get(symbol)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][symbol] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        if (value, len(pattern)) not in self._out[node]:
+            self._out[node].append((value, len(pattern)))
+
+    def build(self) -> "PhraseAutomaton":
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for symbol, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and symbol not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(symbol, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+        self._built = True
+        return self
+
+    def find(self, tokens: Sequence[str]) -> Iterator[Tuple[int, int, Hashable]]:
+        """Yield (start, end, value) for every match; end is exclusive."""
+        if not self._built:
+            self.build()
+        node = 0
+        for position, symbol in enumerate(tokens):
+            while node and symbol not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(symbol, 0)
+            for value, length in self._out[node]:
+                yield position + 1 - length, position + 1, value
@@ -0,0 +1,136 @@
+"""Speculative pre-generation of the next quiz / assignment.
+
+After a quiz or assignment submission the user almost always asks for the
+next one on the same topic, at the level their new mastery puts them in.
+The submit routes call schedule() once their transaction has committed;
+generation runs in the background and the result is kept for
+PREGEN_TTL_SECONDS. The generate routes call take() first:
+
+- a finished result is served instantly (and removed: it is single-use);
+- a generation still in flight is awaited instead of starting a second one;
+- anything else (expired, failed, different level or role) is a miss and
+  the route generates as before.
+
+schedule_batch() does the same for several topics served by one provider
+call (e.g. quiz_ai.generate_quiz_batch): each topic gets its own entry,
+resolved from the shared call.
+
+Entries are keyed by (kind, user, topic, level, role) and held per process,
+like the in-memory user cache; a request served by another worker simply
+misses.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from core.config import settings
+from core.metrics import Counter, registry
+
+pregeneration_requests = registry.register(Counter(
+    "pregeneration_requests_total", "Speculative generation lookups and launches", ("kind", "result")))
+
+Key = Tuple[str, int, str, str, str]
+
+# key -> (expires_at, task); finished tasks hold the result until taken
+_entries: "OrderedDict[Key, Tuple[float, asyncio.Task]]" = OrderedDict()
+
+
+def _evict(now: float):
+    for key in [k for k, (expires_at, _) in _entries.items() if expires_at <= now]:
+        _drop(key)
+    while len(_entries) > settings.PREGEN_MAX_ENTRIES:
+        _drop(next(iter(_entries)))
+
+
+def _drop(key: Key):
+    _, task = _entries.pop(key)
+    if not task.done():
+        task.cancel()
+    elif not task.cancelled():
+        task.exception()  # mark a failure as retrieved
+
+
+def schedule(kind: str, user_id: int, topic: str, level: str, role: str,
+             factory: Callable[[], Awaitable[Any]]) -> bool:
+    """Start generating `factory()` in the background unless already cached."""
+    if not settings.PREGEN_ENABLED:
+        return False
+    now = time.monotonic()
+    _evict(now)
+    key = (kind, user_id, topic, level, role)
+    if key in _entries:
+        return False
+
+    async def run():
+        try:
+            return await factory()
+        except Exception as e:
+            print(f"[pregeneration] {kind} for user {user_id} ({topic}, {level}) failed: {str(e)}")
+            raise
+
+    _entries[key] = (now + settings.PREGEN_TTL_SECONDS, asyncio.get_running_loop().create_task(run()))
+    pregeneration_requests.inc(kind, "scheduled")
+    return True
+
+
+def schedule_batch(kind: str, user_id: int, role: str, pairs: List[Tuple[str, str]],
+                   factory: Callable[[List[Tuple[str, str]]], Awaitable[Dict[Tuple[str, str], Any]]]) -> int:
+    """Start one background `factory(pairs)` call for the (topic, level) pairs not yet cached.
+
+    `factory` returns {(topic, level): result}; a pair missing from it is a
+    failed entry. Returns the number of pairs scheduled.
+    """
+    if not settings.PREGEN_ENABLED:
+        return 0
+    now = time.monotonic()
+    _evict(now)
+    pairs = [p for p in dict.fromkeys(pairs) if (kind, user_id, p[0], p[1], role) not in _entries]
+    if not pairs:
+        return 0
+
+    async def run():
+        try:
+            return await factory(pairs)
+        except Exception as e:
+            print(f"[pregeneration] {kind} batch for user {user_id} ({len(pairs)} topics) failed: {str(e)}")
+            raise
+
+    loop = asyncio.get_running_loop()
+    batch = loop.create_task(run())
+    # Entries may all be dropped before the call finishes
+    batch.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    async def pick(pair):
+        # shield: dropping one entry must not cancel the call the others share
+        results = await asyncio.shield(batch)
+        if pair not in results:
+            raise LookupError(f"{pair} missing from batch result")
+        return results[pair]
+
+    for pair in pairs:
+        _entries[(kind, user_id, pair[0], pair[1], role)] = (
+            now + settings.PREGEN_TTL_SECONDS, loop.create_task(pick(pair)))
+        pregeneration_requests.inc(kind, "scheduled")
+    return len(pairs)
+
+
+async def take(kind: str, user_id: int, topic: str, level: str, role: str) -> Optional[Any]:
+    """The pre-generated result for this request, or None on a miss."""
+    if not settings.PREGEN_ENABLED:
+        return None
+    _evict(time.monotonic())
+    entry = _entries.pop((kind, user_id, topic, level, role), None)
+    if entry is None:
+        pregeneration_requests.inc(kind, "miss")
+        return None
+    task = entry[1]
+    in_flight = not task.done()
+    try:
+        # shield: a client disconnect must not cancel the shared generation
+        result = await asyncio.shield(task)
+    except Exception:
+        pregeneration_requests.inc(kind, "failed")
+        return None
+    pregeneration_requests.inc(kind, "joined" if in_flight else "hit")
+    return result
@@ -1,32 +1,17 @@
 from ai.provider_factory import get_ai_provider
+from ai.prompts import PromptTemplate, prompt_registry
+from ai.usage import record_retry
 import json
+from typing import Dict, List, Tuple
 from fastapi import HTTPException, status
+from services.task_group import SubtaskGroup
 
-async def generate_quiz(
-    topic: str,
-    level: str,
-    role: str,
-    difficulty: str = None
-):
-    """Generate an adaptive quiz based on mastery level and role."""
-    
-    print(f"Generating quiz for: {topic} {level}")
-    
-    # Adaptive logic for focus
-    if level == "Basic":
-        focus = "Concept clarity, Definitions, Simple examples"
-    elif level == "Intermediate":
-        focus = "Code snippets, Output prediction, Scenario-based MCQs"
-    else:  # Advanced
-        focus = "Optimization, Edge case reasoning, Real-world scenario, Debugging"
-    
-    system_prompt = (
+# Static instructions first so the provider can cache the prefix across topics
+QUIZ_PROMPT = prompt_registry.register(PromptTemplate(
+    "quiz.generate", 1,
+    instructions=(
         "You are a technical interviewer.\n\n"
-        "Generate exactly 5 high-quality MCQs.\n\n"
-        f"Topic: {topic}\n"
-        f"Difficulty: {level}\n"
-        f"Role: {role}\n"
-        f"Focus Area: {focus}\n\n"
+        "Generate exactly 5 high-quality MCQs for the topic, difficulty, role and focus area given at the end.\n\n"
         "Rules:\n"
         "- No generic questions\n"
         "- No vague definitions\n"
@@ -44,46 +29,133 @@ async def generate_quiz(
         "    }\n"
         "  ]\n"
         "}"
-    )
+    ),
+    data=(
+        "Topic: $topic\n"
+        "Difficulty: $level\n"
+        "Role: $role\n"
+        "Focus Area: $focus\n"
+    ),
+))
+
+_LEVEL_FOCUS = {
+    "Basic": "Concept clarity, Definitions, Simple examples",
+    "Intermediate": "Code snippets, Output prediction, Scenario-based MCQs",
+    "Advanced": "Optimization, Edge case reasoning, Real-world scenario, Debugging",
+}
+
+# Questions per provider call in generate_quiz_batch(); larger batches are split
+MAX_BATCH_QUESTIONS = 20
+
+QUIZ_BATCH_PROMPT = prompt_registry.register(PromptTemplate(
+    "quiz.generate_batch", 1,
+    instructions=(
+        "You are a technical interviewer.\n\n"
+        "Generate high-quality MCQs for each of the quiz sections listed at the end. "
+        "Each section gives a topic, a difficulty level and the number of questions to write for it.\n\n"
+        "Rules:\n"
+        "- No generic questions\n"
+        "- No vague definitions\n"
+        "- Questions must test applied understanding\n"
+        "- Include code snippet if topic allows\n"
+        "- Every question has exactly 4 options; correct_answer is the text of one of them\n\n"
+        "Focus by level:\n"
+        + "".join(f"- {level}: {focus}\n" for level, focus in _LEVEL_FOCUS.items())
+        + "\n"
+        "Return JSON only, one entry per section in the order given, each with exactly "
+        "the requested number of questions:\n"
+        "{\n"
+        "  \"sections\": [\n"
+        "    {\n"
+        "      \"section\": 1,\n"
+        "      \"topic\": \"\",\n"
+        "      \"level\": \"\",\n"
+        "      \"questions\": [\n"
+        "        {\n"
+        "          \"question\": \"\",\n"
+        "          \"options\": [],\n"
+        "          \"correct_answer\": \"\",\n"
+        "          \"explanation\": \"\"\n"
+        "        }\n"
+        "      ]\n"
+        "    }\n"
+        "  ]\n"
+        "}"
+    ),
+    data=(
+        "Role: $role\n\n"
+        "Quiz sections:\n"
+        "$sections"
+    ),
+))
+
+
+def _strip_fences(content: str) -> str:
+    if content.startswith("```json"):
+        return content[7:-3]
+    if content.startswith("```"):
+        return content[3:-3]
+    return content
+
+
+def _validate_questions(questions, count: int) -> List[dict]:
+    """Check `count` MCQs and format them as the frontend expects; raises ValueError."""
+    if not isinstance(questions, list) or len(questions) != count:
+        raise ValueError(f"Payload must contain exactly {count} questions.")
+    for i, q in enumerate(questions):
+        if not isinstance(q, dict) or not isinstance(q.get("options"), list) or len(q["options"]) != 4:
+            raise ValueError(f"Question {i+1} must have exactly 4 options.")
+        if not q.get("question") or not q.get("correct_answer") or not q.get("explanation"):
+            raise ValueError(f"Question {i+1} has empty fields.")
+
+        # Format to match existing frontend expectations
+        q["id"] = i + 1
+        q["type"] = "mcq_single"
+    return questions
+
+
+def quiz_payload(title: str, topic: str, level: str, questions: List[dict]) -> dict:
+    return {
+        "title": title,
+        "topic": topic,
+        "difficulty": level,
+        "time_limit": 10,
+        "questions": questions,
+    }
+
 
-    provider = get_ai_provider()
+async def generate_quiz(
+    topic: str,
+    level: str,
+    role: str,
+    difficulty: str = None
+):
+    """Generate an adaptive quiz based on mastery level and role."""
+    
+    print(f"Generating quiz for: {topic} {level}")
+    
+    # Adaptive logic for focus
+    focus = _LEVEL_FOCUS.get(level, _LEVEL_FOCUS["Advanced"])
+    
+    system_prompt = QUIZ_PROMPT.render(topic=topic, level=level, role=role, focus=focus)
+
+    provider = get_ai_provider("quiz")
     
     for attempt_num in range(2):
+        if attempt_num > 0:
+            record_retry("quiz")
         try:
             content = await provider.generate(system_prompt)
             print("--- RAW AI OUTPUT (QUIZ) ---")
             print(content)
             print("----------------------------")
             
-            # Clean potential markdown
-            if content.startswith("```json"):
-                content = content[7:-3]
-            elif content.startswith("```"):
-                content = content[3:-3]
-            
-            data = json.loads(content)
+            data = json.loads(_strip_fences(content))
             
             # Validation
-            if "questions" not in data or not isinstance(data["questions"], list) or len(data["questions"]) != 5:
-                raise ValueError("Payload must contain exactly 5 questions.")
-                
-            for i, q in enumerate(data["questions"]):
-                if "options" not in q or not isinstance(q["options"], list) or len(q["options"]) != 4:
-                    raise ValueError(f"Question {i+1} must have exactly 4 options.")
-                if not q.get("question") or not q.get("correct_answer") or not q.get("explanation"):
-                    raise ValueError(f"Question {i+1} has empty fields.")
-                
-                # Format to match existing frontend expectations
-                q["id"] = i + 1
-                q["type"] = "mcq_single"
-                
-            return {
-                "title": f"{level} Quiz: {topic}",
-                "topic": topic,
-                "difficulty": level,
-                "time_limit": 10,
-                "questions": data["questions"]
-            }
+            questions = _validate_questions(data.get("questions") if isinstance(data, dict) else None, 5)
+
+            return quiz_payload(f"{level} Quiz: {topic}", topic, level, questions)
             
         except (json.JSONDecodeError, ValueError) as e:
             print(f"[quiz_ai] Error on attempt {attempt_num + 1}: {e}")
@@ -94,3 +166,92 @@ async def generate_quiz(
             raise HTTPException(status_code=500, detail="Failed to generate AI quiz.")
 
     raise HTTPException(status_code=500, detail="Failed to generate quiz after multiple attempts.")
+
+
+Section = Tuple[str, str, int]  # (topic, level, number of questions)
+
+
+def _parse_sections(content: str, sections: List[Section]) -> Dict[int, List[dict]]:
+    """Valid sections of a batch response by their index in `sections`.
+
+    Entries are matched by their "section" number, else by position; an
+    entry with the wrong number of questions or a malformed question is
+    dropped on its own.
+    """
+    data = json.loads(_strip_fences(content))
+    entries = data.get("sections") if isinstance(data, dict) else None
+    if not isinstance(entries, list):
+        raise ValueError("Payload must contain a list of sections.")
+    parsed = {}
+    for position, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            continue
+        number = entry.get("section")
+        index = number - 1 if isinstance(number, int) and 1 <= number <= len(sections) else position
+        if index >= len(sections) or index in parsed:
+            continue
+        try:
+            parsed[index] = _validate_questions(entry.get("questions"), sections[index][2])
+        except ValueError as e:
+            print(f"[quiz_ai] Batch section {index + 1} ({sections[index][0]}) rejected: {e}")
+    return parsed
+
+
+async def _generate_sections(provider, sections: List[Section], role: str) -> Dict[int, List[dict]]:
+    """One provider call for `sections`; sections that come back invalid are re-requested once."""
+    results: Dict[int, List[dict]] = {}
+    pending = list(range(len(sections)))
+    for attempt_num in range(2):
+        if attempt_num > 0:
+            record_retry("quiz_batch")
+        requested = [sections[i] for i in pending]
+        lines = "".join(
+            f"{n}. Topic: {topic} | Level: {level} | Questions: {count}\n"
+            for n, (topic, level, count) in enumerate(requested, start=1)
+        )
+        content = await provider.generate(QUIZ_BATCH_PROMPT.render(role=role, sections=lines))
+        try:
+            parsed = _parse_sections(content, requested)
+        except (json.JSONDecodeError, ValueError) as e:
+            print(f"[quiz_ai] Batch error on attempt {attempt_num + 1}: {e}")
+            parsed = {}
+        for position, questions in parsed.items():
+            results[pending[position]] = questions
+        pending = [i for i in pending if i not in results]
+        if not pending:
+            break
+    return results
+
+
+async def generate_quiz_batch(sections: List[Section], role: str) -> Dict[Tuple[str, str], List[dict]]:
+    """Generate questions for several (topic, level, count) sections at once.
+
+    Sections are packed into as few provider calls as MAX_BATCH_QUESTIONS
+    allows, and the calls run concurrently. Returns validated questions per
+    (topic, level); a section that could not be generated is missing from
+    the result rather than failing the others.
+    """
+    merged: Dict[Tuple[str, str], int] = {}
+    for topic, level, count in sections:
+        merged[(topic, level)] = merged.get((topic, level), 0) + count
+    sections = [(topic, level, count) for (topic, level), count in merged.items() if count > 0]
+
+    chunks: List[List[Section]] = []
+    for section in sections:
+        if chunks and sum(s[2] for s in chunks[-1]) + section[2] <= MAX_BATCH_QUESTIONS:
+            chunks[-1].append(section)
+        else:
+            chunks.append([section])
+
+    print(f"Generating quiz batch: {len(sections)} sections in {len(chunks)} call(s)")
+    provider = get_ai_provider("quiz_batch")
+    async with SubtaskGroup() as group:
+        for i, chunk in enumerate(chunks):
+            group.spawn(f"chunk{i}", _generate_sections(provider, chunk, role))
+
+    results = {}
+    for i, chunk in enumerate(chunks):
+        for index, questions in group.result(f"chunk{i}", default={}).items():
+            topic, level, _ = chunk[index]
+            results[(topic, level)] = questions
+    return results
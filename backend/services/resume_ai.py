@@ -1,16 +1,14 @@
 from ai.provider_factory import get_ai_provider
 import json
 from fastapi import HTTPException, status
+from ai.prompts import PromptTemplate, prompt_registry
+from services.skill_extractor import SkillExtraction, condensed_resume
 
-async def analyze_resume_with_ai(resume_text: str, role: str):
-    """Send resume text to OpenAI for analysis and return parsed JSON.
 
-    The system prompt asks the model to return ONLY a JSON object with the required fields.
-    If the OpenAI request fails or the response cannot be parsed, raise a 500 error.
-    """
-    system_prompt = (
+def _resume_instructions(extracted_topics: bool) -> str:
+    return (
         "You are a professional ATS Resume Analyzer.\n"
-        f"Analyze the resume for the role of {role}.\n"
+        "Analyze the resume given at the end for the role stated there.\n"
         "Return ONLY JSON with:\n"
         "{\n"
         "  skill_relevance: int (0-100),\n"
@@ -19,13 +17,38 @@ async def analyze_resume_with_ai(resume_text: str, role: str):
         "  structure_score: int (0-100),\n"
         "  missing_skills: array,\n"
         "  recommendations: array,\n"
-        "  extracted_topics: array (e.g., ['FastAPI', 'React', 'Docker']),\n"
-        "  suggested_learning_topics: array (e.g., ['Microservices', 'GraphQL', 'Redux'])\n"
+        + ("  extracted_topics: array (e.g., ['FastAPI', 'React', 'Docker']),\n" if extracted_topics else "")
+        + "  suggested_learning_topics: array (e.g., ['Microservices', 'GraphQL', 'Redux'])\n"
         "}\n"
     )
+
+
+_RESUME_DATA = "Role: $role\n\n$resume_text"
+
+RESUME_PROMPT = prompt_registry.register(PromptTemplate(
+    "resume.analyze", 1, instructions=_resume_instructions(True), data=_RESUME_DATA))
+# Topics already extracted locally: the model only scores the condensed resume
+RESUME_SKILLS_PROMPT = prompt_registry.register(PromptTemplate(
+    "resume.analyze_condensed", 1, instructions=_resume_instructions(False), data=_RESUME_DATA))
+
+
+async def analyze_resume_with_ai(resume_text: str, role: str, skills: SkillExtraction = None):
+    """Send resume text to OpenAI for analysis and return parsed JSON.
+
+    The system prompt asks the model to return ONLY a JSON object with the required fields.
+    If the OpenAI request fails or the response cannot be parsed, raise a 500 error.
+
+    When `skills` (services/skill_extractor.py) is given, the topics are
+    already known: the model gets the condensed resume and is not asked for
+    extracted_topics, which are filled in from the local extraction.
+    """
+    if skills is not None:
+        resume_text = condensed_resume(skills)
+    template = RESUME_SKILLS_PROMPT if skills is not None else RESUME_PROMPT
+    system_prompt = template.render(role=role, resume_text=resume_text)
     try:
-        provider = get_ai_provider()
-        content = await provider.generate(system_prompt + "\n\n" + resume_text)
+        provider = get_ai_provider("resume")
+        content = await provider.generate(system_prompt)
         
         # Robust JSON extraction (handle markdown blocks)
         if content.startswith("```"):
@@ -44,6 +67,8 @@ async def analyze_resume_with_ai(resume_text: str, role: str):
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="AI returned malformed JSON.",
             )
+        if skills is not None:
+            result["extracted_topics"] = skills.topics
         return result
     except Exception as e:
         # Check if it's a quota error or any other OpenAI error
@@ -61,6 +86,26 @@ async def analyze_resume_with_ai(resume_text: str, role: str):
                 "Add more detail to your projects section to show deep architectural understanding.",
                 "Ensure your LinkedIn profile is up to date and linked in the header."
             ],
-            "extracted_topics": ["Python", "JavaScript", "React", "SQL", "Git", "REST APIs"],
+            "extracted_topics": skills.topics if skills is not None else ["Python", "JavaScript", "React", "SQL", "Git", "REST APIs"],
             "suggested_learning_topics": ["Docker", "Kubernetes", "AWS", "CI/CD", "Redis"]
         }
+
+
+def store_resume_topics(db, user_id: int, role: str, topics=None, suggested_topics=None):
+    """Upsert the user's UserResumeData; None leaves a field unchanged."""
+    from core.http_cache import bump_data_version
+    from models.quiz import UserResumeData
+    from services.user_data_cache import invalidate_user
+
+    user_resume = db.query(UserResumeData).filter(UserResumeData.user_id == user_id).first()
+    if user_resume is None:
+        user_resume = UserResumeData(user_id=user_id, topics=[], suggested_topics=[])
+        db.add(user_resume)
+    user_resume.role = role
+    if topics is not None:
+        user_resume.topics = topics
+    if suggested_topics is not None:
+        user_resume.suggested_topics = suggested_topics
+    bump_data_version(db, user_id)
+    db.commit()
+    invalidate_user(user_id)
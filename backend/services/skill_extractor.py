@@ -0,0 +1,170 @@
+"""In-process resume skill extraction.
+
+Finds known skills in resume text in a few milliseconds, so signup and
+resume analysis can store UserResumeData.topics without waiting for the
+LLM:
+
+- lexicon: every canonical topic and alias from services/topic_registry.py,
+  compiled once into a PhraseAutomaton over word tokens; overlapping
+  matches keep the longest ("Tailwind CSS" rather than "CSS");
+- sections: heading lines ("Technical Skills", "Experience", "Projects",
+  ...) split the resume, and a mention counts more in the skills and
+  experience sections than in education;
+- ambiguity: short aliases that are also plain English ("go", "rest",
+  "express", "node") only count inside a skills section, so a resume
+  without one is left to the LLM (SkillExtraction.from_skills_section).
+
+Skills are ranked by weighted mention frequency. condensed_resume() rebuilds
+the text with the skills section reduced to the detected list, which is
+what the LLM still needs to judge (experience, projects, structure).
+"""
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from services.phrase_automaton import PhraseAutomaton
+from services.topic_registry import TOPICS
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:[+#]+)?")
+
+# Aliases that are ordinary words or too short to trust outside a skills list
+AMBIGUOUS = frozenset({"go", "rest", "express", "node", "py", "js", "ts", "ml", "dl",
+                       "kube", "rtk", "dsa", "oop", "oops", "helm", "jest"})
+
+SECTION_WEIGHTS = {
+    "skills": 3.0,
+    "experience": 2.0,
+    "projects": 2.0,
+    "summary": 1.5,
+    "certifications": 1.0,
+    "other": 1.0,
+    "education": 0.5,
+}
+# Repeated mentions within one section stop adding weight after this many
+MAX_MENTIONS_PER_SECTION = 3
+MIN_SCORE = 1.0
+MAX_TOPICS = 12
+
+# Words that make up section headings; a line is a heading only if every word
+# is one of these (so "Experience with Docker" stays body text)
+_HEADING_WORDS = {
+    "skills": "skills", "skill": "skills", "technologies": "skills", "technology": "skills",
+    "tools": "skills", "stack": "skills", "competencies": "skills", "proficiencies": "skills",
+    "languages": "skills", "frameworks": "skills",
+    "experience": "experience", "employment": "experience", "history": "experience",
+    "internships": "experience", "internship": "experience",
+    "projects": "projects", "project": "projects",
+    "education": "education", "academics": "education", "qualifications": "education",
+    "certifications": "certifications", "certificates": "certifications", "courses": "certifications",
+    "training": "certifications", "achievements": "certifications", "awards": "certifications",
+    "summary": "summary", "profile": "summary", "objective": "summary", "about": "summary",
+}
+_HEADING_FILLER = frozenset({"technical", "tech", "professional", "work", "key", "core", "relevant", "and",
+                             "selected", "personal", "academic", "programming", "other", "additional",
+                             "of", "me", "career"})
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN.findall(text.casefold())
+
+
+@lru_cache(maxsize=1)
+def _automaton() -> PhraseAutomaton:
+    automaton = PhraseAutomaton()
+    for canonical, aliases in TOPICS.items():
+        for name in [canonical, *aliases]:
+            tokens = _tokens(name)
+            ambiguous = "".join(tokens) in AMBIGUOUS
+            automaton.add(tokens, (canonical, ambiguous))
+    return automaton.build()
+
+
+def _heading(line: str):
+    """(section, rest of line) if the line is a heading, else None.
+
+    Handles both a heading on its own line and "Skills: Python, Docker".
+    """
+    head, _, rest = line.partition(":")
+    words = re.findall(r"[a-z]+", head.casefold())
+    if not words or len(words) > 4:
+        return None
+    section = None
+    for word in words:
+        if word in _HEADING_WORDS:
+            section = section or _HEADING_WORDS[word]
+        elif word not in _HEADING_FILLER:
+            return None
+    return (section, rest.strip()) if section else None
+
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """[(section, text)] in document order; text before any heading is "other"."""
+    sections: List[Tuple[str, List[str]]] = [("other", [])]
+    for line in text.splitlines():
+        heading = _heading(line)
+        if heading:
+            sections.append((heading[0], [heading[1]]))
+        else:
+            sections[-1][1].append(line)
+    return [(name, "\n".join(lines).strip()) for name, lines in sections if any(l.strip() for l in lines)]
+
+
+def _longest_matches(tokens: List[str]):
+    """Non-overlapping matches, preferring the longest at each position."""
+    matches = sorted(_automaton().find(tokens), key=lambda m: (m[0], -(m[1] - m[0])))
+    taken_until = 0
+    for start, end, value in matches:
+        if start >= taken_until:
+            taken_until = end
+            yield value
+
+
+@dataclass
+class SkillExtraction:
+    topics: List[str]
+    scores: Dict[str, float] = field(default_factory=dict)
+    sections: List[Tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def from_skills_section(self) -> bool:
+        """True when topics were found and the resume has a skills section.
+
+        Without one, ambiguous aliases in prose ("Node", "Express") are
+        skipped, so the topics are incomplete and the LLM should extract them.
+        """
+        return bool(self.topics) and any(section == "skills" for section, _ in self.sections)
+
+
+def extract_skills(text: str, max_topics: int = MAX_TOPICS) -> SkillExtraction:
+    """Canonical skills mentioned in a resume, strongest first."""
+    sections = split_sections(text or "")
+    scores: Dict[str, float] = {}
+    for section, body in sections:
+        mentions: Dict[str, int] = {}
+        for canonical, ambiguous in _longest_matches(_tokens(body)):
+            if ambiguous and section != "skills":
+                continue
+            mentions[canonical] = mentions.get(canonical, 0) + 1
+        weight = SECTION_WEIGHTS[section]
+        for canonical, count in mentions.items():
+            scores[canonical] = scores.get(canonical, 0.0) + weight * min(count, MAX_MENTIONS_PER_SECTION)
+
+    ranked = sorted((s for s in scores.items() if s[1] >= MIN_SCORE), key=lambda s: (-s[1], s[0]))
+    return SkillExtraction(
+        topics=[name for name, _ in ranked[:max_topics]],
+        scores=dict(ranked),
+        sections=sections,
+    )
+
+
+def condensed_resume(extraction: SkillExtraction) -> str:
+    """Resume text with skills sections replaced by the detected skill list."""
+    parts = []
+    if extraction.topics:
+        parts.append("Skills (detected): " + ", ".join(extraction.topics))
+    for section, body in extraction.sections:
+        if section == "skills":
+            continue
+        parts.append(body if section == "other" else f"{section.title()}:\n{body}")
+    return "\n\n".join(parts)
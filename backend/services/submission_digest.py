@@ -0,0 +1,291 @@
+import ast
+import io
+import re
+import tokenize
+from typing import List, Optional, Tuple
+
+# Rough chars-per-token ratio for code; good enough to bound prompt size
+# without pulling in a tokenizer.
+CHARS_PER_TOKEN = 4
+
+_JS_HINTS = re.compile(r"\b(function|const|let|var|=>|import .* from|export|console\.log|require\()")
+_JS_DECL = re.compile(
+    r"^\s*(?:export\s+(?:default\s+)?)?(?:async\s+)?"
+    r"(?:function\s*\*?\s*(?P<func>[A-Za-z_$][\w$]*)\s*\((?P<args>[^)]*)\)"
+    r"|class\s+(?P<cls>[A-Za-z_$][\w$]*)"
+    r"|(?:const|let|var)\s+(?P<arrow>[A-Za-z_$][\w$]*)\s*=\s*(?:async\s*)?(?:\([^)]*\)|[A-Za-z_$][\w$]*)\s*=>)"
+)
+_JS_IMPORT = re.compile(r"^\s*import\s.*?from\s+['\"]([^'\"]+)['\"]|require\(\s*['\"]([^'\"]+)['\"]\s*\)")
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def detect_language(code: str) -> str:
+    """Best-effort language guess: 'python', 'javascript' or 'text'."""
+    try:
+        ast.parse(code)
+        # Plain prose often parses as nothing but expressions; require some structure
+        if re.search(r"^\s*(def|class|import|from|for|while|if|return)\b", code, re.M):
+            return "python"
+    except (SyntaxError, ValueError):
+        pass
+    if _JS_HINTS.search(code):
+        return "javascript"
+    return "text"
+
+
+def normalize_whitespace(code: str) -> str:
+    """Unify newlines, expand tabs, strip trailing spaces and collapse blank runs."""
+    code = code.replace("\r\n", "\n").replace("\r", "\n").expandtabs(4)
+    lines = [line.rstrip() for line in code.split("\n")]
+    out = []
+    for line in lines:
+        if not line and out and not out[-1]:
+            continue
+        out.append(line)
+    return "\n".join(out).strip("\n")
+
+
+def _strip_python_comments(code: str) -> str:
+    """Remove comments and docstrings while keeping line structure intact."""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return code
+
+    lines = code.split("\n")
+    drop = set()
+
+    # Docstrings: first statement of module/class/function that is a bare string
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            body = node.body
+            if body and isinstance(body[0], ast.Expr) and isinstance(getattr(body[0], "value", None), ast.Constant) \
+                    and isinstance(body[0].value.value, str) and len(body) > 1:
+                drop.update(range(body[0].lineno - 1, body[0].end_lineno))
+
+    try:
+        for tok in tokenize.generate_tokens(io.StringIO(code).readline):
+            if tok.type == tokenize.COMMENT:
+                row, col = tok.start
+                line = lines[row - 1]
+                lines[row - 1] = line[:col].rstrip()
+    except (tokenize.TokenError, IndentationError):
+        return code
+
+    return "\n".join(line for i, line in enumerate(lines) if i not in drop)
+
+
+def _strip_js_comments(code: str) -> str:
+    """Remove // and /* */ comments, leaving string and template literals alone."""
+    out = []
+    i, n = 0, len(code)
+    quote = None
+    while i < n:
+        ch = code[i]
+        if quote:
+            out.append(ch)
+            if ch == "\\" and i + 1 < n:
+                out.append(code[i + 1])
+                i += 2
+                continue
+            if ch == quote:
+                quote = None
+            i += 1
+        elif ch in "'\"`":
+            quote = ch
+            out.append(ch)
+            i += 1
+        elif code.startswith("//", i):
+            end = code.find("\n", i)
+            i = n if end == -1 else end
+        elif code.startswith("/*", i):
+            end = code.find("*/", i + 2)
+            newlines = code.count("\n", i, n if end == -1 else end)
+            out.append("\n" * newlines)
+            i = n if end == -1 else end + 2
+        else:
+            out.append(ch)
+            i += 1
+    return "".join(out)
+
+
+def _python_summary(code: str) -> List[str]:
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return []
+
+    summary = []
+    imports = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            imports.extend(a.name for a in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            imports.append(node.module or ".")
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            summary.append(f"def {node.name}({ast.unparse(node.args)}) ({node.end_lineno - node.lineno + 1} lines)")
+        elif isinstance(node, ast.ClassDef):
+            methods = [m.name for m in node.body if isinstance(m, (ast.FunctionDef, ast.AsyncFunctionDef))]
+            summary.append(
+                f"class {node.name} ({node.end_lineno - node.lineno + 1} lines)"
+                + (f" methods: {', '.join(methods)}" if methods else "")
+            )
+    if imports:
+        summary.insert(0, f"imports: {', '.join(sorted(set(imports)))}")
+    return summary
+
+
+def _js_summary(code: str) -> List[str]:
+    summary = []
+    imports = []
+    for line in code.split("\n"):
+        m = _JS_IMPORT.search(line)
+        if m:
+            imports.append(m.group(1) or m.group(2))
+            continue
+        m = _JS_DECL.match(line)
+        if not m:
+            continue
+        if m.group("func"):
+            summary.append(f"function {m.group('func')}({m.group('args').strip()})")
+        elif m.group("cls"):
+            summary.append(f"class {m.group('cls')}")
+        elif m.group("arrow"):
+            summary.append(f"const {m.group('arrow')} = (...) =>")
+    summary = list(dict.fromkeys(summary))
+    if imports:
+        summary.insert(0, f"imports: {', '.join(sorted(set(imports)))}")
+    return summary
+
+
+def _elide_python_bodies(code: str, budget_chars: int) -> Tuple[str, int]:
+    """Replace the largest function bodies with '...' until the code fits.
+
+    Returns the new code and the number of bodies elided.
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return code, 0
+
+    funcs = [
+        node for node in ast.walk(tree)
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.body
+    ]
+    # Largest first; skip nested functions whose parent gets elided anyway
+    funcs.sort(key=lambda f: f.end_lineno - f.lineno, reverse=True)
+
+    lines = code.split("\n")
+    elided_ranges: List[Tuple[int, int]] = []
+    size = len(code)
+    for func in funcs:
+        if size <= budget_chars:
+            break
+        start, end = func.body[0].lineno - 1, func.end_lineno
+        if end - start < 3 or any(s <= start and end <= e for s, e in elided_ranges):
+            continue
+        removed = sum(len(lines[i]) + 1 for i in range(start, end))
+        elided_ranges.append((start, end))
+        size -= removed
+
+    if not elided_ranges:
+        return code, 0
+
+    out = []
+    i = 0
+    for start, end in sorted(elided_ranges):
+        out.extend(lines[i:start])
+        indent = len(lines[start]) - len(lines[start].lstrip())
+        out.append(" " * indent + f"...  # {end - start} lines elided")
+        i = end
+    out.extend(lines[i:])
+    return "\n".join(out), len(elided_ranges)
+
+
+def _truncate_middle(code: str, budget_chars: int) -> str:
+    """Keep the head and tail of the code at line boundaries, dropping the middle."""
+    lines = code.split("\n")
+    head_budget = int(budget_chars * 0.6)
+    tail_budget = budget_chars - head_budget
+
+    head, used = [], 0
+    for line in lines:
+        if used + len(line) + 1 > head_budget:
+            break
+        head.append(line)
+        used += len(line) + 1
+
+    tail, used = [], 0
+    for line in reversed(lines[len(head):]):
+        if used + len(line) + 1 > tail_budget:
+            break
+        tail.append(line)
+        used += len(line) + 1
+    tail.reverse()
+
+    omitted = len(lines) - len(head) - len(tail)
+    if omitted <= 0:
+        return code
+    return "\n".join(head + [f"... [{omitted} lines omitted] ..."] + tail)
+
+
+def digest_submission(code_text: Optional[str], token_budget: int) -> dict:
+    """Shrink a code submission so the evaluation prompt stays within ``token_budget``.
+
+    Returns a dict with the digested ``code``, a structural ``summary`` (list of
+    lines, empty for small submissions), the detected ``language``, token
+    estimates before/after and whether anything was ``truncated``.
+    """
+    if not code_text or not code_text.strip():
+        return {"code": "", "summary": [], "language": "text",
+                "original_tokens": 0, "digest_tokens": 0, "truncated": False}
+
+    original_tokens = estimate_tokens(code_text)
+    language = detect_language(code_text)
+
+    code = normalize_whitespace(code_text)
+    if estimate_tokens(code) <= token_budget:
+        # Small enough already; keep comments, they help the evaluator
+        return {"code": code, "summary": [], "language": language,
+                "original_tokens": original_tokens, "digest_tokens": estimate_tokens(code), "truncated": False}
+
+    if language == "python":
+        code = normalize_whitespace(_strip_python_comments(code))
+        summary = _python_summary(code) if code else []
+    elif language == "javascript":
+        code = normalize_whitespace(_strip_js_comments(code))
+        summary = _js_summary(code)
+    else:
+        summary = []
+
+    # The summary shares the budget with the code itself; cap it at a quarter
+    summary_budget = token_budget * CHARS_PER_TOKEN // 4
+    if sum(len(s) + 1 for s in summary) > summary_budget:
+        kept, used = [], 0
+        for line in summary:
+            if used + len(line) + 1 > summary_budget:
+                break
+            kept.append(line)
+            used += len(line) + 1
+        summary = kept + [f"... {len(summary) - len(kept)} more definitions"]
+
+    budget_chars = max(0, token_budget * CHARS_PER_TOKEN - sum(len(s) + 1 for s in summary))
+    truncated = False
+    if len(code) > budget_chars and language == "python":
+        code, elided = _elide_python_bodies(code, budget_chars)
+        truncated = elided > 0
+    if len(code) > budget_chars:
+        code = _truncate_middle(code, budget_chars)
+        truncated = True
+
+    return {
+        "code": code,
+        "summary": summary,
+        "language": language,
+        "original_tokens": original_tokens,
+        "digest_tokens": estimate_tokens(code) + estimate_tokens("\n".join(summary)),
+        "truncated": truncated,
+    }
@@ -0,0 +1,73 @@
+"""Structured concurrency for independent sub-tasks of one request.
+
+SubtaskGroup runs named coroutines concurrently on top of asyncio.TaskGroup
+and collects each one's result or exception separately, so a failing
+sub-call does not cancel its siblings and the caller can assemble a partial
+result:
+
+    async with SubtaskGroup(timeout=30) as group:
+        group.spawn("analysis", screen_resume(...))
+        for category in categories:
+            group.spawn(category, generate_questions(category))
+    analysis = group.result("analysis", default=None)
+
+Leaving the block waits for every sub-task, or until `timeout` seconds
+after entering it, when the stragglers are cancelled and recorded as
+TimeoutError. Tasks copy the current context, so request-scoped telemetry
+(AI usage, request id) is still attributed to the request.
+"""
+import asyncio
+from typing import Any, Awaitable, Dict, Optional
+
+_MISSING = object()
+
+
+class SubtaskGroup:
+    def __init__(self, timeout: Optional[float] = None):
+        self.timeout = timeout
+        self.results: Dict[str, Any] = {}
+        self.errors: Dict[str, BaseException] = {}
+        self._group: Optional[asyncio.TaskGroup] = None
+        self._pending: Dict[str, asyncio.Task] = {}
+        self._deadline: Optional[float] = None
+
+    async def __aenter__(self) -> "SubtaskGroup":
+        if self.timeout is not None:
+            self._deadline = asyncio.get_running_loop().time() + self.timeout
+        self._group = asyncio.TaskGroup()
+        await self._group.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            async with asyncio.timeout_at(self._deadline):
+                return await self._group.__aexit__(exc_type, exc, tb)
+        except TimeoutError:
+            # The TaskGroup cancelled everything still running on the way out
+            for name in self._pending:
+                self.errors[name] = TimeoutError(f"Sub-task '{name}' timed out after {self.timeout}s")
+            self._pending.clear()
+            return exc_type is None
+
+    def spawn(self, name: str, coro: Awaitable) -> None:
+        if name in self._pending or name in self.results or name in self.errors:
+            raise ValueError(f"Duplicate sub-task name: {name}")
+
+        async def run():
+            try:
+                self.results[name] = await coro
+            except Exception as e:
+                print(f"[task_group] Sub-task '{name}' failed: {type(e).__name__}: {e}")
+                self.errors[name] = e
+            # Cancelled tasks stay pending so a timeout can name them
+            self._pending.pop(name, None)
+
+        self._pending[name] = self._group.create_task(run(), name=name)
+
+    def result(self, name: str, default: Any = _MISSING) -> Any:
+        """Result of a sub-task; re-raises its error unless a default is given."""
+        if name in self.results:
+            return self.results[name]
+        if default is not _MISSING:
+            return default
+        raise self.errors.get(name) or KeyError(name)
@@ -0,0 +1,152 @@
+"""Canonical topic names.
+
+The LLM returns topics as free-form strings ("React", "React.js", "ReactJS",
+"react js"), which would otherwise fragment TopicMastery, QuizAttempt and
+Assignment rows and every per-topic cache. canonical_topic() maps a raw
+name to its registered canonical spelling:
+
+1. exact lookup of the compact key (casefolded, punctuation and spaces
+   removed, "+" and "#" kept so C++ and C# stay distinct), covering every
+   canonical name and alias;
+2. fuzzy match (difflib ratio) for near-miss spellings such as
+   "Kubernates", trying keys that share a word token with the input first;
+3. otherwise the input itself, whitespace-trimmed.
+
+Apply it wherever topics are written (resume analysis, quiz and assignment
+routes). backfill_topics.py rewrites existing rows after the registry grows.
+"""
+import difflib
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Set
+
+# canonical name -> aliases (the canonical name itself is always matched).
+# Aliases are spellings of the same name only; related but different skills
+# ("Unit Testing", "Spring", "Neural Networks") stay separate topics.
+TOPICS: Dict[str, List[str]] = {
+    "Python": ["python3", "py"],
+    "JavaScript": ["js", "ecmascript", "es6", "vanilla js"],
+    "TypeScript": ["ts"],
+    "Java": ["core java", "java se"],
+    "Go": ["golang"],
+    "C++": ["cpp", "c plus plus"],
+    "C#": ["csharp", "c sharp"],
+    "Rust": ["rustlang"],
+    "React": ["react.js", "reactjs", "react js"],
+    "Redux": ["redux toolkit", "rtk"],
+    "Next.js": ["nextjs"],
+    "Angular": ["angularjs", "angular.js"],
+    "Vue.js": ["vue", "vuejs"],
+    "Node.js": ["node", "nodejs"],
+    "Express.js": ["express", "expressjs"],
+    "HTML": ["html5"],
+    "CSS": ["css3"],
+    "Tailwind CSS": ["tailwind", "tailwindcss"],
+    "FastAPI": ["fast api"],
+    "Django": [],
+    "Flask": [],
+    "Spring Boot": ["springboot"],
+    "REST APIs": ["rest", "rest api", "restful", "restful apis", "restful api", "rest services", "restful services"],
+    "GraphQL": ["graph ql"],
+    "gRPC": [],
+    "SQL": ["sql queries", "structured query language"],
+    "PostgreSQL": ["postgres", "psql", "postgre sql"],
+    "MySQL": ["my sql"],
+    "MongoDB": ["mongo", "mongo db"],
+    "Redis": [],
+    "Elasticsearch": ["elastic search"],
+    "Git": [],
+    "Docker": [],
+    "Kubernetes": ["k8s", "kube"],
+    "AWS": ["amazon web services"],
+    "Azure": ["microsoft azure"],
+    "GCP": ["google cloud", "google cloud platform"],
+    "CI/CD": ["ci cd", "continuous integration", "continuous delivery"],
+    "GitHub Actions": ["gh actions"],
+    "GitLab CI": ["gitlab ci cd"],
+    "Jenkins": [],
+    "Helm": ["helm charts"],
+    "Linux": ["gnu linux"],
+    "System Design": ["systems design"],
+    "Microservices": ["microservice architecture", "micro services"],
+    "Data Structures": ["data structure", "dsa"],
+    "Algorithms": ["algorithm"],
+    "Object-Oriented Programming": ["oop", "oops", "object oriented programming"],
+    "Testing": [],
+    "Pytest": ["py.test"],
+    "Jest": [],
+    "JUnit": ["junit5"],
+    "Machine Learning": ["ml"],
+    "Scikit-learn": ["sklearn", "scikit learn"],
+    "Deep Learning": ["dl"],
+    "PyTorch": [],
+    "TensorFlow": ["tensor flow"],
+    "Keras": [],
+    "Data Analysis": ["data analytics"],
+    "Pandas": [],
+    "NumPy": [],
+    "Cloud Deployment": ["cloud deployments"],
+    "Kafka": ["apache kafka"],
+}
+
+FUZZY_CUTOFF = 0.88
+
+
+def _key(name: str) -> str:
+    return re.sub(r"[^0-9a-z+#]", "", name.casefold())
+
+
+def _tokens(name: str) -> Set[str]:
+    return {t for t in re.split(r"[^0-9a-z+#]+", name.casefold()) if len(t) > 1}
+
+
+def _build_index():
+    by_key: Dict[str, str] = {}
+    by_token: Dict[str, Set[str]] = {}
+    for canonical, aliases in TOPICS.items():
+        for name in [canonical, *aliases]:
+            key = _key(name)
+            existing = by_key.setdefault(key, canonical)
+            if existing != canonical:
+                raise ValueError(f"Topic alias '{name}' maps to both {existing} and {canonical}")
+            for token in _tokens(name) | {key}:
+                by_token.setdefault(token, set()).add(key)
+    return by_key, by_token
+
+
+_BY_KEY, _BY_TOKEN = _build_index()
+
+
+@lru_cache(maxsize=4096)
+def canonical_topic(name: str) -> str:
+    """Canonical spelling of a topic name (unknown topics are returned trimmed)."""
+    cleaned = " ".join(str(name).split())
+    key = _key(cleaned)
+    if not key:
+        return cleaned
+    canonical = _BY_KEY.get(key)
+    if canonical:
+        return canonical
+
+    # Fuzzy: first against keys sharing a token, then (for keys long enough
+    # not to match by accident) against all keys, e.g. "kubernates"
+    candidates = set()
+    for token in _tokens(cleaned) | {key}:
+        candidates |= _BY_TOKEN.get(token, set())
+    match = difflib.get_close_matches(key, candidates, n=1, cutoff=FUZZY_CUTOFF)
+    if not match and len(key) >= 5:
+        match = difflib.get_close_matches(key, _BY_KEY.keys(), n=1, cutoff=FUZZY_CUTOFF)
+    return _BY_KEY[match[0]] if match else cleaned
+
+
+def canonical_topics(names: Iterable[str]) -> List[str]:
+    """Canonicalize a list of topics, dropping blanks and duplicates (order kept)."""
+    seen, result = set(), []
+    for name in names or []:
+        if not isinstance(name, str):
+            continue
+        topic = canonical_topic(name)
+        if topic and topic not in seen:
+            seen.add(topic)
+            result.append(topic)
+    return result
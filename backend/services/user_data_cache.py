@@ -0,0 +1,171 @@
+"""Per-user read-through cache for resume data and the topic mastery map.
+
+Almost every quiz, assignment and learning handler starts by loading the
+user's UserResumeData row and their {topic: mastery_score} map. Both only
+change through submit_quiz, submit_assignment and analyze_resume, which bump
+User.data_version in the same transaction (see core/http_cache.py) and call
+invalidate_user() after committing.
+
+Entries are stored with the data_version they were read at and only served
+to requests that see the same version, so a worker whose local cache missed
+an invalidation (another process handled the write) still never serves
+stale data. USER_CACHE_BACKEND=redis shares entries between workers.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.metrics import Counter, registry
+from models.quiz import TopicMastery, UserResumeData
+
+user_cache_requests = registry.register(Counter(
+    "user_cache_requests_total", "Per-user data cache lookups", ("kind", "result")))
+
+
+@dataclass(frozen=True)
+class ResumeSnapshot:
+    """Read-only copy of a UserResumeData row (same attribute names)."""
+    role: Optional[str]
+    topics: List[str] = field(default_factory=list)
+    suggested_topics: Optional[List[str]] = None
+
+
+class MemoryBackend:
+    """Process-local LRU holding one entry per (kind, user)."""
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries, self.ttl = max_entries, ttl_seconds
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, kind: str, user_id: int, version: int):
+        with self._lock:
+            entry = self._entries.get((kind, user_id))
+            if entry is None:
+                return None
+            entry_version, expires_at, value = entry
+            if entry_version != version or expires_at < time.monotonic():
+                del self._entries[(kind, user_id)]
+                return None
+            self._entries.move_to_end((kind, user_id))
+            return value
+
+    def set(self, kind: str, user_id: int, version: int, value):
+        with self._lock:
+            self._entries[(kind, user_id)] = (version, time.monotonic() + self.ttl, value)
+            self._entries.move_to_end((kind, user_id))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            for key in [k for k in self._entries if k[1] == user_id]:
+                del self._entries[key]
+
+
+class RedisBackend:
+    """Shared cache for multi-worker deployments (requires the redis package)."""
+
+    def __init__(self, url: str, ttl_seconds: int):
+        import redis  # optional dependency, only needed for this backend
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl_seconds
+
+    @staticmethod
+    def _key(kind: str, user_id: int, version: int) -> str:
+        # The version is part of the key, so bumping it orphans old entries
+        return f"user_cache:{kind}:{user_id}:{version}"
+
+    def get(self, kind: str, user_id: int, version: int):
+        raw = self.client.get(self._key(kind, user_id, version))
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, kind: str, user_id: int, version: int, value):
+        self.client.set(self._key(kind, user_id, version), json.dumps(value), ex=self.ttl)
+
+    def invalidate(self, user_id: int):
+        # Entries for older versions are unreachable and expire on their own
+        pass
+
+
+def _build_backend():
+    if settings.USER_CACHE_BACKEND == "redis":
+        return RedisBackend(settings.REDIS_URL, settings.USER_CACHE_TTL_SECONDS)
+    if settings.USER_CACHE_BACKEND == "memory":
+        return MemoryBackend(settings.USER_CACHE_MAX_ENTRIES, settings.USER_CACHE_TTL_SECONDS)
+    return None
+
+
+_backend = None
+_backend_built = False
+
+
+def _get_backend():
+    global _backend, _backend_built
+    if not _backend_built:
+        _backend = _build_backend()
+        _backend_built = True
+    return _backend
+
+
+def _cached(kind: str, user, load):
+    backend = _get_backend()
+    if backend is None:
+        return load()
+    version = user.data_version or 0
+    try:
+        value = backend.get(kind, user.id, version)
+    except Exception as e:
+        print(f"[user_cache] {kind} lookup failed, reading from DB: {e}")
+        return load()
+    if value is not None:
+        user_cache_requests.inc(kind, "hit")
+        return value
+    user_cache_requests.inc(kind, "miss")
+    value = load()
+    try:
+        backend.set(kind, user.id, version, value)
+    except Exception as e:
+        print(f"[user_cache] {kind} store failed: {e}")
+    return value
+
+
+def get_resume_data(db: Session, user) -> Optional[ResumeSnapshot]:
+    """The user's resume topics/role, or None if no resume was analyzed yet."""
+    def load():
+        row = db.query(UserResumeData).filter(UserResumeData.user_id == user.id).first()
+        if row is None:
+            return {}
+        return {"role": row.role, "topics": row.topics or [], "suggested_topics": row.suggested_topics}
+
+    # {} caches "no resume" so new users do not re-query either
+    data = _cached("resume", user, load)
+    if not data:
+        return None
+    suggested = data["suggested_topics"]
+    return ResumeSnapshot(data["role"], list(data["topics"]), list(suggested) if suggested is not None else None)
+
+
+def get_mastery_map(db: Session, user) -> Dict[str, float]:
+    """{topic: mastery_score} for every topic the user has practiced."""
+    def load():
+        rows = db.query(TopicMastery.topic, TopicMastery.mastery_score).filter(
+            TopicMastery.user_id == user.id
+        ).all()
+        return {topic: score for topic, score in rows}
+
+    return dict(_cached("mastery", user, load))
+
+
+def invalidate_user(user_id: int):
+    """Drop cached entries after a write (the data_version bump already hides them)."""
+    backend = _get_backend()
+    if backend is not None:
+        backend.invalidate(user_id)
@@ -0,0 +1,71 @@
+"""Voice answer pipeline: streamed audio -> incremental transcript -> feedback.
+
+Audio arrives as an async stream of chunks (a multipart upload read piece by
+piece, or binary WebSocket frames) and is handed straight to the STT backend
+(ai/stt.py), so it is never held in memory as a whole. Partial transcripts
+are forwarded as they are produced; the moment the final transcript is
+available the feedback call starts, and its text is streamed too.
+
+Events passed to `on_event` (all optional to consume):
+    {"type": "transcript_partial", "text"}
+    {"type": "transcript", "text"}
+    {"type": "feedback", "delta"}
+"""
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+from ai.stt import get_stt_backend
+from services.interview_ai import evaluate_interview_answer
+
+
+class EmptyTranscript(ValueError):
+    pass
+
+
+@dataclass
+class VoiceAnswerResult:
+    transcript: str
+    feedback: str
+
+
+async def iter_upload(upload, chunk_size: int) -> AsyncIterator[bytes]:
+    """Read a Starlette UploadFile in chunks."""
+    while chunk := await upload.read(chunk_size):
+        yield chunk
+
+
+async def process_voice_answer(
+    chunks: AsyncIterator[bytes],
+    filename: str,
+    question: str,
+    role: str = "Software Engineer",
+    on_event: Optional[Callable[[dict], Awaitable[None]]] = None,
+) -> VoiceAnswerResult:
+    async def emit(event: dict):
+        if on_event is not None:
+            await on_event(event)
+
+    transcript = ""
+    # aclosing: leaving the loop early still runs the backend's cleanup
+    async with aclosing(get_stt_backend().transcribe_stream(chunks, filename)) as events:
+        async for event in events:
+            if event.final:
+                transcript = event.text
+                break
+            await emit({"type": "transcript_partial", "text": event.text})
+
+    if not transcript.strip():
+        raise EmptyTranscript("Could not transcribe audio. Please try again.")
+    await emit({"type": "transcript", "text": transcript})
+
+    async def on_delta(text: str):
+        await emit({"type": "feedback", "delta": text})
+
+    feedback = await evaluate_interview_answer(
+        question=question,
+        answer_transcript=transcript,
+        role=role,
+        on_delta=on_delta if on_event is not None else None,
+    )
+    return VoiceAnswerResult(transcript=transcript, feedback=feedback)